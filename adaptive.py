@@ -0,0 +1,101 @@
+"""Tune the number of requests in flight while reading
+
+The table in try1.py shows throughput rising with the number of
+threads up to about 130, flat to 200, and falling again by 400, and the
+best number depends on the Pi and on what the game is doing (it is
+slower while chunks load, when the player flies).  Rather than pick
+the degree by hand, an AIMDController adjusts it as the reader runs:
+  - while the round trip time stays near the best seen, there is room,
+    so the limit grows: by half each time at first (slow start, as TCP
+    does), then, after the first cut, by a fixed step (additive increase)
+  - when the round trip time grows well past the best seen, requests
+    are only waiting in a queue in the game, so the limit is cut
+    (multiplicative decrease)
+The round trip time is worked out from the throughput and the number
+of requests in flight (Little's law), so no request needs timing.
+A gap longer than the interval (between reads) starts a new
+measurement, so idle time is not taken for a slow game.
+
+    getter = PipelinedGetter(controller=AIMDController())
+    blks = getter.get_blocks_with_data(c1, c2)
+    print getter.controller.limit, getter.controller.history[-3:]
+"""
+
+import timeit
+
+class AIMDController:
+    """Additive increase, multiplicative decrease of a concurrency limit
+
+    parms:
+        limit: the limit to start at
+        min_limit, max_limit: the range of the limit
+        step: how much to add while there is room, after slow start
+        decrease: what to multiply the limit by, when it is too high
+        tolerance: the limit is too high when the round trip time is
+                   more than this times the best seen
+        interval: seconds between adjustments
+    history holds (time, limit, blocks/sec, round trip secs) for each
+    adjustment.
+    """
+    def __init__(self, limit=20, min_limit=1, max_limit=400, step=4,
+                 decrease=0.75, tolerance=1.5, interval=0.25):
+        self.limit = limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.step = step
+        self.decrease = decrease
+        self.tolerance = tolerance
+        self.interval = interval
+        self.best_rtt = None
+        self.slow_start = True
+        self.history = []
+        self._start = None
+        self._last = None
+        self._answers = 0
+        self._in_flight = 0.0   # sum of in-flight counts, for the mean
+        self._samples = 0
+
+    def observe(self, answers, in_flight, now=None):
+        """Count answers received, with in_flight requests outstanding
+
+        Returns True if the limit changed.
+        """
+        now = timeit.default_timer() if now is None else now
+        if self._start is None or now - self._last > self.interval:
+            self.reset(now)
+        self._last = now
+        self._answers += answers
+        self._in_flight += in_flight
+        self._samples += 1
+        elapsed = now - self._start
+        if elapsed < self.interval or not self._answers:
+            return False
+        throughput = self._answers / elapsed
+        rtt = (self._in_flight / self._samples) / throughput
+        self._start, self._answers = now, 0
+        self._in_flight, self._samples = 0.0, 0
+        return self._adjust(now, throughput, rtt)
+
+    def reset(self, now=None):
+        """Start a new measurement, such as at the start of a read"""
+        self._start = timeit.default_timer() if now is None else now
+        self._last = self._start
+        self._answers = 0
+        self._in_flight, self._samples = 0.0, 0
+
+    def _adjust(self, now, throughput, rtt):
+        old = self.limit
+        # Forget the best slowly, in case the game got slower for good
+        if self.best_rtt is None or rtt < self.best_rtt:
+            self.best_rtt = rtt
+        else:
+            self.best_rtt *= 1.02
+        if rtt > self.tolerance * self.best_rtt:
+            self.limit = max(self.min_limit, int(self.limit * self.decrease))
+            self.slow_start = False
+        elif self.slow_start:
+            self.limit = min(self.max_limit, self.limit + self.limit // 2 + 1)
+        else:
+            self.limit = min(self.max_limit, self.limit + self.step)
+        self.history.append((now, self.limit, throughput, rtt))
+        return self.limit != old
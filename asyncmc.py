@@ -0,0 +1,315 @@
+"""Thousands of requests in flight, from one thread
+
+A ParallelGetter keeps a fleet of threads (and a socket each) busy,
+which costs thread start-up time and a stack per thread.  An
+AsyncMinecraft sends every request on one or a few pipelined sockets
+(see pipeline.py), and returns an Answer at once, which is filled in
+when the answer arrives.  Nothing happens in the background: the
+sockets are serviced whenever the caller asks for a result, or waits.
+
+    amc = AsyncMinecraft()
+    answers = [amc.getBlock(x, 0, z) for x in range(100) for z in range(100)]
+    ids = amc.wait(answers)          # 10000 requests, no threads
+    print amc.getHeight(3, 4).result()
+
+limit bounds the number of requests in flight over all the sockets,
+like a semaphore: asking for more waits until answers arrive.
+
+An AsyncMinecraft can also stand in for a PipelinedGetter where blocks
+are only read: it has get_blocks, get_blocks_with_data, iter_blocks,
+iter_blocks_with_data and iter_heights, so house.find_house,
+house.measure_runs, a Heightmap, ... can read through it:
+
+    corner, dim = house.find_house(amc, hit.pos)
+
+It cannot be a BulkWriter's getter, which needs sockets of its own.
+
+SyncMinecraft puts the usual (blocking) mc.getBlock, mc.getBlockWithData,
+mc.getHeight, mc.setBlock and mc.setBlocks in front of an AsyncMinecraft,
+and passes everything else (mc.player, mc.postToChat, ...) to a
+Minecraft, so code which uses only those can use it unchanged:
+
+    mc = SyncMinecraft(AsyncMinecraft(), minecraft.Minecraft.create())
+
+It is not a BlockCache (it has no wrote()), so it cannot be the cache
+of a BulkWriter, as get_mc() is for do_house in try1.py.
+
+Note: Python 2 has no asyncio, so this is a small select loop of its
+own, in the style of pipeline.gen_answers.
+"""
+
+from   cuboid import Cuboid
+from   mcpi.block import Block
+from   mcpi.connection import RequestError
+from   mcpi.minecraft import intFloor
+from   pipeline import PipelinedConnection, REQUEST_FAILED
+from   pipeline import _unpack_int, _unpack_int_int
+import collections
+import select
+
+class Answer:
+    """The answer to a request, which may not have arrived yet"""
+    def __init__(self, client, api_name, args, parse_fn):
+        self.client = client
+        self.api_name = api_name
+        self.args = args
+        self.parse_fn = parse_fn
+        self.callbacks = []
+        self._done = False
+        self._value = None
+        self._error = None
+
+    def done(self):
+        return self._done
+
+    def result(self):
+        """The answer, waiting for it if need be
+
+        Raises RequestError if the request failed, or if it can no
+        longer be answered (its socket was closed).
+        """
+        while not self._done:
+            if not any(c.pending for c in self.client.connections):
+                raise RequestError("%s%s was not answered" % (
+                    self.api_name, tuple(self.args)))
+            self.client.poll()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def add_done_callback(self, fn):
+        """Call fn(answer) when the answer arrives (or now, if it has)"""
+        if self._done:
+            fn(self)
+        else:
+            self.callbacks.append(fn)
+
+    def _set(self, text):
+        """Fill in the answer; the callbacks are run by _run_callbacks"""
+        try:
+            if text == REQUEST_FAILED:
+                raise RequestError("%s%s failed" % (
+                    self.api_name, tuple(self.args)))
+            self._value = self.parse_fn(text)
+        except Exception as e:
+            self._error = e
+        self._done = True
+
+    def _run_callbacks(self):
+        """Run the callbacks; returns the first exception one raised"""
+        callbacks, self.callbacks = self.callbacks, []
+        error = None
+        for fn in callbacks:
+            try:
+                fn(self)
+            except Exception as e:
+                if error is None:
+                    error = e
+        return error
+
+
+def _unpack_block(response):
+    return Block(*map(int, response.split(",")))
+
+
+class AsyncMinecraft:
+    """Non-blocking world.getBlock, ... over a few pipelined sockets
+
+    parms:
+        address, port: of the Minecraft Pi API
+        streams: the number of sockets to spread the requests over
+        limit: the most requests in flight, over all the sockets
+        metrics: an instrument.Metrics to record the requests in, or None
+    The sockets are opened on first use, and are kept open until close().
+    """
+    def __init__(self, address="localhost", port=4711, streams=1,
+                 limit=1000, metrics=None):
+        self.address = address
+        self.port = port
+        self.streams = streams
+        self.limit = limit
+        self.metrics = metrics
+        self.connections = []
+        self.in_flight = 0
+
+    def get_connections(self):
+        """The open sockets, opening them if needed"""
+        self.connections = [c for c in self.connections if not c.closed]
+        while len(self.connections) < self.streams:
+            self.connections.append(
+                PipelinedConnection(self.address, self.port, self.metrics))
+        return self.connections
+
+    def _request(self, api_name, args, parse_fn):
+        args = intFloor(args)
+        while self.in_flight >= self.limit:
+            self.poll()
+        answer = Answer(self, api_name, args, parse_fn)
+        c = min(self.get_connections(), key=lambda c: len(c.pending))
+        c.request(answer, api_name, *args)
+        self.in_flight += 1
+        return answer
+
+    def getBlock(self, *args):
+        """Answer: the block id at (x,y,z)"""
+        return self._request("world.getBlock", args, _unpack_int)
+
+    def getBlockWithData(self, *args):
+        """Answer: the Block at (x,y,z)"""
+        return self._request("world.getBlockWithData", args, _unpack_block)
+
+    def getHeight(self, *args):
+        """Answer: the y of the highest block at (x,z) that is not AIR"""
+        return self._request("world.getHeight", args, _unpack_int)
+
+    def setBlocks(self, *args):
+        """Set a cuboid of blocks; there is no answer to wait for
+
+        It is sent after the requests made before it, on the same socket.
+        """
+        self.get_connections()[0].post("world.setBlocks", *intFloor(args))
+
+    def setBlock(self, *args):
+        self.get_connections()[0].post("world.setBlock", *intFloor(args))
+
+    def get_blocks(self, c1, c2):
+        """Cuboid of block ids (indexed by (x,y,z), gives block id)"""
+        answer = Cuboid.empty(c1, c2, with_data=False)
+        for pos, blockid in self.iter_blocks(answer.keys()):
+            answer[pos] = blockid
+        return answer
+
+    def get_blocks_with_data(self, c1, c2):
+        """Cuboid of block data (indexed by (x,y,z), gives (id, data))"""
+        answer = Cuboid.empty(c1, c2)
+        for pos, b in self.iter_blocks_with_data(answer.keys()):
+            answer[pos] = b
+        return answer
+
+    def _iter_answers(self, items, api_name, parse_fn):
+        """generate (item, answer) for each item, in order, as they arrive
+
+        If the caller stops part way, the answers still to come are
+        filled in (and dropped) by later polls.
+        """
+        waiting = collections.deque()
+        for item in items:
+            waiting.append((item, self._request(api_name, item, parse_fn)))
+            while waiting and waiting[0][1].done():
+                item, answer = waiting.popleft()
+                yield item, answer.result()
+        while waiting:
+            item, answer = waiting.popleft()
+            yield item, answer.result()
+
+    def iter_blocks(self, positions):
+        """generate (pos, block id) for each (x,y,z) in positions
+
+        Like PipelinedGetter.iter_blocks: in the order of positions, as
+        they arrive, and stop iterating when you have what you want.
+        """
+        return self._iter_answers(positions, "world.getBlock", _unpack_int)
+
+    def iter_blocks_with_data(self, positions):
+        """generate (pos, (block id, block data)) for each (x,y,z) in positions
+
+        See iter_blocks.
+        """
+        return self._iter_answers(positions, "world.getBlockWithData",
+                                  _unpack_int_int)
+
+    def iter_heights(self, columns):
+        """generate ((x,z), height) for each (x,z) in columns
+
+        See iter_blocks.
+        """
+        return self._iter_answers(columns, "world.getHeight", _unpack_int)
+
+    def poll(self, timeout=None):
+        """Send and receive what the sockets allow, waiting up to timeout
+
+        Fills in the Answers that arrive.  Returns the number that did.
+        Every answer that arrived is filled in before any callback runs,
+        so a callback which raises (such as on a failed request) does
+        not lose the others; the first such exception is raised after.
+        """
+        connections = self.get_connections()
+        busy = [c for c in connections if c.pending]
+        writers = [c for c in connections if c.outbuf]
+        if not busy and not writers:
+            return 0
+        r, w, _ = select.select(busy, writers, [], timeout)
+        for c in w:
+            c.handle_write()
+        arrived = []
+        for c in r:
+            for answer, text in c.handle_read():
+                self.in_flight -= 1
+                answer._set(text)
+                arrived.append(answer)
+        error = None
+        for answer in arrived:
+            e = answer._run_callbacks()
+            if error is None:
+                error = e
+        if error is not None:
+            raise error
+        return len(arrived)
+
+    def wait(self, answers):
+        """Wait for all the answers; returns a list of their results"""
+        return [a.result() for a in answers]
+
+    def flush(self):
+        """Wait until every request has been sent and answered"""
+        while any(c.pending for c in self.connections):
+            self.poll()
+        for c in self.connections:
+            c.flush()
+
+    def close(self):
+        for c in self.connections:
+            c.close()
+        self.connections = []
+        self.in_flight = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SyncMinecraft:
+    """Blocking mc.getBlock, ... through an AsyncMinecraft
+
+    parms:
+        client: an AsyncMinecraft
+        mc: a mcpi.minecraft.Minecraft, for everything else
+            (mc.player, mc.postToChat, ...), or None
+    """
+    def __init__(self, client, mc=None):
+        self.client = client
+        self.mc = mc
+
+    def __getattr__(self, name):
+        if self.mc is None:
+            raise AttributeError(name)
+        return getattr(self.mc, name)
+
+    def getBlock(self, *args):
+        return self.client.getBlock(*args).result()
+
+    def getBlockWithData(self, *args):
+        return self.client.getBlockWithData(*args).result()
+
+    def getHeight(self, *args):
+        return self.client.getHeight(*args).result()
+
+    def setBlock(self, *args):
+        self.client.setBlock(*args)
+        self.client.flush()
+
+    def setBlocks(self, *args):
+        self.client.setBlocks(*args)
+        self.client.flush()
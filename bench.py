@@ -0,0 +1,207 @@
+#!/usr/bin/python
+
+"""Benchmark: sweep the block readers over a local fake Minecraft
+
+Runs each reader (threaded, pipelined, adaptive, async, sharded)
+against a local fake Minecraft Pi API (fakemc.py), over every
+combination of the sweep, and prints a table like the one in try1.py.
+For each reader it measures:
+    startup     seconds to make the reader and read the first block
+                (for threaded readers, mostly starting the threads,
+                and for sharded ones, the processes)
+    blocks/sec  for the best of --repeat warm reads of the area
+    p50, p99    milliseconds requests spent in the server, including
+                waiting their turn, over those reads
+    rss         how much the resident memory of this process grew, in
+                MB, while the reader ran.  Python keeps memory it has
+                freed, so a reader which needs no more than an earlier
+                one shows little growth: compare readers by running
+                them one at a time (such as with --degrees 200
+                --sockets 1 --processes 2, and no others)
+The adaptive reader (pipelined, with adaptive.AIMDController setting
+the depth) shows the depth it settled on.
+With --json, the results are also written to a file, one object per
+reader, so runs can be compared by a script.
+
+Usage:
+    python bench.py [--size 50] [--degrees 35,100,200]
+                    [--sockets 1,2,4] [--depths 200] [--processes 2,4]
+                    [--json out.json]
+    python bench.py --quick      # a small sweep, for a smoke test
+
+Note: the fake server listens on localhost:4711, like Minecraft.
+Stop Minecraft before running this, or use --port.
+"""
+
+from   mcpi.vec3 import Vec3
+import argparse
+import json
+import threading
+import timeit
+
+import adaptive
+import asyncmc
+import fakemc
+import pipeline
+import readers
+import scanner
+
+def time_it(fn, *args):
+    starttime = timeit.default_timer()
+    answer = fn(*args)
+    return timeit.default_timer() - starttime, answer
+
+def get_rss_mb():
+    """Resident memory of this process in MB, or None if unknown"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except IOError:
+        pass
+    return None
+
+def int_list(text):
+    return [int(n) for n in text.split(",")]
+
+def make_reader(config, port):
+    """A reader with get_blocks_with_data and close"""
+    if config["reader"] == "threaded":
+        return readers.ParallelGetter(port=port,
+                                      parallelism=config["degree"])
+    elif config["reader"] == "pipelined":
+        return pipeline.PipelinedGetter(port=port,
+                                        sockets=config["sockets"],
+                                        depth=config["depth"])
+    elif config["reader"] == "adaptive":
+        return pipeline.PipelinedGetter(
+            port=port, sockets=config["sockets"],
+            controller=adaptive.AIMDController())
+    elif config["reader"] == "async":
+        return asyncmc.AsyncMinecraft(port=port, streams=config["sockets"],
+                                      limit=config["sockets"] *
+                                            config["depth"])
+    elif config["reader"] == "sharded":
+        return scanner.ShardedScanner(port=port,
+                                      processes=config["degree"],
+                                      sockets=config["sockets"],
+                                      depth=config["depth"])
+    raise ValueError("unknown reader %r" % config["reader"])
+
+def sweep(args):
+    """The reader configurations to measure"""
+    configs = []
+    for degree in args.degrees:
+        configs.append({"reader": "threaded", "degree": degree,
+                        "sockets": degree, "depth": 1})
+    for sockets in args.sockets:
+        for depth in args.depths:
+            for reader in ("pipelined", "async"):
+                configs.append({"reader": reader, "degree": 1,
+                                "sockets": sockets, "depth": depth})
+        configs.append({"reader": "adaptive", "degree": 1,
+                        "sockets": sockets, "depth": 0})
+    for processes in args.processes:
+        configs.append({"reader": "sharded", "degree": processes,
+                        "sockets": 1, "depth": args.depths[0]})
+    return configs
+
+def run_one(server, config, corner1, corner2, repeat):
+    """Measure one reader; returns config with the results added"""
+    nblocks = ((corner2.x - corner1.x + 1) * (corner2.y - corner1.y + 1) *
+               (corner2.z - corner1.z + 1))
+    rss_before = get_rss_mb()
+    starttime = timeit.default_timer()
+    reader = make_reader(config, server.port)
+    try:
+        reader.get_blocks_with_data(corner1, corner1)
+        startup = timeit.default_timer() - starttime
+        del server.latencies[:]
+        best = None
+        for i in range(repeat):
+            elapsed, _ = time_it(reader.get_blocks_with_data,
+                                 corner1, corner2)
+            best = elapsed if best is None else min(best, elapsed)
+        p50, p99 = server.latency_percentiles((50, 99))
+        rss_after = get_rss_mb()
+    finally:
+        reader.close()
+    result = dict(config)
+    controller = getattr(reader, "controller", None)
+    if controller is not None:
+        result["depth"] = controller.limit // config["sockets"]
+    result.update({"blocks": nblocks, "startup": startup, "seconds": best,
+                   "blocks_per_sec": nblocks / best,
+                   "p50_ms": p50 * 1000, "p99_ms": p99 * 1000,
+                   "rss_growth_mb": None if rss_after is None else
+                                    rss_after - rss_before})
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--size", type=int, default=50,
+                        help="scan (-size..size, 8, -size..size)")
+    parser.add_argument("--degrees", type=int_list, default=[35, 100, 200],
+                        help="threads for the threaded reader")
+    parser.add_argument("--sockets", type=int_list, default=[1, 2, 4],
+                        help="connections for the pipelined and async readers")
+    parser.add_argument("--depths", type=int_list, default=[200],
+                        help="requests in flight per pipelined connection")
+    parser.add_argument("--processes", type=int_list, default=[2, 4],
+                        help="worker processes for the sharded reader")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="warm reads per reader; the best is reported")
+    parser.add_argument("--quick", action="store_true",
+                        help="a small, fast sweep")
+    parser.add_argument("--json", metavar="FILE",
+                        help="also write the results to FILE")
+    parser.add_argument("--port", type=int, default=4711)
+    parser.add_argument("--tick", type=float, default=0.05)
+    parser.add_argument("--per-tick", type=int, default=120)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--slow-chance", type=float, default=0.0,
+                        help="chance of a slow (0.3 sec) answer")
+    parser.add_argument("--seed", type=int, default=1,
+                        help="for the jitter and slow answers")
+    args = parser.parse_args()
+    if args.quick:
+        args.size, args.degrees, args.sockets, args.depths = (
+            10, [35], [1], [50])
+        args.processes = [2]
+
+    threading.stack_size(128*1024)
+    corner1 = Vec3(-args.size, 8, -args.size)
+    corner2 = Vec3( args.size, 8,  args.size)
+    server = fakemc.FakeMinecraftServer(
+        port=args.port, tick=args.tick, per_tick=args.per_tick,
+        latency=args.latency, jitter=args.jitter,
+        slow_chance=args.slow_chance, seed=args.seed).start()
+    results = []
+    try:
+        print "Getting %d blocks, server limit %d blocks/sec" % (
+            (2*args.size + 1) ** 2, args.per_tick / args.tick)
+        print ("reader    degree sockets depth startup blocks/sec"
+               "   p50ms   p99ms rss(MB)")
+        print ("--------- ------ ------- ----- ------- ----------"
+               " ------- ------- -------")
+        for config in sweep(args):
+            r = run_one(server, config, corner1, corner2, args.repeat)
+            results.append(r)
+            print "%-9s %6d %7d %5d %7.3f %10.0f %7.1f %7.1f %+7.1f" % (
+                r["reader"], r["degree"], r["sockets"], r["depth"],
+                r["startup"], r["blocks_per_sec"], r["p50_ms"], r["p99_ms"],
+                r["rss_growth_mb"] or 0)
+    finally:
+        server.stop()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"size": args.size, "tick": args.tick,
+                       "per_tick": args.per_tick, "latency": args.latency,
+                       "jitter": args.jitter,
+                       "slow_chance": args.slow_chance,
+                       "results": results}, f, indent=2, sort_keys=True)
+
+if __name__ == "__main__":
+    main()
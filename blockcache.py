@@ -0,0 +1,203 @@
+"""Memoize results from mc.getBlock
+
+A BlockCache wraps a mcpi.minecraft.Minecraft object and remembers the
+blocks it has read, so asking for the same block again costs nothing.
+Everything else (mc.player, mc.getHeight, ...) is passed through to the
+Minecraft object, so a BlockCache can be used in place of one:
+
+    mc = BlockCache(minecraft.Minecraft.create(), ttl=0.5)
+    mc.getBlock(1, 2, 3)    # asks Minecraft
+    mc.getBlock(1, 2, 3)    # cache hit
+    print mc.stats()
+
+With a getter (such as a PipelinedGetter), it can also stand in for
+one where blocks are read with get_blocks and iter_blocks, such as in
+house.find_house: the blocks it has are answered from the cache, and
+the rest are read together through the getter.
+
+Blocks written with mc.setBlock and mc.setBlocks are dropped from the
+cache.  Blocks changed by the player (or anything else) are not noticed,
+so use a ttl, or call invalidate(), when that matters.
+"""
+
+from   cuboid import Cuboid
+from   mcpi.block import Block
+from   mcpi.minecraft import intFloor
+import collections
+import timeit
+
+class BlockCache:
+    """A bounded, least-recently-used cache of block data
+
+    parms:
+        mc: a mcpi.minecraft.Minecraft object
+        maxsize: the most blocks to remember
+        ttl: seconds to remember a block, or None to remember it forever
+        getter: such as a PipelinedGetter, to read the blocks asked for
+                with get_blocks and iter_blocks, or None to read them
+                with mc.getBlock
+    Callables in on_change are called like fn(c1, c2, block) whenever a
+    cuboid is written or invalidated.  block is the (id, data) written,
+    or None if it is not known.
+    """
+    def __init__(self, mc, maxsize=10000, ttl=None, getter=None):
+        self.mc = mc
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.getter = getter
+        self.hits = 0
+        self.misses = 0
+        self.on_change = []
+        self._blocks = collections.OrderedDict()  # (x,y,z) -> [id, data, time]
+
+    def __getattr__(self, name):
+        return getattr(self.mc, name)
+
+    def _lookup(self, pos, need_data):
+        entry = self._blocks.pop(pos, None)
+        if entry is None:
+            return None
+        if self.ttl is not None and (
+                timeit.default_timer() - entry[2] > self.ttl):
+            return None
+        if need_data and entry[1] is None:
+            # We only know the id; keep it
+            self._blocks[pos] = entry
+            return None
+        self._blocks[pos] = entry   # Most recently used
+        return entry
+
+    def _store(self, pos, blockid, blockdata, now=None):
+        self._blocks.pop(pos, None)
+        self._blocks[pos] = [blockid, blockdata,
+                             timeit.default_timer() if now is None else now]
+        while len(self._blocks) > self.maxsize:
+            self._blocks.popitem(last=False)
+
+    def getBlock(self, *args):
+        """Get block (x,y,z) => id:int"""
+        pos = tuple(intFloor(args))
+        entry = self._lookup(pos, False)
+        if entry is not None:
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        blockid = self.mc.getBlock(*pos)
+        self._store(pos, blockid, None)
+        return blockid
+
+    def getBlockWithData(self, *args):
+        """Get block with data (x,y,z) => Block"""
+        pos = tuple(intFloor(args))
+        entry = self._lookup(pos, True)
+        if entry is not None:
+            self.hits += 1
+            return Block(entry[0], entry[1])
+        self.misses += 1
+        b = self.mc.getBlockWithData(*pos)
+        self._store(pos, b.id, b.data)
+        return b
+
+    def iter_blocks(self, positions):
+        """generate (pos, block id) for each (x,y,z) in positions
+
+        Like PipelinedGetter.iter_blocks, but the blocks in the cache
+        come first, and the rest are read together (through the getter,
+        if there is one) and remembered.
+        """
+        missing = []
+        for pos in positions:
+            entry = self._lookup(tuple(intFloor(pos)), False)
+            if entry is None:
+                missing.append(pos)
+            else:
+                self.hits += 1
+                yield pos, entry[0]
+        if self.getter is not None:
+            answers = self.getter.iter_blocks(missing)
+        else:
+            answers = ((pos, self.mc.getBlock(*pos)) for pos in missing)
+        for pos, blockid in answers:
+            self.misses += 1
+            self._store(tuple(intFloor(pos)), blockid, None)
+            yield pos, blockid
+
+    def get_blocks(self, c1, c2):
+        """Cuboid of block ids (indexed by (x,y,z), gives block id)
+
+        See iter_blocks.
+        """
+        answer = Cuboid.empty(c1, c2, with_data=False)
+        for pos, blockid in self.iter_blocks(answer.keys()):
+            answer[pos] = blockid
+        return answer
+
+    def update(self, blocks):
+        """Remember blocks read some other way
+
+        parms:
+            blocks: map from (x,y,z) to (block id, block data), or to
+                    block id, such as a Cuboid from get_blocks_in_parallel
+        """
+        now = timeit.default_timer()
+        for pos, b in blocks.items():
+            if isinstance(b, tuple):
+                self._store(pos, b[0], b[1], now)
+            else:
+                self._store(pos, b, None, now)
+
+    def setBlock(self, *args):
+        """Set block (x,y,z,id,[data]), and forget the old block"""
+        a = intFloor(args)
+        self.mc.setBlock(*a)
+        self.wrote(a[0:3], a[0:3], *a[3:5])
+
+    def setBlocks(self, *args):
+        """Set a cuboid of blocks (x0,y0,z0,x1,y1,z1,id,[data]),
+        and forget the old blocks"""
+        a = intFloor(args)
+        self.mc.setBlocks(*a)
+        self.wrote(a[0:3], a[3:6], *a[6:8])
+
+    def wrote(self, c1, c2, blockid, blockdata=0):
+        """Forget a cuboid that was set to one block some other way,
+        such as by a BulkWriter"""
+        c1 = tuple(intFloor(c1))
+        c2 = tuple(intFloor(c2))
+        self._forget(c1, c2)
+        for fn in self.on_change:
+            fn(c1, c2, (blockid, blockdata))
+
+    def invalidate(self, c1, c2=None):
+        """Forget the blocks in a cuboid (or at one position, c1)"""
+        c1 = tuple(intFloor(c1))
+        c2 = c1 if c2 is None else tuple(intFloor(c2))
+        self._forget(c1, c2)
+        for fn in self.on_change:
+            fn(c1, c2, None)
+
+    def _forget(self, c1, c2):
+        (x1, x2), (y1, y2), (z1, z2) = [sorted(p) for p in zip(c1, c2)]
+        volume = (x2-x1+1) * (y2-y1+1) * (z2-z1+1)
+        if volume < len(self._blocks):
+            for x in xrange(x1, x2+1):
+                for y in xrange(y1, y2+1):
+                    for z in xrange(z1, z2+1):
+                        self._blocks.pop((x, y, z), None)
+        else:
+            for pos in self._blocks.keys():
+                if (x1 <= pos[0] <= x2 and y1 <= pos[1] <= y2 and
+                        z1 <= pos[2] <= z2):
+                    del self._blocks[pos]
+
+    def clear(self):
+        """Forget everything"""
+        self._blocks.clear()
+
+    def stats(self):
+        """Hit and miss counts.  Each hit is a round trip saved."""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._blocks),
+                "hit_rate": float(self.hits) / lookups if lookups else 0.0}
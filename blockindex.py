@@ -0,0 +1,180 @@
+"""Find the nearest LEAVES (or TORCH, or ...) without asking Minecraft
+
+A BlockIndex remembers the blocks of the regions it has been given
+(Cuboids, such as from a PipelinedGetter), in chunks of 16x16x16.
+Each chunk keeps its block ids in an array, and the index keeps a
+table of the chunks which hold each block id, so a query only looks
+inside the chunks that have the blocks it wants, nearest chunks first:
+
+    index = BlockIndex()
+    index.add(getter.get_blocks(c1, c2))
+    index.watch(mc)                 # mc is a BlockCache; follow its writes
+    tree = index.nearest(block.LEAVES.id, mc.player.getTilePos())
+    torches = index.in_box(block.TORCH.id, p - Vec3(1,1,1), p + Vec3(1,1,1))
+
+Blocks outside the regions given are unknown, and are never found.
+"""
+
+from   mcpi.vec3 import Vec3
+from   cuboid import block_pos, normalize_corners
+import collections
+import numpy
+
+CHUNK = 16     # chunk size along each axis
+
+class _Chunk:
+    """The blocks of one chunk; ids are only meaningful where known"""
+    def __init__(self):
+        self.ids = numpy.zeros((CHUNK, CHUNK, CHUNK), numpy.uint8)
+        self.known = numpy.zeros((CHUNK, CHUNK, CHUNK), bool)
+        self.present = set()   # block ids in the chunk
+
+
+def _ids_mask(blockids):
+    mask = numpy.zeros(256, bool)
+    if isinstance(blockids, (int, long)):
+        mask[blockids] = True
+    else:
+        mask[list(blockids)] = True
+    return mask
+
+def _corners(c1, c2):
+    return zip(*normalize_corners(c1, c2))
+
+def _gen_chunk_parts(c1, c2):
+    """generate (chunk key, slices in the chunk, slices in the cuboid)"""
+    (x1, x2), (y1, y2), (z1, z2) = _corners(c1, c2)
+    for cx in xrange(x1 // CHUNK, x2 // CHUNK + 1):
+        for cy in xrange(y1 // CHUNK, y2 // CHUNK + 1):
+            for cz in xrange(z1 // CHUNK, z2 // CHUNK + 1):
+                inner, outer = [], []
+                for c, lo, hi in ((cx, x1, x2), (cy, y1, y2), (cz, z1, z2)):
+                    a = max(lo, c * CHUNK)
+                    b = min(hi, c * CHUNK + CHUNK - 1)
+                    inner.append(slice(a - c * CHUNK, b - c * CHUNK + 1))
+                    outer.append(slice(a - lo, b - lo + 1))
+                yield (cx, cy, cz), tuple(inner), tuple(outer)
+
+
+class BlockIndex:
+    """Block ids of the loaded regions, by chunk, for fast searches"""
+    def __init__(self):
+        self.chunks = {}   # (cx, cy, cz) -> _Chunk
+        self.by_id = collections.defaultdict(set)  # block id -> chunk keys
+
+    def _update(self, key, chunk):
+        """Bring by_id up to date with a changed chunk"""
+        present = set(numpy.unique(chunk.ids[chunk.known]).tolist())
+        for blockid in chunk.present - present:
+            self.by_id[blockid].discard(key)
+        for blockid in present - chunk.present:
+            self.by_id[blockid].add(key)
+        chunk.present = present
+        if not present:
+            del self.chunks[key]
+
+    def _keys_with(self, blockids):
+        if isinstance(blockids, (int, long)):
+            return self.by_id.get(blockids, set())
+        return set().union(*[self.by_id.get(b, set()) for b in blockids])
+
+    def add(self, cuboid):
+        """Remember the blocks of a Cuboid"""
+        c1, c2 = cuboid.corners
+        for key, inner, outer in _gen_chunk_parts(c1, c2):
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                chunk = self.chunks[key] = _Chunk()
+            chunk.ids[inner] = cuboid.ids[outer]
+            chunk.known[inner] = True
+            self._update(key, chunk)
+
+    def set(self, c1, c2, blockid):
+        """Record that a cuboid was set to blockid"""
+        for key, inner, outer in _gen_chunk_parts(c1, c2):
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                chunk = self.chunks[key] = _Chunk()
+            chunk.ids[inner] = blockid
+            chunk.known[inner] = True
+            self._update(key, chunk)
+
+    def forget(self, c1, c2=None):
+        """Make the blocks of a cuboid (or at one position) unknown"""
+        c2 = c1 if c2 is None else c2
+        for key, inner, outer in _gen_chunk_parts(c1, c2):
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                continue
+            chunk.known[inner] = False
+            self._update(key, chunk)
+
+    def on_change(self, c1, c2, b):
+        """Follow a write; the arguments match BlockCache.on_change"""
+        if b is None:
+            self.forget(c1, c2)
+        else:
+            self.set(c1, c2, b[0])
+
+    def watch(self, cache):
+        """Follow the writes made through a BlockCache"""
+        cache.on_change.append(self.on_change)
+
+    def get(self, pos):
+        """The block id at pos, or None if it is not known"""
+        x, y, z = block_pos(pos)
+        chunk = self.chunks.get((x // CHUNK, y // CHUNK, z // CHUNK))
+        i, j, k = x % CHUNK, y % CHUNK, z % CHUNK
+        if chunk is None or not chunk.known[i, j, k]:
+            return None
+        return int(chunk.ids[i, j, k])
+
+    def _matches(self, chunk, mask, inner=Ellipsis):
+        """Positions in a chunk, relative to it, of the wanted blocks"""
+        return numpy.argwhere(mask[chunk.ids[inner]] & chunk.known[inner])
+
+    def in_box(self, blockids, c1, c2):
+        """World positions of the blocks with these ids in a cuboid,
+        as an (N,3) array"""
+        mask = _ids_mask(blockids)
+        keys = self._keys_with(blockids)
+        found = [numpy.zeros((0, 3), int)]
+        for key, inner, outer in _gen_chunk_parts(c1, c2):
+            if key not in keys:
+                continue
+            chunk = self.chunks[key]
+            start = [k * CHUNK + s.start for k, s in zip(key, inner)]
+            found.append(self._matches(chunk, mask, inner) + start)
+        return numpy.concatenate(found)
+
+    def nearest(self, blockids, pos, max_distance=None):
+        """The position of the nearest block with one of these ids
+
+        Returns a Vec3, or None if there is none known (within
+        max_distance, if given).
+        """
+        mask = _ids_mask(blockids)
+        p = numpy.array([float(pos.x), float(pos.y), float(pos.z)])
+        keys = list(self._keys_with(blockids))
+        if not keys:
+            return None
+        # Closest possible distance (squared) to anything in each chunk
+        lo = numpy.array(keys) * CHUNK
+        d = numpy.maximum(0, numpy.maximum(lo - p, p - (lo + CHUNK - 1)))
+        bounds = (d * d).sum(axis=1)
+        limit = float("inf") if max_distance is None else max_distance ** 2
+        best = None
+        for n in bounds.argsort():
+            if bounds[n] > limit:
+                break
+            key = keys[n]
+            positions = self._matches(self.chunks[key], mask) + (
+                numpy.array(key) * CHUNK)
+            d = ((positions - p) ** 2).sum(axis=1)
+            i = int(d.argmin())
+            if d[i] <= limit:
+                limit = float(d[i])
+                best = positions[i]
+        if best is None:
+            return None
+        return Vec3(*[int(n) for n in best])
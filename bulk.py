@@ -0,0 +1,187 @@
+"""Write a cuboid of blocks with a few world.setBlocks calls
+
+Give a BulkWriter the blocks you want (a Cuboid) and it compares them
+with what is there now (a Cuboid you already have, or one it reads),
+then covers the blocks that differ with as few axis-aligned boxes as
+it can find, one world.setBlocks per box.  The number of calls depends
+on the shape of the change, not its volume: clearing a 100x100x100
+area is one call.
+
+The reads and the writes share the sockets of a PipelinedGetter.
+world.setBlocks has no answer, so the writes are just written to the
+socket, and do not upset the matching of answers to reads.
+
+Example:
+    writer = BulkWriter()
+    house = writer.read(c1, c2)
+    house.ids[:] = block.AIR.id
+    boxes = writer.write(house)    # clear it
+    writer.close()
+"""
+
+from   pipeline import PipelinedGetter
+import numpy
+import select
+
+def plan_boxes(desired, current):
+    """The boxes to set, to change current into desired
+
+    parms:
+        desired, current: Cuboids with the same origin and shape
+    returns:
+        list of (x1, y1, z1, x2, y2, z2, block id, block data),
+        in world coordinates, like the arguments of world.setBlocks
+    A box may also cover blocks which are already what they should be,
+    when that saves a box.  The boxes are found greedily, so there may
+    be a smaller set, but a box never grows past a block which would
+    be set wrongly.
+    """
+    if desired.shape != current.shape or (
+            tuple(desired.origin) != tuple(current.origin)):
+        raise ValueError("desired and current are not the same cuboid")
+    changed = desired.ids != current.ids
+    want_data = desired.data if desired.data is not None else (
+        numpy.zeros(desired.shape, numpy.uint8))
+    if current.data is not None:
+        changed |= want_data != current.data
+    # Each kind of block is covered separately
+    key = desired.ids.astype(numpy.uint16) * 256 + want_data
+    ox, oy, oz = desired.origin
+    boxes = []
+    for k in numpy.unique(key[changed]):
+        allowed = key == k
+        for (x1, y1, z1), (x2, y2, z2) in _cover(changed & allowed, allowed):
+            boxes.append((ox+x1, oy+y1, oz+z1, ox+x2, oy+y2, oz+z2,
+                          int(k) // 256, int(k) % 256))
+    return boxes
+
+def _cover(must, allowed):
+    """Greedily cover the True cells of must with boxes of allowed cells
+
+    Each box starts at the first uncovered cell, and grows as far as it
+    can along z, then y, then x.  Returns a list of ((i1,j1,k1),(i2,j2,k2))
+    array index corners.
+    """
+    must = must.copy()
+    nx, ny, nz = must.shape
+    boxes = []
+    for i, j, k in numpy.argwhere(must):
+        if not must[i, j, k]:
+            continue   # Covered by an earlier box
+        run = allowed[i, j, k:]
+        k2 = k + (len(run) if run.all() else int(numpy.argmin(run))) - 1
+        j2 = j
+        while j2+1 < ny and allowed[i, j2+1, k:k2+1].all():
+            j2 += 1
+        i2 = i
+        while i2+1 < nx and allowed[i2+1, j:j2+1, k:k2+1].all():
+            i2 += 1
+        must[i:i2+1, j:j2+1, k:k2+1] = False
+        boxes.append(((i, j, k), (i2, j2, k2)))
+    return boxes
+
+def estimate(boxes, requests_per_sec=2400.0):
+    """What sending boxes costs: calls, blocks set, and seconds
+
+    The seconds assume the game takes setBlocks requests at the rate
+    it answers getBlock (see try1.py).
+    """
+    blocks = sum((b[3]-b[0]+1) * (b[4]-b[1]+1) * (b[5]-b[2]+1)
+                 for b in boxes)
+    return {"calls": len(boxes), "blocks": blocks,
+            "seconds": len(boxes) / requests_per_sec}
+
+
+class BulkWriter:
+    """Read and write cuboids of blocks over pipelined sockets
+
+    parms:
+        getter: a PipelinedGetter to share, or None for a new one
+        cache: a BlockCache to tell about the writes, or None
+        index: a BlockIndex to add the reads to, and tell about the
+               writes, or None
+        heightmap: a Heightmap to tell about the writes, or None
+                   (not needed if it watches the cache)
+    """
+    def __init__(self, getter=None, cache=None, index=None, heightmap=None):
+        self.getter = getter if getter is not None else PipelinedGetter()
+        self.cache = cache
+        self.index = index
+        self.heightmap = heightmap
+
+    def read(self, c1, c2):
+        """A Cuboid of the blocks there now"""
+        blocks = self.getter.get_blocks_with_data(c1, c2)
+        if self.index is not None:
+            self.index.add(blocks)
+        return blocks
+
+    def write(self, desired, current=None, dry_run=False):
+        """Make the world look like desired
+
+        parms:
+            desired: a Cuboid of the blocks wanted
+            current: a Cuboid of the blocks there now, or None to read them
+            dry_run: plan the boxes, but do not set them
+        returns:
+            the boxes, as from plan_boxes
+        """
+        if current is None:
+            c1, c2 = desired.corners
+            current = self.read(c1, c2)
+        boxes = plan_boxes(desired, current)
+        if not dry_run:
+            self.send_boxes(boxes)
+        return boxes
+
+    def send_boxes(self, boxes, window=None, progress=None):
+        """Send world.setBlocks for each box
+
+        They all go on the first socket, so they are done in order.
+        parms:
+            boxes: such as from plan_boxes
+            window: None to write them all straight away, or the most
+                    boxes to have sent and not yet done.  Each box is
+                    followed by a world.getBlock, whose answer means the
+                    game has done the box, so a big job goes at the
+                    game's pace instead of flooding it.
+            progress: None, or called as progress(boxes done, len(boxes))
+                      as they are done (with a window) or sent
+        """
+        connection = self.getter.get_connections()[0]
+        done = 0
+        for n, box in enumerate(boxes):
+            connection.post("world.setBlocks", *box)
+            if self.cache is not None:
+                self.cache.wrote(box[0:3], box[3:6], box[6], box[7])
+            if self.index is not None:
+                self.index.set(box[0:3], box[3:6], box[6])
+            if self.heightmap is not None:
+                self.heightmap.wrote(box[0:3], box[3:6], box[6:8])
+            if window is None:
+                continue
+            connection.request(n, "world.getBlock", *box[0:3])
+            while len(connection.pending) >= window:
+                done += self._wait_for_boxes(connection, len(boxes), done,
+                                             progress)
+        if window is None:
+            connection.flush()
+            if progress is not None and boxes:
+                progress(len(boxes), len(boxes))
+        while connection.pending:
+            done += self._wait_for_boxes(connection, len(boxes), done,
+                                         progress)
+
+    @staticmethod
+    def _wait_for_boxes(connection, total, done, progress):
+        """Wait for answers; returns the number of boxes they say are done"""
+        select.select([connection], [connection] if connection.outbuf
+                      else [], [])
+        connection.handle_write()
+        n = len(connection.handle_read())
+        if n and progress is not None:
+            progress(done + n, total)
+        return n
+
+    def close(self):
+        self.getter.close()
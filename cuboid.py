@@ -0,0 +1,173 @@
+"""Block data for a cuboid, held in NumPy arrays
+
+A dict from (x,y,z) to (id, data) costs a few hundred bytes per block.
+A Cuboid keeps the block ids and block data in two dense uint8 arrays
+(2 bytes per block) plus the world position of its low corner, so large
+regions fit in memory and can be searched with array operations.
+
+Indexing is by world coordinate, like the dicts it replaces:
+    blks = get_blocks_in_parallel(Vec3(-50, 8, -50), Vec3(50, 8, 50))
+    blockid, blockdata = blks[(3, 8, -7)]
+Slices are in world coordinates too (so -5:5 means x = -5 .. 4, not
+counting from the end), and give a Cuboid which shares the arrays:
+    row = blks[-50:51, 8, 0]      # a row of blocks along x
+    blks.where(block.AIR.id)      # world positions of the air blocks
+"""
+
+from   mcpi.minecraft import intFloor
+from   mcpi.vec3 import Vec3
+import numpy
+
+def block_pos(pos):
+    """The (x,y,z) of the block pos is in
+
+    Coordinates which are not whole numbers are rounded down (intFloor),
+    not toward zero: x = -0.5 is in block -1.
+    """
+    return tuple(intFloor(pos))
+
+def normalize_corners(c1, c2):
+    """The low and high corners (Vec3) of the blocks from c1 to c2"""
+    (x1, x2), (y1, y2), (z1, z2) = [
+        sorted(p) for p in zip(block_pos(c1), block_pos(c2))]
+    return Vec3(x1, y1, z1), Vec3(x2, y2, z2)
+
+class Cuboid:
+    """Block ids and block data for a cuboid
+
+    ids[i,j,k] and data[i,j,k] are the block at world position
+    (origin.x+i, origin.y+j, origin.z+k).
+    data is None when only the block ids were read (world.getBlock);
+    then indexing a single block gives the id instead of (id, data).
+    """
+    def __init__(self, origin, ids, data=None):
+        self.origin = Vec3(*block_pos(origin))
+        self.ids = ids
+        self.data = data
+
+    @classmethod
+    def empty(cls, c1, c2, with_data=True):
+        """A cuboid of AIR with corners c1 and c2 (see normalize_corners)"""
+        lo, hi = normalize_corners(c1, c2)
+        shape = tuple(b - a + 1 for a, b in zip(lo, hi))
+        return cls(lo,
+                   numpy.zeros(shape, numpy.uint8),
+                   numpy.zeros(shape, numpy.uint8) if with_data else None)
+
+    @classmethod
+    def from_dict(cls, blocks):
+        """Convert a map from (x,y,z) to (block id, block data)"""
+        keys = numpy.array(blocks.keys()).reshape(-1, 3)
+        c1, c2 = Vec3(*keys.min(axis=0)), Vec3(*keys.max(axis=0))
+        answer = cls.empty(c1, c2)
+        for pos, b in blocks.items():
+            answer[pos] = b
+        return answer
+
+    @property
+    def shape(self):
+        return self.ids.shape
+
+    @property
+    def size(self):
+        return self.ids.size
+
+    @property
+    def corners(self):
+        """The low and high corners, as Vec3"""
+        return self.origin, self.origin + Vec3(*[n-1 for n in self.shape])
+
+    def __len__(self):
+        return self.ids.size
+
+    def _index(self, pos):
+        """Convert world coordinates (ints or slices) to array indexes"""
+        if len(pos) != 3:
+            raise KeyError(pos)
+        index = []
+        for p, o, n in zip(pos, self.origin, self.shape):
+            if isinstance(p, slice):
+                if p.step not in (None, 1):
+                    raise KeyError("Cuboid slices cannot have a step")
+                start = 0 if p.start is None else max(0, p.start - o)
+                stop = n if p.stop is None else min(n, max(0, p.stop - o))
+                index.append(slice(start, stop))
+            else:
+                i = int(p) - o
+                if not 0 <= i < n:
+                    raise KeyError(pos)
+                index.append(i)
+        return tuple(index)
+
+    def __contains__(self, pos):
+        try:
+            self._index(pos)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __getitem__(self, pos):
+        index = self._index(pos)
+        if not any(isinstance(i, slice) for i in index):
+            if self.data is None:
+                return int(self.ids[index])
+            return int(self.ids[index]), int(self.data[index])
+        # Keep all three dimensions, so world coordinates still work
+        index = tuple(i if isinstance(i, slice) else slice(i, i+1)
+                      for i in index)
+        origin = Vec3(*[o + i.start for o, i in zip(self.origin, index)])
+        return Cuboid(origin, self.ids[index],
+                      None if self.data is None else self.data[index])
+
+    def __setitem__(self, pos, value):
+        index = self._index(pos)
+        if isinstance(value, tuple):
+            self.ids[index] = value[0]
+            if self.data is not None:
+                self.data[index] = value[1]
+        else:
+            self.ids[index] = value
+
+    def __iter__(self):
+        return self.keys()
+
+    def keys(self):
+        """generate the (x,y,z) of every block"""
+        ox, oy, oz = self.origin
+        for i, j, k in numpy.ndindex(*self.shape):
+            yield (ox+i, oy+j, oz+k)
+
+    def items(self):
+        """generate ((x,y,z), block), like dict.items()"""
+        for pos in self.keys():
+            yield pos, self[pos]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def _mask(self, blockids):
+        """Boolean array: where the block id is one of blockids"""
+        if isinstance(blockids, (int, long)):
+            return self.ids == blockids
+        return numpy.in1d(self.ids, list(blockids)).reshape(self.shape)
+
+    def where(self, blockids):
+        """World positions of the blocks with these ids, as an (N,3) array"""
+        return numpy.argwhere(self._mask(blockids)) + tuple(self.origin)
+
+    def count(self, blockids):
+        return int(numpy.count_nonzero(self._mask(blockids)))
+
+    def first(self, blockids, axis="x", reverse=False):
+        """Find the first block with one of these ids along a line of blocks
+
+        The cuboid must be a line along the axis ("x", "y" or "z").
+        Returns the world coordinate along the axis, or None.
+        """
+        a = "xyz".index(axis)
+        if self.size != self.shape[a]:
+            raise ValueError("Cuboid is not a line along %s" % axis)
+        hits = numpy.flatnonzero(self._mask(blockids))
+        if not len(hits):
+            return None
+        return tuple(self.origin)[a] + int(hits[-1] if reverse else hits[0])
@@ -0,0 +1,295 @@
+"""A local stand-in for the Minecraft Pi API, for benchmarks
+
+It speaks the same text protocol as the game on port 4711
+(like "world.getBlockWithData(1,2,3)\\n" answered by "2,0\\n")
+over an in-memory world, so the readers can be measured without a Pi.
+It knows world.getBlock, world.getBlockWithData, world.setBlock,
+world.setBlocks, world.getHeight, player.getPos, player.setPos,
+player.getTile, player.setTile, events.block.hits, events.clear and
+chat.post.  Anything else is answered "Fail".
+
+The game answers requests in its game loop, not as they arrive.
+To mimic the measurements in try1.py (each thread gets 15 to 25
+blocks/sec, and the game tops out at about 2400 blocks/sec)
+the server answers requests once per tick, and answers at most
+per_tick requests per tick over all connections.  On top of that,
+each answer can be held back by a fixed latency plus random jitter,
+and now and then (slow_chance) by slow_time, like the blocks in
+try1.py which "take much longer to fetch, about 0.3 sec".  Answers on
+a connection are always sent in order, so a slow answer holds up the
+ones behind it.
+
+Example:
+    server = FakeMinecraftServer(port=4711, slow_chance=0.001)
+    server.start()
+    ...
+    print server.latency_percentiles()
+    server.stop()
+"""
+
+import collections
+import errno
+import random
+import select
+import socket
+import threading
+import time
+import mcpi.block as block
+
+class FakeWorld:
+    """An in-memory world: a flat field of grass, surrounded by bedrock"""
+    def __init__(self, xmin=-128, xmax=127, ymin=-64, ymax=63,
+                 zmin=-128, zmax=127):
+        self.xmin, self.xmax = xmin, xmax
+        self.ymin, self.ymax = ymin, ymax
+        self.zmin, self.zmax = zmin, zmax
+        self.blocks = {}   # (x,y,z) -> (id, data), where it was set
+        self.columns = {}  # (x,z) -> highest y that was set
+        self.player = [0.5, 1.0, 0.5]
+        self.hits = []     # (x, y, z, face, entity id), not yet polled
+
+    def get(self, x, y, z):
+        if not (self.xmin <= x <= self.xmax and
+                self.ymin <= y <= self.ymax and
+                self.zmin <= z <= self.zmax):
+            return (block.BEDROCK_INVISIBLE.id, 0)
+        b = self.blocks.get((x, y, z))
+        if b is not None:
+            return b
+        if y == self.ymin:  return (block.BEDROCK.id, 0)
+        if y <  -1:         return (block.STONE.id, 0)
+        if y == -1:         return (block.DIRT.id, 0)
+        if y ==  0:         return (block.GRASS.id, 0)
+        return (block.AIR.id, 0)
+
+    def set(self, x, y, z, blockid, blockdata=0):
+        self.blocks[(x, y, z)] = (blockid, blockdata)
+        self.columns[(x, z)] = max(y, self.columns.get((x, z), y))
+
+    def height(self, x, z):
+        """The y of the highest block that is not AIR"""
+        for y in xrange(max(0, self.columns.get((x, z), 0)), self.ymin, -1):
+            if self.get(x, y, z)[0] != block.AIR.id:
+                return y
+        return self.ymin
+
+    def hit(self, x, y, z, face=1, entity=1):
+        """Pretend the player hit a block with a sword"""
+        self.hits.append((x, y, z, face, entity))
+
+
+class _Client:
+    """A connection, with its unanswered requests and unsent answers"""
+    def __init__(self, sock):
+        self.socket = sock
+        self.socket.setblocking(0)
+        self.inbuf = ""
+        self.requests = collections.deque()  # (arrival time, request)
+        self.answers = collections.deque()   # (send time, arrival time, text)
+        self.outbuf = ""
+        self.last_send = 0.0
+
+
+class FakeMinecraftServer:
+    """Serve a FakeWorld on a socket, from a background thread
+
+    parms:
+        tick: seconds between the times requests are answered
+        per_tick: the most requests answered each tick
+        latency: seconds to hold back every answer
+        jitter: up to this many more seconds, at random
+        slow_chance: the chance that an answer is slow
+        slow_time: how much longer a slow answer takes
+        seed: for the random jitter and slow answers
+    latencies holds the seconds each answered request spent in the
+    server, from arriving to being sent.
+    """
+    def __init__(self, address="localhost", port=4711, world=None,
+                 tick=0.05, per_tick=120, latency=0.0, jitter=0.0,
+                 slow_chance=0.0, slow_time=0.3, seed=None):
+        self.address = address
+        self.port = port
+        self.world = world if world is not None else FakeWorld()
+        self.tick = tick
+        self.per_tick = per_tick
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_chance = slow_chance
+        self.slow_time = slow_time
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.latencies = []
+        self._thread = None
+        self._stopping = False
+
+    def start(self):
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind((self.address, self.port))
+        self._listener.listen(512)
+        self._stopping = False
+        self._thread = threading.Thread(target=self._serve)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping = True
+        self._thread.join()
+        self._listener.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def latency_percentiles(self, percentiles=(50, 99)):
+        """Percentiles of latencies, in seconds"""
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return [0.0 for p in percentiles]
+        return [ordered[min(len(ordered) - 1, len(ordered) * p // 100)]
+                for p in percentiles]
+
+    def handle(self, line):
+        """Return the answer to one request, or None if it has none"""
+        try:
+            return self._handle(line)
+        except (ValueError, TypeError):
+            return "Fail"
+
+    def _handle(self, line):
+        name, _, args = line.partition("(")
+        args = args.rstrip(")")
+        args = args.split(",") if args else []
+        world = self.world
+        if name == "world.getBlock":
+            x, y, z = map(int, args)
+            return str(world.get(x, y, z)[0])
+        if name == "world.getBlockWithData":
+            x, y, z = map(int, args)
+            return "%d,%d" % world.get(x, y, z)
+        if name == "world.getHeight":
+            x, z = map(int, args)
+            return str(world.height(x, z))
+        if name == "world.setBlock":
+            x, y, z = map(int, args[:3])
+            world.set(x, y, z, *map(int, args[3:5]))
+            return None
+        if name == "world.setBlocks":
+            x1, x2 = sorted(map(int, args[0:4:3]))
+            y1, y2 = sorted(map(int, args[1:5:3]))
+            z1, z2 = sorted(map(int, args[2:6:3]))
+            b = map(int, args[6:8])
+            for x in xrange(x1, x2+1):
+                for y in xrange(y1, y2+1):
+                    for z in xrange(z1, z2+1):
+                        world.set(x, y, z, *b)
+            return None
+        if name == "player.getPos":
+            return "%r,%r,%r" % tuple(world.player)
+        if name == "player.getTile":
+            return "%d,%d,%d" % tuple(int(v // 1) for v in world.player)
+        if name in ("player.setPos", "player.setTile"):
+            x, y, z = map(float, args[-3:])
+            world.player = [x, y, z]
+            return None
+        if name == "events.block.hits":
+            hits, world.hits = world.hits, []
+            return "|".join(",".join(map(str, h)) for h in hits)
+        if name == "events.clear":
+            world.hits = []
+            return None
+        if name == "chat.post":
+            return None
+        return "Fail"
+
+    def _serve(self):
+        clients = {}   # socket -> _Client
+        next_tick = time.time() + self.tick
+        while not self._stopping:
+            wake = next_tick
+            for c in clients.values():
+                if c.answers:
+                    wake = min(wake, c.answers[0][0])
+            writers = [s for s, c in clients.items() if c.outbuf]
+            r, w, _ = select.select([self._listener] + clients.keys(),
+                                    writers, [], max(0, wake - time.time()))
+            now = time.time()
+            for s in r:
+                if s is self._listener:
+                    conn, _ = s.accept()
+                    clients[conn] = _Client(conn)
+                    continue
+                try:
+                    data = s.recv(65536)
+                except socket.error:
+                    data = ""
+                if not data:
+                    s.close()
+                    del clients[s]
+                    continue
+                c = clients[s]
+                lines = (c.inbuf + data).split("\n")
+                c.inbuf = lines.pop()
+                c.requests.extend((now, line) for line in lines)
+            if now >= next_tick:
+                next_tick += self.tick
+                self._answer_tick(clients.values(), now)
+            self._send_answers(clients, now)
+        for s in clients:
+            s.close()
+
+    def _answer_tick(self, clients, now):
+        """Answer up to per_tick requests, round robin over connections"""
+        budget = self.per_tick
+        while budget > 0:
+            progress = False
+            for c in clients:
+                if budget <= 0:
+                    break
+                if not c.requests:
+                    continue
+                arrival, line = c.requests.popleft()
+                ans = self.handle(line)
+                budget -= 1
+                self.requests += 1
+                progress = True
+                if ans is None:
+                    continue
+                delay = self.latency + self.random.uniform(0, self.jitter)
+                if self.random.random() < self.slow_chance:
+                    delay += self.slow_time
+                # Answers leave in order, so wait for a slow one ahead
+                c.last_send = max(c.last_send, now + delay)
+                c.answers.append((c.last_send, arrival, ans + "\n"))
+            if not progress:
+                break
+
+    def _send_answers(self, clients, now):
+        """Send the answers which are due, as far as the sockets allow"""
+        for s, c in clients.items():
+            while c.answers and c.answers[0][0] <= now:
+                send_time, arrival, text = c.answers.popleft()
+                c.outbuf += text
+                self.latencies.append(now - arrival)
+            if not c.outbuf:
+                continue
+            try:
+                n = s.send(c.outbuf)
+                c.outbuf = c.outbuf[n:]
+            except socket.error as e:
+                if e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK,
+                                   errno.EPIPE, errno.ECONNRESET):
+                    raise
+
+
+if __name__ == "__main__":
+    print "Fake Minecraft Pi API on port 4711.  Press Ctrl-C to stop."
+    server = FakeMinecraftServer().start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,134 @@
+"""Determine ground level (not Minecraft.getHeight)
+
+mc.getHeight gives the highest block that is not AIR, which may be the
+top of a tree, a torch, or a flower.  Ground level is the highest block
+you can stand on.  A Heightmap finds it for every column in an area,
+and keeps it in a 2D array, so asking is a lookup, not a round trip:
+
+    hm = Heightmap(getter, Vec3(-50, -64, -50), Vec3(50, 63, 50))
+    hm.refresh()                    # the first time, reads every column
+    hm.watch(mc)                    # mc is a BlockCache
+    print hm.ground_at(3, -7)
+    mc.setBlocks(...)               # updates the columns it touches
+    hm.refresh()                    # reads only the dirty columns
+
+Each column starts at mc.getHeight (nothing above it can be ground),
+then reads downwards while the blocks are not ground.  All the columns
+are read together, a layer at a time, through pipelined sockets.
+"""
+
+from   mcpi.vec3 import Vec3
+from   cuboid import block_pos, normalize_corners
+import mcpi.block as block
+import numpy
+
+# Blocks you cannot stand on (you fall or swim through them)
+NOT_GROUND = frozenset(b.id for b in (
+    block.AIR, block.SAPLING, block.WATER_FLOWING, block.WATER_STATIONARY,
+    block.LAVA_FLOWING, block.LAVA_STATIONARY, block.LEAVES, block.COBWEB,
+    block.GRASS_TALL, block.FLOWER_YELLOW, block.FLOWER_CYAN,
+    block.MUSHROOM_BROWN, block.MUSHROOM_RED, block.TORCH, block.FIRE,
+    block.LADDER, block.SNOW, block.SUGAR_CANE))
+
+# Ground level of a column with no ground at all
+NO_GROUND = -32768
+
+class Heightmap:
+    """The ground level of every column in an area
+
+    parms:
+        getter: a PipelinedGetter
+        c1, c2: the corners of the area; the y values give the range
+                of heights to look at
+    ground[i, k] is the ground level of column (x1+i, z1+k), or NO_GROUND.
+    dirty[i, k] is True if that column needs to be read again.
+    """
+    def __init__(self, getter, c1, c2):
+        self.getter = getter
+        (x1, y1, z1), (x2, y2, z2) = normalize_corners(c1, c2)
+        self.origin = Vec3(x1, y1, z1)
+        self.ytop = y2
+        shape = (x2 - x1 + 1, z2 - z1 + 1)
+        self.ground = numpy.empty(shape, numpy.int16)
+        self.ground[:] = NO_GROUND
+        self.dirty = numpy.ones(shape, bool)
+        self.requests = 0     # round trips spent by refresh
+
+    def ground_at(self, x, z):
+        """The ground level at (x, z), as of the last refresh
+
+        x and z may be player coordinates, such as from getPos: they are
+        rounded down to the column they are in, as mc.getHeight does.
+        """
+        x, y, z = block_pos((x, 0, z))
+        return int(self.ground[x - self.origin.x, z - self.origin.z])
+
+    def mark_dirty(self, c1, c2=None, b=None):
+        """Read the columns of a cuboid again on the next refresh
+
+        The arguments match BlockCache.on_change.
+        """
+        (x1, y1, z1), (x2, y2, z2) = normalize_corners(
+            c1, c1 if c2 is None else c2)
+        x1, x2 = x1 - self.origin.x, x2 - self.origin.x
+        z1, z2 = z1 - self.origin.z, z2 - self.origin.z
+        self.dirty[max(x1, 0):max(x2+1, 0), max(z1, 0):max(z2+1, 0)] = True
+
+    def wrote(self, c1, c2=None, b=None):
+        """Update the columns of a cuboid set to block b, (id, data)
+
+        Setting ground raises the ground level of the columns it is
+        above; setting AIR (or anything not ground) over the ground
+        leaves the ground below unknown, so those columns are marked
+        dirty.  Columns it does not change are left alone, so most of a
+        big clear or fill costs no reads.  The arguments match
+        BlockCache.on_change; with b None, it is mark_dirty.
+        """
+        if b is None:
+            self.mark_dirty(c1, c2)
+            return
+        (x1, y1, z1), (x2, y2, z2) = normalize_corners(
+            c1, c1 if c2 is None else c2)
+        nx, nz = self.ground.shape
+        x1, x2 = max(x1 - self.origin.x, 0), min(x2 - self.origin.x + 1, nx)
+        z1, z2 = max(z1 - self.origin.z, 0), min(z2 - self.origin.z + 1, nz)
+        if x1 >= x2 or z1 >= z2:
+            return
+        ground = self.ground[x1:x2, z1:z2]
+        if b[0] in NOT_GROUND:
+            self.dirty[x1:x2, z1:z2] |= (ground >= y1) & (ground <= y2)
+        elif y1 <= self.ytop and y2 >= self.origin.y:
+            top = min(y2, self.ytop)
+            numpy.maximum(ground, top, ground)
+
+    def watch(self, cache):
+        """Update columns when they are written through a BlockCache"""
+        cache.on_change.append(self.wrote)
+
+    def refresh(self):
+        """Read the ground level of the dirty columns"""
+        ox, oy, oz = self.origin
+        columns = [(ox + i, oz + k) for i, k in numpy.argwhere(self.dirty)]
+        if not columns:
+            return
+        # Start each column at mc.getHeight, or the top of the area
+        todo = {}    # (x,z) -> y to read next
+        for (x, z), h in self.getter.iter_heights(columns):
+            todo[(x, z)] = min(h, self.ytop)
+        self.requests += len(columns)
+        # Then read a layer at a time, until each column finds ground
+        while todo:
+            positions = [(x, y, z) for (x, z), y in todo.items()
+                         if y >= oy]
+            for (x, z), y in todo.items():
+                if y < oy:
+                    self.ground[x - ox, z - oz] = NO_GROUND
+                    del todo[(x, z)]
+            for (x, y, z), blockid in self.getter.iter_blocks(positions):
+                if blockid in NOT_GROUND:
+                    todo[(x, z)] = y - 1
+                else:
+                    self.ground[x - ox, z - oz] = y
+                    del todo[(x, z)]
+            self.requests += len(positions)
+        self.dirty[:] = False
@@ -0,0 +1,269 @@
+"""Find a house foundation: the torch, the corner, and the walls
+
+The layout (see try1.py) is two low walls which meet at a right angle,
+a post on the corner to give the height, and a torch on the ground at
+the inside corner.  Rather than look at one block at a time, the
+blocks around the torch are read in one go, and checked with array
+operations:
+  1. a 5x5 area at ground level, around where the player hit (or
+     stood), holds the torch and the corner next to it
+  2. the two walls and the post are read as three lines of blocks,
+     together, and measured to the first AIR block.  A line with no
+     AIR yet is read further, so a house can be any size.
+
+    corner, dim = find_house(getter, hit.pos)
+
+Then build on it, with a handful of setBlocks calls: fill the whole box
+with wall, the inside with AIR, then the roof and each opening:
+
+    spec = HouseSpec(wall=block.STONE.id, roof=block.WOOD_PLANKS.id,
+                     openings=[door("near_x", 2), window("far_z", 1)])
+    boxes, cost = build_house(BulkWriter(getter), corner, dim, spec)
+"""
+
+from   mcpi.vec3 import Vec3
+from   bulk import estimate
+from   cuboid import block_pos
+import mcpi.block as block
+import numpy
+
+class TorchFindError(Exception):
+    """Torch not found nearby"""
+    def __init__(self, value):
+        self.value = value
+    def __str__(self):
+        return repr(self.value)
+
+class CornerFindError(Exception):
+    """Corner not found"""
+    def __init__(self, value):
+        self.value = value
+    def __str__(self):
+        return repr(self.value)
+
+def _corner_templates():
+    """(solid blocks of the 3x3 around the torch, inside vector) for the
+    four ways a corner can face"""
+    templates = []
+    for vx in (1, -1):
+        for vz in (1, -1):
+            t = numpy.zeros((3, 3), bool)
+            t[1 - vx, :] = True    # the wall along z
+            t[:, 1 - vz] = True    # the wall along x
+            templates.append((t, Vec3(vx, 1, vz)))
+    return templates
+
+CORNERS = _corner_templates()
+
+# What a foundation may be built of, and the torch: a hit on anything
+# else (the ground, a tree, ...) is not on a house
+FOUNDATION_IDS = frozenset(b.id for b in (
+    block.STONE, block.COBBLESTONE, block.MOSS_STONE, block.STONE_BRICK,
+    block.BRICK_BLOCK, block.SANDSTONE, block.OBSIDIAN, block.WOOD,
+    block.WOOD_PLANKS, block.WOOL, block.GLASS, block.GOLD_BLOCK,
+    block.IRON_BLOCK, block.DIAMOND_BLOCK, block.TORCH))
+
+# Blocks which end a run: AIR, and the edge of the world
+RUN_ENDS = frozenset((block.AIR.id, block.BEDROCK_INVISIBLE.id))
+
+# No run is longer than the world is wide
+MAX_RUN = 256
+
+def find_torch(blocks, pos):
+    """The position of the torch in the 3x3 around pos (at pos.y)
+
+    blocks is a Cuboid holding that area.
+    """
+    x, y, z = block_pos(pos)
+    torches = blocks[x-1:x+2, y, z-1:z+2].where(block.TORCH.id)
+    if len(torches) > 1:
+        raise TorchFindError("Too many torches")
+    if not len(torches):
+        raise TorchFindError("Torch not found nearby")
+    return Vec3(*[int(n) for n in torches[0]])
+
+def find_corner(blocks, pos):
+    """The corner next to pos, and a unit vector pointing inside it
+
+    pos is the inside corner at ground level, such as from find_torch;
+    blocks is a Cuboid holding the 3x3 around it.
+    """
+    x, y, z = block_pos(pos)
+    area = blocks[x-1:x+2, y, z-1:z+2]
+    if area.shape != (3, 1, 3):
+        raise CornerFindError("Corner not in the blocks read")
+    solid = area.ids[:, 0, :] != block.AIR.id
+    solid[1, 1] = False    # The torch
+    for template, vector in CORNERS:
+        if (solid == template).all():
+            return Vec3(x - vector.x, y, z - vector.z), vector
+    raise CornerFindError("Corner not found")
+
+def measure_runs(getter, start, vectors, reach=16, max_length=MAX_RUN):
+    """The length of the runs of blocks (not RUN_ENDS) from start
+
+    parms:
+        getter: such as a PipelinedGetter
+        start: the first block of every run
+        vectors: unit vectors, the direction of each run
+        reach: blocks to read per run, at first; runs with no AIR in
+               them are read twice as far again, until they end
+        max_length: runs are not read past this many blocks
+    returns:
+        a list of lengths, counting the start block
+    """
+    lengths = [None] * len(vectors)
+    done = 0     # blocks read so far, along each run
+    while None in lengths:
+        if done >= max_length:
+            return [max_length if n is None else n for n in lengths]
+        reach = min(reach, max_length - done)
+        todo = [i for i, n in enumerate(lengths) if n is None]
+        lines = numpy.ones((len(vectors), reach), bool)   # True if solid
+        where = {}   # (x,y,z) -> [(run, index in lines)]
+        for i in todo:
+            v = vectors[i]
+            for k in range(done, done + reach):
+                pos = (start.x + v.x * k, start.y + v.y * k,
+                       start.z + v.z * k)
+                where.setdefault(pos, []).append((i, k - done))
+        for pos, blockid in getter.iter_blocks(where.keys()):
+            for i, k in where[pos]:
+                lines[i, k] = blockid not in RUN_ENDS
+        for i in todo:
+            if not lines[i].all():
+                lengths[i] = done + int(numpy.argmin(lines[i]))
+        done += reach
+        reach *= 2
+    return lengths
+
+def get_house_data(getter, pos, blocks=None):
+    """The corner of the house and its size, given the torch position
+
+    parms:
+        getter: such as a PipelinedGetter
+        pos: the torch, at the inside corner
+        blocks: a Cuboid holding the 3x3 around pos, or None to read it
+    returns:
+        (corner, Vec3(size x, size y, size z)); the sizes count from
+        the corner, and point inside the house
+    """
+    if blocks is None:
+        blocks = getter.get_blocks(pos - Vec3(1, 0, 1), pos + Vec3(1, 0, 1))
+    corner, vector = find_corner(blocks, pos)
+    runs = measure_runs(getter, corner, [Vec3(vector.x, 0, 0),
+                                         Vec3(0, vector.y, 0),
+                                         Vec3(0, 0, vector.z)])
+    return corner, Vec3((runs[0] - 1) * vector.x,
+                        (runs[1] - 1) * vector.y,
+                        (runs[2] - 1) * vector.z)
+
+def find_house(getter, pos):
+    """Find the torch near pos, and then the house, as get_house_data
+
+    pos is where the player hit the wall next to the torch, or stood.
+    """
+    blocks = getter.get_blocks(pos - Vec3(2, 0, 2), pos + Vec3(2, 0, 2))
+    torch = find_torch(blocks, pos)
+    return get_house_data(getter, torch, blocks)
+
+
+class HouseSpec:
+    """What to build on a foundation
+
+    parms:
+        wall, roof, floor: block ids; roof and floor may be None for none
+        clear_inside: fill the inside with AIR (which takes one call,
+                      where leaving it alone takes two more for the walls)
+        openings: AIR cut out of the walls, such as from door and window
+    """
+    def __init__(self, wall=block.STONE.id, roof=None, floor=None,
+                 clear_inside=True, openings=()):
+        self.wall = wall
+        self.roof = roof
+        self.floor = floor
+        self.clear_inside = clear_inside
+        self.openings = list(openings)
+
+# The walls, named from the corner: the near walls meet at the corner
+SIDES = ("near_x", "far_x", "near_z", "far_z")
+
+def door(side, offset, width=1, height=2):
+    """An opening at ground level, offset blocks along the wall from
+    the corner wall"""
+    return (side, offset, 0, width, height)
+
+def window(side, offset, y=2, width=2, height=1):
+    """An opening y blocks above the ground"""
+    return (side, offset, y, width, height)
+
+def compile_house(corner, dim, spec):
+    """The setBlocks boxes which build a house, in the order to send them
+
+    parms:
+        corner, dim: such as from get_house_data
+        spec: a HouseSpec
+    returns:
+        list of (x1, y1, z1, x2, y2, z2, block id, block data), like
+        bulk.plan_boxes.  Later boxes overwrite earlier ones, which is
+        how the inside and the openings each take a single call.
+    Raises ValueError if an opening does not fit in its wall.
+    """
+    sx = -1 if dim.x < 0 else 1
+    sz = -1 if dim.z < 0 else 1
+    nx, ny, nz = abs(int(dim.x)), abs(int(dim.y)), abs(int(dim.z))
+    def box(u1, v1, w1, u2, v2, w2, blockid):
+        """A box in house coordinates: u across x, v up, w across z"""
+        x1, x2 = sorted((corner.x + u1 * sx, corner.x + u2 * sx))
+        z1, z2 = sorted((corner.z + w1 * sz, corner.z + w2 * sz))
+        return (x1, corner.y + v1, z1, x2, corner.y + v2, z2, blockid, 0)
+    boxes = []
+    if spec.floor is not None:
+        boxes.append(box(0, -1, 0, nx, -1, nz, spec.floor))
+    if spec.clear_inside or nx < 2 or nz < 2:
+        boxes.append(box(0, 0, 0, nx, ny, nz, spec.wall))
+        if nx >= 2 and nz >= 2:
+            boxes.append(box(1, 0, 1, nx-1, ny, nz-1, block.AIR.id))
+    else:
+        boxes.append(box(0, 0, 0, nx, ny, 0, spec.wall))
+        boxes.append(box(0, 0, nz, nx, ny, nz, spec.wall))
+        boxes.append(box(0, 0, 1, 0, ny, nz-1, spec.wall))
+        boxes.append(box(nx, 0, 1, nx, ny, nz-1, spec.wall))
+    if spec.roof is not None:
+        boxes.append(box(0, ny+1, 0, nx, ny+1, nz, spec.roof))
+    for opening in spec.openings:
+        side, offset, y, width, height = opening
+        if side not in SIDES:
+            raise ValueError("side must be one of %s" % (SIDES,))
+        a, b = offset, offset + width - 1
+        v1, v2 = y, y + height - 1
+        length = nx + 1 if side in ("near_x", "far_x") else nz + 1
+        if a < 0 or v1 < 0 or b < a or v2 < v1 or b >= length or v2 > ny:
+            raise ValueError("%r does not fit in a wall %d long and %d high"
+                             % (opening, length, ny + 1))
+        if side == "near_x":
+            boxes.append(box(a, v1, 0, b, v2, 0, block.AIR.id))
+        elif side == "far_x":
+            boxes.append(box(a, v1, nz, b, v2, nz, block.AIR.id))
+        elif side == "near_z":
+            boxes.append(box(0, v1, a, 0, v2, b, block.AIR.id))
+        else:
+            boxes.append(box(nx, v1, a, nx, v2, b, block.AIR.id))
+    return boxes
+
+def build_house(writer, corner, dim, spec, dry_run=False):
+    """Build a house with a few pipelined setBlocks calls
+
+    parms:
+        writer: a bulk.BulkWriter, which sends the boxes (and tells its
+                cache about them)
+        corner, dim: such as from get_house_data
+        spec: a HouseSpec
+        dry_run: work out the boxes, but do not send them
+    returns:
+        (boxes, estimate of their cost)
+    """
+    boxes = compile_house(corner, dim, spec)
+    if not dry_run:
+        writer.send_boxes(boxes)
+    return boxes, estimate(boxes)
@@ -0,0 +1,231 @@
+"""Measure the requests to the Minecraft Pi API, as they happen
+
+The notes in try1.py say some blocks "take much longer to fetch, about
+0.3 sec".  A Metrics object, given to a reader, records each request:
+    latency      a histogram of seconds per request, for each command
+    in flight    requests sent and not yet answered, now and at most
+    connections  answers and answers/sec, for each connection
+    queue wait   seconds work items waited for a worker thread
+    slow log     the slowest recent requests, with their coordinates,
+                 and a count of slow requests per 16x16 chunk
+so a long tail can be traced to a chunk, a connection, or the game.
+It costs a timer call and a lock per request, so it can be left on.
+
+    metrics = Metrics()
+    getter = PipelinedGetter(metrics=metrics)
+    getter.get_blocks_with_data(c1, c2)
+    print metrics.to_json()
+    open("mcpi.prom", "w").write(metrics.to_prometheus())
+"""
+
+from   mcpi.connection import Connection
+import bisect
+import collections
+import json
+import threading
+import timeit
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0,
+           2.0, 5.0)
+
+class Histogram:
+    """Counts of values, by bucket (the last bucket is everything larger)"""
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, p):
+        """The bucket bound at or below which p percent of values fall"""
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100.0
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def to_dict(self):
+        return {"count": self.count, "sum": self.sum,
+                "buckets": dict(zip(map(str, self.bounds), self.counts)),
+                "p50": self.percentile(50), "p99": self.percentile(99)}
+
+
+class Metrics:
+    """Counters for the requests of one or more readers
+
+    parms:
+        slow_threshold: seconds; slower requests go in the slow log
+        slow_log_size: the number of slow requests to keep
+    """
+    def __init__(self, slow_threshold=0.2, slow_log_size=100):
+        self.slow_threshold = slow_threshold
+        self.latency = collections.defaultdict(Histogram)  # command -> ..
+        self.queue_wait = Histogram()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections = {}   # id -> [answers, first time, last time]
+        self.slow = collections.deque(maxlen=slow_log_size)
+        self.slow_chunks = collections.Counter()   # (x//16, z//16) -> n
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def new_connection_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def sent(self):
+        """A request was sent"""
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def answered(self, command, args, seconds, connection_id=0):
+        """A request was answered, seconds after it was sent"""
+        now = timeit.default_timer()
+        with self._lock:
+            self.in_flight -= 1
+            self.latency[command].observe(seconds)
+            c = self.connections.get(connection_id)
+            if c is None:
+                c = self.connections[connection_id] = [0, now, now]
+            c[0] += 1
+            c[2] = now
+            if seconds >= self.slow_threshold:
+                self.slow.append((now, command, tuple(args), seconds,
+                                  connection_id))
+                if len(args) == 3:
+                    self.slow_chunks[(int(args[0]) // 16,
+                                      int(args[2]) // 16)] += 1
+
+    def unanswered(self):
+        """A request turned out to have no answer"""
+        with self._lock:
+            self.in_flight -= 1
+
+    def waited(self, seconds):
+        """A work item waited seconds in a queue"""
+        with self._lock:
+            self.queue_wait.observe(seconds)
+
+    def snapshot(self):
+        """All the counters, as a dict"""
+        with self._lock:
+            connections = {}
+            for cid, (n, first, last) in self.connections.items():
+                connections[str(cid)] = {
+                    "answers": n,
+                    "per_sec": n / (last - first) if last > first else 0.0}
+            return {
+                "latency": dict((k, h.to_dict())
+                                for k, h in self.latency.items()),
+                "queue_wait": self.queue_wait.to_dict(),
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "connections": connections,
+                "slow": [{"time": t, "command": c, "args": list(a),
+                          "seconds": s, "connection": cid}
+                         for t, c, a, s, cid in self.slow],
+                "slow_chunks": dict(("%d,%d" % k, n)
+                                    for k, n in self.slow_chunks.items())}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_prometheus(self, prefix="mcpi"):
+        """The counters in the Prometheus text format"""
+        snap = self.snapshot()
+        lines = ["# TYPE %s_request_seconds histogram" % prefix]
+        with self._lock:
+            histograms = [(k, list(h.counts), h.count, h.sum)
+                          for k, h in self.latency.items()]
+            waits = (list(self.queue_wait.counts), self.queue_wait.count,
+                     self.queue_wait.sum)
+        for command, counts, count, total in sorted(histograms):
+            lines.extend(_histogram_lines("%s_request_seconds" % prefix,
+                                          'command="%s"' % command,
+                                          counts, count, total))
+        lines.append("# TYPE %s_queue_wait_seconds histogram" % prefix)
+        lines.extend(_histogram_lines("%s_queue_wait_seconds" % prefix,
+                                      "", *waits))
+        lines.append("# TYPE %s_in_flight gauge" % prefix)
+        lines.append("%s_in_flight %d" % (prefix, snap["in_flight"]))
+        lines.append("# TYPE %s_max_in_flight gauge" % prefix)
+        lines.append("%s_max_in_flight %d" % (prefix, snap["max_in_flight"]))
+        lines.append("# TYPE %s_answers_total counter" % prefix)
+        for cid, c in sorted(snap["connections"].items()):
+            lines.append('%s_answers_total{connection="%s"} %d' % (
+                prefix, cid, c["answers"]))
+        lines.append("# TYPE %s_slow_requests_total counter" % prefix)
+        for chunk, n in sorted(snap["slow_chunks"].items()):
+            lines.append('%s_slow_requests_total{chunk="%s"} %d' % (
+                prefix, chunk, n))
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(name, labels, counts, count, total):
+    sep = "," if labels else ""
+    lines = []
+    seen = 0
+    for bound, n in zip(BUCKETS, counts):
+        seen += n
+        lines.append('%s_bucket{%s%sle="%g"} %d' % (name, labels, sep,
+                                                   bound, seen))
+    lines.append('%s_bucket{%s%sle="+Inf"} %d' % (name, labels, sep, count))
+    braces = "{%s}" % labels if labels else ""
+    lines.append("%s_sum%s %r" % (name, braces, total))
+    lines.append("%s_count%s %d" % (name, braces, count))
+    return lines
+
+
+class InstrumentedConnection(Connection):
+    """A mcpi Connection which records each request in a Metrics
+
+    Like Connection, it expects one answer per request sent with
+    send, read by receive (as sendReceive does).
+    """
+    def __init__(self, address, port, metrics):
+        Connection.__init__(self, address, port)
+        self.metrics = metrics
+        self.connection_id = metrics.new_connection_id()
+        self._sent = None
+
+    def send(self, f, *data):
+        if self._sent is not None:
+            # The last request had no answer, like world.setBlocks
+            self.metrics.unanswered()
+        Connection.send(self, f, *data)
+        self._sent = (f, data, timeit.default_timer())
+        self.metrics.sent()
+
+    def receive(self):
+        try:
+            return Connection.receive(self)
+        finally:
+            if self._sent is not None:
+                f, data, starttime = self._sent
+                self._sent = None
+                self.metrics.answered(f, _flatten(data),
+                                      timeit.default_timer() - starttime,
+                                      self.connection_id)
+
+def _flatten(args):
+    flat = []
+    for a in args:
+        if isinstance(a, (tuple, list)):
+            flat.extend(a)
+        elif hasattr(a, "x"):
+            flat.extend((a.x, a.y, a.z))
+        else:
+            flat.append(a)
+    return flat
@@ -0,0 +1,135 @@
+"""Create a miniature world: reduce (256,256) to (16,16)
+
+The work is done in three stages, which run band by band, so the
+miniature starts to appear while the world is still being read:
+  1. gather: the height of every column (world.getHeight) and the
+     block on top of it, through pipelined sockets
+  2. reduce: each tile (16x16 columns, for 256 -> 16) becomes the
+     most common surface block and the average height of the tile
+  3. emit: each tile becomes a column of its block, written with a
+     few world.setBlocks calls by a BulkWriter
+
+Example:
+    getter = PipelinedGetter()
+    timings = make_miniature(getter, BulkWriter(getter),
+                             Vec3(-128, -64, -128), Vec3(127, 63, 127),
+                             Vec3(0, 10, 0), progress=print_progress)
+"""
+
+from   cuboid import Cuboid, block_pos, normalize_corners
+from   mcpi.vec3 import Vec3
+import mcpi.block as block
+import numpy
+import timeit
+
+def tile_mode(ids, tiles):
+    """The most common value in each tile of a 2D array of block ids
+
+    parms:
+        ids: 2D uint8 array; each dimension a multiple of the tile count
+        tiles: (tiles along x, tiles along z)
+    Ties go to the lowest block id.
+    """
+    (nx, nz), (tx, tz) = ids.shape, tiles
+    # One row per tile, holding all the block ids in the tile
+    t = ids.reshape(tx, nx // tx, tz, nz // tz).swapaxes(1, 2)
+    t = t.reshape(tx * tz, -1).astype(numpy.intp)
+    # Count each block id in each tile, all at once
+    t += numpy.arange(tx * tz)[:, numpy.newaxis] * 256
+    counts = numpy.bincount(t.ravel(), minlength=tx * tz * 256)
+    return counts.reshape(tx * tz, 256).argmax(axis=1).reshape(tiles).astype(
+        numpy.uint8)
+
+def tile_mean(a, tiles):
+    """The average value in each tile of a 2D array"""
+    (nx, nz), (tx, tz) = a.shape, tiles
+    return a.reshape(tx, nx // tx, tz, nz // tz).mean(axis=(1, 3))
+
+def print_progress(stage, done, total):
+    print "%-8s %6d of %6d" % (stage, done, total)
+
+def _gather(getter, columns):
+    """dict from each (x,z) to (height, the block id on top)"""
+    heights = dict(getter.iter_heights(columns))
+    tops = [(x, h, z) for (x, z), h in heights.items()]
+    return dict(((x, z), (y, blockid))
+                for (x, y, z), blockid in getter.iter_blocks(tops))
+
+def make_miniature(getter, writer, c1, c2, dest, tiles=16, progress=None):
+    """Build a miniature copy of the world (c1, c2) at dest
+
+    parms:
+        getter: a PipelinedGetter, to read the world
+        writer: a BulkWriter, to build the miniature
+        c1, c2: the corners of the world; its x and z sizes must be
+                multiples of tiles
+        dest: the low corner of the miniature
+        tiles: the miniature is tiles x tiles columns
+        progress: called like fn(stage, done, total) after each stage
+                  of each band, such as print_progress
+    returns:
+        dict of seconds spent in each stage, and counts of the requests
+        and setBlocks calls
+    The miniature is scaled down by the same amount vertically,
+    measuring heights from the bottom of the world (c1.y).
+    dest may be inside (c1, c2), as it is when the miniature is of the
+    whole world: the columns under the miniature are read before any
+    of it is built, so it does not read itself back as the surface.
+    """
+    (x1, y1, z1), (x2, y2, z2) = normalize_corners(c1, c2)
+    nx, nz = x2 - x1 + 1, z2 - z1 + 1
+    if nx % tiles or nz % tiles:
+        raise ValueError("world size %dx%d is not a multiple of %d" % (
+            nx, nz, tiles))
+    scale = nx // tiles          # Columns per tile, along x
+    top = (y2 - y1 + 1) // scale
+    stats = {"gather": 0.0, "reduce": 0.0, "emit": 0.0,
+             "requests": 0, "setBlocks": 0}
+    # The columns the miniature will cover, read now, before it is built
+    dest = Vec3(*block_pos(dest))
+    dx, dz = dest.x, dest.z
+    starttime = timeit.default_timer()
+    covered = _gather(getter, [
+        (x, z) for x in range(max(dx, x1), min(dx + tiles - 1, x2) + 1)
+               for z in range(max(dz, z1), min(dz + tiles - 1, z2) + 1)])
+    stats["requests"] += 2 * len(covered)
+    stats["gather"] += timeit.default_timer() - starttime
+    for band in range(tiles):
+        bx1 = x1 + band * scale
+        # 1. gather
+        starttime = timeit.default_timer()
+        columns = [(x, z) for x in range(bx1, bx1 + scale)
+                          for z in range(z1, z2+1)
+                          if (x, z) not in covered]
+        heights = numpy.zeros((scale, nz), numpy.int16)
+        surface = numpy.zeros((scale, nz), numpy.uint8)
+        found = _gather(getter, columns)
+        found.update((xz, hb) for xz, hb in covered.items()
+                     if bx1 <= xz[0] < bx1 + scale)
+        for (x, z), (h, blockid) in found.items():
+            heights[x - bx1, z - z1] = h
+            surface[x - bx1, z - z1] = blockid
+        stats["requests"] += 2 * len(columns)
+        endtime = timeit.default_timer()
+        stats["gather"] += endtime - starttime
+        if progress:
+            progress("gather", band + 1, tiles)
+        # 2. reduce
+        tile_ids = tile_mode(surface, (1, tiles))[0]
+        tile_heights = (tile_mean(heights, (1, tiles))[0] - y1) // scale
+        tile_heights = numpy.clip(tile_heights, 0, top - 1).astype(int)
+        endtime2 = timeit.default_timer()
+        stats["reduce"] += endtime2 - endtime
+        if progress:
+            progress("reduce", band + 1, tiles)
+        # 3. emit: a row of tiles, as columns from dest.y up
+        row = Cuboid.empty(Vec3(dest.x + band, dest.y, dest.z),
+                           Vec3(dest.x + band, dest.y + top - 1,
+                                dest.z + tiles - 1))
+        below = numpy.arange(top)[:, numpy.newaxis] <= tile_heights
+        row.ids[0] = numpy.where(below, tile_ids, block.AIR.id)
+        stats["setBlocks"] += len(writer.write(row))
+        stats["emit"] += timeit.default_timer() - endtime2
+        if progress:
+            progress("emit", band + 1, tiles)
+    return stats
@@ -0,0 +1,193 @@
+"""Move the player smoothly along a path, such as a leap
+
+Calling mc.player.setPos in a loop waits for nothing (setPos has no
+answer), but the loop in try1.py sleeps a fixed time per step, so it
+goes slower whenever the game is busy, and stutters as it fights
+gravity.  A MotionExecutor sends the setPos requests on a pipelined
+connection of its own, at a fixed rate, and works out each position
+from the clock, not from the number of steps, so a late step catches
+up instead of falling behind.  The path is checked against block data
+read before the move, and the move stops short of a solid block.
+
+    getter = PipelinedGetter()
+    path = Parabola(mc.player.getPos(), Vec3(20, 12, 5))
+    result = MotionExecutor(getter=getter).run(path)
+    if not result["completed"]:
+        print "bumped into", result["collision"]
+"""
+
+from   cuboid import block_pos, normalize_corners
+from   heightmap import NOT_GROUND
+from   mcpi.vec3 import Vec3
+from   pipeline import PipelinedConnection
+import ctypes
+import ctypes.util
+import math
+import time
+import timeit
+
+def _monotonic_clock():
+    """A clock that does not jump when the system time is set
+
+    Python 2 has no time.monotonic, so on Linux (the Pi) this asks
+    clock_gettime(CLOCK_MONOTONIC) through ctypes.  Where that is not
+    found either, it is timeit.default_timer, which is time.time on
+    Linux and does jump.
+    """
+    try:
+        return time.monotonic
+    except AttributeError:
+        pass
+
+    class timespec(ctypes.Structure):
+        _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+    CLOCK_MONOTONIC = 1
+    try:
+        librt = ctypes.CDLL(ctypes.util.find_library("rt") or "libc.so.6")
+        clock_gettime = librt.clock_gettime
+    except (OSError, AttributeError):
+        return timeit.default_timer
+    clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(timespec)]
+    def monotonic():
+        t = timespec()
+        if clock_gettime(CLOCK_MONOTONIC, ctypes.byref(t)):
+            raise OSError("clock_gettime failed")
+        return t.tv_sec + t.tv_nsec * 1e-9
+    return monotonic
+
+clock = _monotonic_clock()
+
+class Parabola:
+    """A leap from start to dest, under gravity
+
+    parms:
+        start, dest: positions (Vec3)
+        xz_speed: blocks/sec across the ground
+        gravity: blocks/sec/sec, downwards
+    position(t) is where the player is t seconds after leaving start;
+    position(duration) is dest.
+    """
+    def __init__(self, start, dest, xz_speed=8.0, gravity=20.0):
+        self.start = start
+        self.dest = dest
+        self.gravity = gravity
+        xd, yd, zd = dest.x - start.x, dest.y - start.y, dest.z - start.z
+        self.duration = max(math.hypot(xd, zd) / xz_speed, 0.1)
+        self.velocity = Vec3(xd / self.duration,
+                             yd / self.duration +
+                             0.5 * gravity * self.duration,
+                             zd / self.duration)
+
+    def position(self, t):
+        v = self.velocity
+        return Vec3(self.start.x + v.x * t,
+                    self.start.y + v.y * t - 0.5 * self.gravity * t * t,
+                    self.start.z + v.z * t)
+
+    def corners(self):
+        """The corners of the blocks holding the path, and the player's head"""
+        top = self.start.y + self.velocity.y ** 2 / (2 * self.gravity)
+        lo = Vec3(min(self.start.x, self.dest.x),
+                  min(self.start.y, self.dest.y),
+                  min(self.start.z, self.dest.z))
+        hi = Vec3(max(self.start.x, self.dest.x),
+                  max(self.start.y, self.dest.y, top) + 1,
+                  max(self.start.z, self.dest.z))
+        return normalize_corners(lo, hi)
+
+class MotionExecutor:
+    """Stream player.setPos along a path, at a fixed rate
+
+    parms:
+        address, port: of the Minecraft Pi API
+        rate: setPos updates per second
+        getter: a PipelinedGetter, to read the blocks along the path
+                before moving, or None to skip the collision check
+    """
+    def __init__(self, address="localhost", port=4711, rate=60,
+                 getter=None):
+        self.address = address
+        self.port = port
+        self.rate = rate
+        self.getter = getter
+        self.connection = None
+
+    def _get_connection(self):
+        if self.connection is None or self.connection.closed:
+            self.connection = PipelinedConnection(self.address, self.port)
+        return self.connection
+
+    def run(self, path, blocks=None):
+        """Move the player along path
+
+        parms:
+            path: has duration, position(t) and corners(), like a Parabola
+            blocks: a Cuboid of block ids around the path, or None to read
+                    it with the getter (if there is one)
+        returns:
+            dict of completed (False if stopped by a collision), collision
+            (the block position hit, or None), position (where the player
+            was left), updates (setPos requests sent), seconds, and late
+            (updates sent more than one period after their time)
+        """
+        if blocks is None and self.getter is not None:
+            blocks = self.getter.get_blocks(*path.corners())
+        start_blocks = set()
+        p = path.position(0)
+        for dy in (0, 1):
+            start_blocks.add(block_pos(Vec3(p.x, p.y + dy, p.z)))
+        connection = self._get_connection()
+        period = 1.0 / self.rate
+        result = {"completed": True, "collision": None, "updates": 0,
+                  "late": 0}
+        last = p
+        starttime = clock()
+        n = 0
+        while True:
+            now = clock()
+            t = min(now - starttime, path.duration)
+            if now - (starttime + n * period) > period:
+                result["late"] += 1
+            p = path.position(t)
+            hit = self._collision(blocks, p, start_blocks)
+            if hit is not None:
+                result["completed"] = False
+                result["collision"] = hit
+                p = last
+            connection.post("player.setPos", p.x, p.y, p.z)
+            connection.handle_write()
+            result["updates"] += 1
+            last = p
+            if hit is not None or t >= path.duration:
+                break
+            # Sleep until the next update is due; if late, go at once
+            n = max(n + 1, int((now - starttime) / period) + 1)
+            delay = starttime + n * period - clock()
+            if delay > 0:
+                time.sleep(delay)
+        connection.flush()
+        result["seconds"] = clock() - starttime
+        result["position"] = last
+        return result
+
+    @staticmethod
+    def _collision(blocks, p, ignore):
+        """The block position the player's feet or head is in, if solid"""
+        if blocks is None:
+            return None
+        for dy in (0, 1):
+            pos = block_pos(Vec3(p.x, p.y + dy, p.z))
+            if pos in ignore or pos not in blocks:
+                continue
+            b = blocks[pos]
+            if isinstance(b, tuple):
+                b = b[0]
+            if b not in NOT_GROUND:
+                return pos
+        return None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,334 @@
+"""Pipelined requests to the Minecraft Pi API
+
+The threaded readers wait for each answer before sending the next
+request, so every socket spends most of its time idle, and it takes
+hundreds of threads to keep the game busy.  Here we write many requests
+onto a socket without waiting, and read the answers as they arrive.
+The API answers requests on a connection in the order they were sent,
+so answers are matched to requests first-in first-out.
+
+Note: mcpi.connection.Connection.send drains (and discards) any unread
+answers before it sends, and Connection.receive reads through a new
+socket file object each time, so it cannot be used to pipeline.
+PipelinedConnection talks to the socket directly.
+
+Example:
+    getter = PipelinedGetter(sockets=2)
+    blks = getter.get_blocks_with_data(Vec3(-50, 8, -50), Vec3(50, 8, 50))
+    getter.close()
+"""
+
+from   mcpi.connection import RequestError
+from   cuboid import Cuboid, normalize_corners
+import collections
+import errno
+import select
+import socket
+import timeit
+
+# Answers which mean the request failed (see mcpi.connection.Connection)
+REQUEST_FAILED = "Fail"
+
+class PipelinedConnection:
+    """A non-blocking socket connection to the Minecraft Pi API
+
+    Requests are buffered by request() and post(), and written by
+    handle_write() when the socket is writable.  Answers are read by
+    handle_read() and returned with the tag of the request they answer.
+    If metrics (an instrument.Metrics) is given, each request is
+    recorded in it.
+    """
+    def __init__(self, address = "localhost", port = 4711, metrics = None):
+        self.socket = socket.create_connection((address, port))
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.socket.setblocking(0)
+        self.outbuf = bytearray()
+        self.inbuf = ""
+        # (tag, api_name, args, time sent) of unanswered requests
+        self.pending = collections.deque()
+        self.closed = False
+        self.metrics = metrics
+        if metrics is not None:
+            self.connection_id = metrics.new_connection_id()
+
+    def fileno(self):
+        return self.socket.fileno()
+
+    @staticmethod
+    def format_request(api_name, args):
+        return "%s(%s)\n" % (api_name, ",".join(map(str, args)))
+
+    def request(self, tag, api_name, *args):
+        """Queue a request which expects an answer"""
+        self.outbuf += self.format_request(api_name, args)
+        if self.metrics is not None:
+            self.metrics.sent()
+            self.pending.append((tag, api_name, args, timeit.default_timer()))
+        else:
+            self.pending.append((tag, api_name, args, None))
+
+    def post(self, api_name, *args):
+        """Queue a request which has no answer, like world.setBlocks"""
+        self.outbuf += self.format_request(api_name, args)
+
+    def handle_write(self):
+        """Write as much buffered request data as the socket will take"""
+        try:
+            n = self.socket.send(self.outbuf)
+        except socket.error as e:
+            if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                return
+            raise
+        del self.outbuf[:n]
+
+    def handle_read(self):
+        """Read what has arrived, and return a list of (tag, answer)
+
+        A failed request is answered by REQUEST_FAILED.
+        """
+        try:
+            data = self.socket.recv(65536)
+        except socket.error as e:
+            if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                return []
+            raise
+        if not data:
+            self.close()
+            raise socket.error(errno.ECONNRESET,
+                               "Connection closed by Minecraft")
+        lines = (self.inbuf + data).split("\n")
+        self.inbuf = lines.pop()
+        answers = []
+        if self.metrics is not None:
+            now = timeit.default_timer()
+        for line in lines:
+            tag, api_name, args, sent = self.pending.popleft()
+            if sent is not None:
+                self.metrics.answered(api_name, args, now - sent,
+                                      self.connection_id)
+            answers.append((tag, line))
+        return answers
+
+    def flush(self):
+        """Block until all buffered request data has been written"""
+        while self.outbuf:
+            select.select([], [self], [])
+            self.handle_write()
+
+    def close(self):
+        self.socket.close()
+        if self.metrics is not None:
+            for i in range(len(self.pending)):
+                self.metrics.unanswered()
+        self.pending.clear()
+        self.closed = True
+
+
+def discard_answers(connections):
+    """Read and throw away the answers to every unanswered request
+
+    Do this before reusing connections that were abandoned part way,
+    or the next request would get an old answer.
+    """
+    while True:
+        busy = [c for c in connections if c.pending]
+        if not busy:
+            return
+        writers = [c for c in connections if c.outbuf]
+        r, w, _ = select.select(busy, writers, [])
+        for c in w:
+            c.handle_write()
+        for c in r:
+            c.handle_read()
+
+def gen_answers(connections, requests, api_name, parse_fn, depth=100,
+                controller=None):
+    """generate answers for each request, like (req, answer)
+
+    parms:
+        connections: a list of PipelinedConnection
+        requests: iterable of argument tuples, like (x, y, z)
+        api_name: such as "world.getBlockWithData"
+        parse_fn: converts the answer text, such as int
+        depth: the maximum number of unanswered requests per connection
+        controller: such as an adaptive.AIMDController, whose limit
+                    replaces depth (shared by all the connections), and
+                    which is told how the answers arrive
+    Answers are generated in the order they arrive, which is request
+    order for each connection, but not across connections.
+    The requests are read from the iterable only as the pipeline has
+    room for them.  If the caller stops early (break, or close() on
+    the generator) no more requests are sent, and the answers already
+    on their way are read and thrown away.
+    """
+    requests = iter(requests)
+    more = True
+    if controller is not None:
+        controller.reset()
+    try:
+        while True:
+            if controller is not None:
+                depth = max(1, controller.limit // len(connections))
+            # Top up each connection to the pipeline depth
+            for c in connections:
+                while more and len(c.pending) < depth:
+                    try:
+                        req = next(requests)
+                    except StopIteration:
+                        more = False
+                        break
+                    c.request(req, api_name, *req)
+            busy = [c for c in connections if c.pending]
+            if not busy:
+                return
+            # Perform socket I/O
+            writers = [c for c in connections if c.outbuf]
+            r, w, _ = select.select(busy, writers, [])
+            for c in w:
+                c.handle_write()
+            for c in r:
+                answers = c.handle_read()
+                if controller is not None:
+                    controller.observe(len(answers), sum(
+                        len(c.pending) for c in connections) + len(answers))
+                for req, ans in answers:
+                    if ans == REQUEST_FAILED:
+                        raise RequestError("%s%s failed" % (api_name, req))
+                    yield req, parse_fn(ans)
+    finally:
+        discard_answers(connections)
+
+
+def gen_cuboid_xyz(c1, c2):
+    """generate (x,y,z) for every block in a cuboid, in x, y, z order"""
+    (x1, y1, z1), (x2, y2, z2) = normalize_corners(c1, c2)
+    for x in xrange(x1, x2+1):
+        for y in xrange(y1, y2+1):
+            for z in xrange(z1, z2+1):
+                yield (x, y, z)
+
+
+def _unpack_int(response):
+    return int(response)
+
+def _unpack_int_int(response):
+    i1, i2 = map(int, response.split(","))
+    return i1, i2
+
+class PipelinedGetter:
+    """Get block data from the Minecraft Pi API over a few pipelined sockets
+
+    The sockets are opened on first use, and are kept open until close().
+    If metrics (an instrument.Metrics) is given, each request is
+    recorded in it.  If controller (an adaptive.AIMDController) is
+    given, it sets the number of requests in flight, instead of depth.
+    """
+    def __init__(self, address = "localhost", port = 4711, sockets = 2,
+                 depth = 100, metrics = None, controller = None):
+        self.address = address
+        self.port = port
+        self.sockets = sockets
+        self.depth = depth
+        self.metrics = metrics
+        self.controller = controller
+        self.connections = []
+
+    def get_connections(self):
+        """The open sockets, opening them if needed"""
+        self.connections = [c for c in self.connections if not c.closed]
+        while len(self.connections) > self.sockets:
+            self.connections.pop().close()
+        while len(self.connections) < self.sockets:
+            self.connections.append(
+                PipelinedConnection(self.address, self.port, self.metrics))
+        return self.connections
+
+    def get_blocks(self, c1, c2):
+        """Cuboid of block ids (indexed by (x,y,z), gives block id)"""
+        return self._fill(Cuboid.empty(c1, c2, with_data=False),
+                          "world.getBlock", _unpack_int)
+
+    def get_blocks_with_data(self, c1, c2):
+        """Cuboid of block data (indexed by (x,y,z), gives (id, data))"""
+        return self._fill(Cuboid.empty(c1, c2),
+                          "world.getBlockWithData", _unpack_int_int)
+
+    def _fill(self, answer, api_name, parse_fn):
+        for pos, b in gen_answers(self.get_connections(),
+                                  answer.keys(), api_name, parse_fn,
+                                  self.depth, self.controller):
+            answer[pos] = b
+        return answer
+
+    def iter_blocks(self, positions):
+        """generate (pos, block id) for each (x,y,z) in positions
+
+        The blocks are generated as they arrive.  Stop iterating to
+        cancel the rest, such as when a search finds what it wants.
+        With one socket, they arrive in the order of positions.
+        """
+        return gen_answers(self.get_connections(), positions,
+                           "world.getBlock", _unpack_int, self.depth,
+                           self.controller)
+
+    def iter_blocks_with_data(self, positions):
+        """generate (pos, (block id, block data)) for each (x,y,z) in positions
+
+        See iter_blocks.
+        """
+        return gen_answers(self.get_connections(), positions,
+                           "world.getBlockWithData", _unpack_int_int,
+                           self.depth, self.controller)
+
+    def iter_heights(self, columns):
+        """generate ((x,z), height) for each (x,z) in columns
+
+        height is from world.getHeight: the y of the highest block
+        that is not AIR.  See iter_blocks.
+        """
+        return gen_answers(self.get_connections(), columns,
+                           "world.getHeight", _unpack_int, self.depth,
+                           self.controller)
+
+    def iter_rows(self, c1, c2):
+        """generate rows of block data, as each row is complete
+
+        A row is a Cuboid of the blocks from c1.z to c2.z, for one x and y.
+        The rows share the arrays of one Cuboid for the whole cuboid.
+        """
+        answer = Cuboid.empty(c1, c2)
+        (x1, y1, z1), (x2, y2, z2) = answer.corners
+        missing = {}   # (x,y) -> blocks not yet read in that row
+        for pos, b in self.iter_blocks_with_data(gen_cuboid_xyz(c1, c2)):
+            answer[pos] = b
+            x, y, z = pos
+            n = missing.get((x, y), z2 - z1 + 1) - 1
+            if n:
+                missing[(x, y)] = n
+            else:
+                missing.pop((x, y), None)
+                yield answer[x, y, :]
+
+    def close(self):
+        for c in self.connections:
+            c.close()
+        self.connections = []
+
+
+_default_getter = None
+def get_blocks_pipelined(c1, c2, sockets=2, depth=100):
+    """get a cuboid of block data, like get_blocks_in_parallel
+
+    parms:
+        c1, c2: the corners of the cuboid
+        sockets: the number of sockets to spread the requests over
+        depth: the number of unanswered requests allowed per socket
+    returns:
+        a Cuboid; blks[(x,y,z)] is (block id, block data)
+    """
+    global _default_getter
+    if _default_getter is None:
+        _default_getter = PipelinedGetter()
+    _default_getter.sockets = sockets
+    _default_getter.depth = depth
+    return _default_getter.get_blocks_with_data(c1, c2)
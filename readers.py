@@ -0,0 +1,310 @@
+"""Ways to read block data from the Minecraft Pi API
+
+Reading one block at a time with mc.getBlock costs a full round trip
+per block.  The functions here read a cuboid of blocks at a time.
+"""
+
+from   mcpi.connection import Connection
+from   mcpi.vec3 import Vec3
+from   adaptive import AIMDController
+from   cuboid import Cuboid, normalize_corners
+from   instrument import InstrumentedConnection
+from   pipeline import _unpack_int, _unpack_int_int
+import Queue
+import threading
+import timeit
+
+class _Failure:
+    """A worker's exception, passed back to the caller through outq"""
+    def __init__(self, exc):
+        self.exc = exc
+
+class _Job:
+    """One call's work: which API to call, and where to put the answers
+
+    A work item is a position (x,y,z); its answer goes to outq.
+    """
+    def __init__(self, api_name, unpack_fn):
+        self.api_name = api_name
+        self.unpack_fn = unpack_fn
+        self.outq = Queue.Queue()
+        self.cancelled = False
+
+    def do(self, connection, pos):
+        connection.send(self.api_name, pos)
+        self.outq.put((pos, self.unpack_fn(connection.receive())))
+
+class _RangeJob(_Job):
+    """Work on a cuboid: the answers go straight into a Cuboid
+
+    A work item is a range of z values, (x, y, z1, z2), and only its
+    completion goes to outq.
+    """
+    def __init__(self, api_name, unpack_fn, answer):
+        _Job.__init__(self, api_name, unpack_fn)
+        self.answer = answer
+
+    def do(self, connection, item):
+        x, y, z1, z2 = item
+        for z in xrange(z1, z2+1):
+            connection.send(self.api_name, (x, y, z))
+            self.answer[(x, y, z)] = self.unpack_fn(connection.receive())
+        self.outq.put((item, None))
+
+# The longest range handed to a worker when an AIMDController is tuning
+# the parallelism
+ADAPTIVE_RANGE = 4
+
+class ParallelGetter:
+    """Get block data from the Minecraft Pi API using a pool of threads
+
+    Each worker thread owns one socket connection, which it opens the
+    first time it gets some work.  The workers wait for more work between
+    calls, so the cost of creating threads and sockets is paid once.
+    Setting parallelism adds or stops workers on the next call.
+    Use close(), or a with statement, to stop the workers and close
+    their sockets:
+        with ParallelGetter(parallelism=100) as getter:
+            blks = getter.get_blocks_with_data(c1, c2)
+    If metrics (an instrument.Metrics) is given, each request, and the
+    time each work item waits for a worker, is recorded in it.
+    If controller (an adaptive.AIMDController) is given, it sets
+    parallelism as get_blocks and get_blocks_with_data run.
+    """
+    def __init__(self, address = "localhost", port = 4711, parallelism=200,
+                 metrics=None, controller=None):
+        self.address = address
+        self.port = port
+        self.parallelism = parallelism
+        self.metrics = metrics
+        self.controller = controller
+        self._workq = Queue.Queue()
+        self._workers = []   # threads, including ones asked to stop
+        self._running = 0    # workers not asked to stop
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop the workers and close their sockets"""
+        with self._lock:
+            for i in range(self._running):
+                self._workq.put(None)
+            self._running = 0
+            for t in self._workers:
+                t.join()
+            self._workers = []
+
+    def _resize(self):
+        """Start or stop workers to match self.parallelism"""
+        with self._lock:
+            while self._running < self.parallelism:
+                t = threading.Thread(target = self._worker_fn)
+                t.daemon = True
+                t.start()
+                self._workers.append(t)
+                self._running += 1
+            while self._running > self.parallelism:
+                self._workq.put(None)
+                self._running -= 1
+            self._workers = [t for t in self._workers if t.is_alive()]
+
+    def _worker_fn(self):
+        connection = None
+        try:
+            while True:
+                item = self._workq.get()
+                if item is None:
+                    return
+                work, job, queued = item
+                if job.cancelled:
+                    continue
+                try:
+                    if self.metrics is not None:
+                        self.metrics.waited(timeit.default_timer() - queued)
+                    if connection is None:
+                        connection = self._connect()
+                    job.do(connection, work)
+                except Exception as e:
+                    # Start again with a new socket next time
+                    if connection is not None:
+                        connection.socket.close()
+                        connection = None
+                    job.outq.put((work, _Failure(e)))
+        finally:
+            if connection is not None:
+                connection.socket.close()
+
+    def _connect(self):
+        if self.metrics is not None:
+            return InstrumentedConnection(self.address, self.port,
+                                          self.metrics)
+        return Connection(self.address, self.port)
+
+    @staticmethod
+    def normalize_corners(c1, c2):
+        """ensure c1.x <= c2.x, etc., without changing the cuboid"""
+        return normalize_corners(c1, c2)
+
+    @staticmethod
+    def generate_work_items_xyz(c1, c2):
+        c1, c2 = ParallelGetter.normalize_corners(c1, c2)
+        work = []
+        for x in range(c1.x, c2.x+1):
+            for y in range(c1.y, c2.y+1):
+                for z in range(c1.z, c2.z+1):
+                    work.append((x,y,z))
+        return work
+
+    @staticmethod
+    def generate_work_ranges(c1, c2, batches=1, max_size=None):
+        """generate (x, y, z1, z2) ranges which cover a cuboid
+
+        Rows along z are split so there are at least about batches
+        ranges, so that small cuboids keep every worker busy, and so
+        no range is longer than max_size (if given).
+        """
+        c1, c2 = ParallelGetter.normalize_corners(c1, c2)
+        nz = c2.z - c1.z + 1
+        total = (c2.x - c1.x + 1) * (c2.y - c1.y + 1) * nz
+        size = max(1, min(nz, total // batches, max_size or nz))
+        for x in xrange(c1.x, c2.x+1):
+            for y in xrange(c1.y, c2.y+1):
+                for z in xrange(c1.z, c2.z+1, size):
+                    yield (x, y, z, min(z + size - 1, c2.z))
+
+    def get_blocks(self, c1, c2):
+        """Cuboid of block ids (indexed by (x,y,z), gives block id)"""
+        return self._do_work(c1, c2, "world.getBlock", _unpack_int,
+                             Cuboid.empty(c1, c2, with_data=False))
+
+    def get_blocks_with_data(self, c1, c2):
+        """Cuboid of block data (indexed by (x,y,z), gives (id, data))"""
+        return self._do_work(c1, c2, "world.getBlockWithData",
+                             _unpack_int_int, Cuboid.empty(c1, c2))
+
+    def iter_blocks(self, positions):
+        """generate (pos, block id) for each (x,y,z) in positions
+
+        The blocks are generated as they arrive, in no particular order.
+        Stop iterating to cancel the rest, such as when a search
+        finds what it wants.
+        """
+        return self._iter_work(list(positions), "world.getBlock",
+                               _unpack_int)
+
+    def iter_blocks_with_data(self, positions):
+        """generate (pos, (block id, block data)) for each (x,y,z) in positions
+
+        See iter_blocks.
+        """
+        return self._iter_work(list(positions), "world.getBlockWithData",
+                               _unpack_int_int)
+
+    def _iter_work(self, work, api_name, unpack_fn):
+        """Perform the parallel portion of the work.
+
+        parms:
+            work - such as from generate_work_items_xyz
+
+        Specifically, hand each work item to the worker threads.
+        Each worker feeds work to the API, formats the results,
+        and enqueues the results, which are generated as they arrive.
+        If the caller stops early, the workers skip the rest of the work.
+        """
+        self._resize()
+        job = _Job(api_name, unpack_fn)
+        try:
+            for pos in work:
+                self._workq.put((pos, job, timeit.default_timer()))
+            for i in range(len(work)):
+                pos, data = job.outq.get()
+                if isinstance(data, _Failure):
+                    raise data.exc
+                yield pos, data
+        finally:
+            job.cancelled = True
+
+    def _do_work(self, c1, c2, api_name, unpack_fn, answer):
+        """Perform the work, filling in the answer (a Cuboid)
+
+        The work is handed out as ranges of blocks, a few per worker,
+        and only a few ranges are queued at a time, so a large cuboid
+        does not fill the work queue.  The workers write the blocks
+        straight into the answer.
+        """
+        max_size = None
+        if self.controller is not None:
+            # Short ranges, so the controller hears often how it goes
+            self.controller.reset()
+            self.parallelism = self.controller.limit
+            max_size = ADAPTIVE_RANGE
+        self._resize()
+        job = _RangeJob(api_name, unpack_fn, answer)
+        ranges = self.generate_work_ranges(c1, c2, 4 * self.parallelism,
+                                           max_size)
+        queued = 0
+        try:
+            for item in ranges:
+                self._workq.put((item, job, timeit.default_timer()))
+                queued += 1
+                if queued >= 2 * self.parallelism:
+                    self._wait_for_range(job, queued)
+                    queued -= 1
+            while queued:
+                self._wait_for_range(job, queued)
+                queued -= 1
+        finally:
+            job.cancelled = True
+        return answer
+
+    def _wait_for_range(self, job, queued):
+        item, failure = job.outq.get()
+        if failure is not None:
+            raise failure.exc
+        if self.controller is not None:
+            # Each busy thread has one request in flight
+            x, y, z1, z2 = item
+            if self.controller.observe(z2 - z1 + 1,
+                                       min(queued, self.parallelism)):
+                self.parallelism = self.controller.limit
+                self._resize()
+
+
+_parallel_getter = None
+def get_blocks_in_parallel(c1, c2, degree=35):
+    """get a cuboid of block data
+
+    parms:
+        c1, c2: the corners of the cuboid
+        degree: the degree of parallelism (number of sockets), or None
+                to tune it as it goes (see adaptive.py)
+    returns:
+        a Cuboid; blks[(x,y,z)] is (block id, block data)
+    The threads and sockets are kept for the next call.
+    Call close_parallel_getter() to close them.
+    """
+    global _parallel_getter
+    if _parallel_getter is None:
+        _parallel_getter = ParallelGetter()
+    if degree is None:
+        if _parallel_getter.controller is None:
+            _parallel_getter.controller = AIMDController()
+    else:
+        _parallel_getter.controller = None
+        _parallel_getter.parallelism = degree
+    c1, c2 = ParallelGetter.normalize_corners(c1, c2)
+    print "Getting data for %d blocks" % (
+        (c2.x-c1.x+1) * (c2.y-c1.y+1) * (c2.z-c1.z+1))
+    return _parallel_getter.get_blocks_with_data(c1, c2)
+
+def close_parallel_getter():
+    """Stop the threads and close the sockets of get_blocks_in_parallel"""
+    global _parallel_getter
+    if _parallel_getter is not None:
+        _parallel_getter.close()
+        _parallel_getter = None
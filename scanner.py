@@ -0,0 +1,162 @@
+"""Scan a cuboid with several processes, to use all the cores of a Pi
+
+The readers in readers.py and pipeline.py run in one Python process, so
+parsing the answers (and, for the threads, passing them through queues)
+is done on one core, however many sockets are busy.  A ShardedScanner
+starts a few worker processes, each with its own pipelined sockets.
+A scan is split into shards (runs of blocks, in x, y, z order), one
+per worker, and each worker writes the blocks it reads straight into
+a buffer of shared memory.  Nothing is pickled but the shard bounds.
+
+    with ShardedScanner(processes=4) as scanner:
+        blks = scanner.get_blocks_with_data(Vec3(-50, -10, -50),
+                                            Vec3(50, 10, 50))
+
+The shared buffer holds capacity blocks; a bigger scan is done in
+passes of that many blocks.  The workers are started on first use and
+kept until close().
+"""
+
+from   mcpi.connection import RequestError
+from   cuboid import Cuboid
+from   pipeline import PipelinedGetter
+import multiprocessing
+import multiprocessing.sharedctypes
+import numpy
+
+def _gen_shard_xyz(c1, shape, start, stop):
+    """generate (x,y,z) for blocks start..stop-1 of a cuboid,
+    in x, y, z order"""
+    x1, y1, z1 = c1
+    nx, ny, nz = shape
+    for i in xrange(start, stop):
+        yz, k = divmod(i, nz)
+        x, j = divmod(yz, ny)
+        yield (x1 + x, y1 + j, z1 + k)
+
+def _worker_fn(address, port, sockets, depth, ids_buf, data_buf,
+               tasks, results):
+    """Read shards into the shared buffers, until told to stop (None)"""
+    getter = PipelinedGetter(address, port, sockets, depth)
+    ids = numpy.frombuffer(ids_buf, numpy.uint8)
+    data = numpy.frombuffer(data_buf, numpy.uint8)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            c1, shape, start, stop, base = task
+            try:
+                x1, y1, z1 = c1
+                nx, ny, nz = shape
+                for (x, y, z), (i, d) in getter.iter_blocks_with_data(
+                        _gen_shard_xyz(c1, shape, start, stop)):
+                    n = ((x - x1) * ny + (y - y1)) * nz + (z - z1) - base
+                    ids[n] = i
+                    data[n] = d
+                results.put((start, None))
+            except Exception as e:
+                results.put((start, "%s: %s" % (e.__class__.__name__, e)))
+    finally:
+        getter.close()
+
+
+class ShardedScanner:
+    """Read cuboids of blocks with a pool of worker processes
+
+    parms:
+        address, port: of the Minecraft Pi API
+        processes: the number of worker processes (the Pi 3 has 4 cores)
+        sockets, depth: pipelined sockets for each worker, and the
+                        unanswered requests allowed on each
+        capacity: blocks in the shared buffer (2 bytes each)
+    """
+    def __init__(self, address="localhost", port=4711, processes=4,
+                 sockets=1, depth=100, capacity=1 << 20):
+        self.address = address
+        self.port = port
+        self.processes = processes
+        self.sockets = sockets
+        self.depth = depth
+        self.capacity = capacity
+        self.workers = []
+
+    def _start(self):
+        if self.workers:
+            return
+        self._ids_buf = multiprocessing.sharedctypes.RawArray(
+            "B", self.capacity)
+        self._data_buf = multiprocessing.sharedctypes.RawArray(
+            "B", self.capacity)
+        self._tasks = multiprocessing.Queue()
+        self._results = multiprocessing.Queue()
+        for i in range(self.processes):
+            p = multiprocessing.Process(
+                target=_worker_fn,
+                args=(self.address, self.port, self.sockets, self.depth,
+                      self._ids_buf, self._data_buf,
+                      self._tasks, self._results))
+            p.daemon = True
+            p.start()
+            self.workers.append(p)
+
+    def get_blocks_with_data(self, c1, c2):
+        """Cuboid of block data (indexed by (x,y,z), gives (id, data))"""
+        self._start()
+        answer = Cuboid.empty(c1, c2)
+        ids = numpy.frombuffer(self._ids_buf, numpy.uint8)
+        data = numpy.frombuffer(self._data_buf, numpy.uint8)
+        flat_ids, flat_data = answer.ids.reshape(-1), answer.data.reshape(-1)
+        c1 = tuple(answer.origin)
+        total = answer.size
+        for base in xrange(0, total, self.capacity):
+            end = min(base + self.capacity, total)
+            # One shard per worker, of nearly equal size
+            bounds = [base + (end - base) * i // self.processes
+                      for i in range(self.processes + 1)]
+            shards = [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
+            for start, stop in shards:
+                self._tasks.put((c1, answer.shape, start, stop, base))
+            errors = []
+            for shard in shards:
+                start, error = self._results.get()
+                if error is not None:
+                    errors.append(error)
+            if errors:
+                raise RequestError("scan failed: %s" % errors[0])
+            flat_ids[base:end] = ids[:end - base]
+            flat_data[base:end] = data[:end - base]
+        return answer
+
+    def close(self):
+        for p in self.workers:
+            self._tasks.put(None)
+        for p in self.workers:
+            p.join()
+        self.workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_scanner = None
+def get_blocks_sharded(c1, c2, processes=4):
+    """get a cuboid of block data, like get_blocks_in_parallel
+
+    parms:
+        c1, c2: the corners of the cuboid
+        processes: the number of worker processes
+    returns:
+        a Cuboid; blks[(x,y,z)] is (block id, block data)
+    """
+    global _default_scanner
+    if _default_scanner is not None and (
+            _default_scanner.processes != processes):
+        _default_scanner.close()
+        _default_scanner = None
+    if _default_scanner is None:
+        _default_scanner = ShardedScanner(processes=processes)
+    return _default_scanner.get_blocks_with_data(c1, c2)
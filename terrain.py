@@ -0,0 +1,157 @@
+"""Clear areas, and dig shafts and stairs, with a few setBlocks calls
+
+Digging a block at a time costs a round trip per block: a 100x20x100
+area is 200000 of them, over a minute and a half at 2400 a second.
+Here each job is planned as a list of setBlocks boxes first, which is
+cheap, and can be looked at (or estimated) before anything is sent:
+  clear       the cuboid, in chunks of at most max_blocks blocks, so the
+              game is never asked to do too much in one call
+  dig_shaft   one box straight down, and one more for a ladder
+  dig_stairs  one box per step: the full width and headroom of the step
+              in a single call, and one more for the stair blocks
+The boxes are sent with a BulkWriter, a window of them at a time, so
+the game is not flooded, and progress can be shown as they are done.
+The writer tells its cache, index and heightmap about each box, so
+they agree with the world afterwards.
+
+    writer = BulkWriter(cache=mc, heightmap=hm)
+    boxes, cost = clear(writer, Vec3(-50, 0, -50), Vec3(50, 20, 50),
+                        progress=print_progress)
+    dig_stairs(writer, mc.player.getTilePos(), "+x", 20, width=2)
+"""
+
+from   mcpi.vec3 import Vec3
+from   bulk import estimate
+from   cuboid import block_pos, normalize_corners
+import mcpi.block as block
+import sys
+
+# A 16x16 chunk, 128 high: about what the game sets in one call
+# without a noticeable pause
+MAX_BLOCKS = 16 * 16 * 128
+
+# Horizontal directions, with the data value of a stair block which
+# is walked down going that way
+DIRECTIONS = {
+    "+x": (Vec3(1, 0, 0), 1),
+    "-x": (Vec3(-1, 0, 0), 0),
+    "+z": (Vec3(0, 0, 1), 3),
+    "-z": (Vec3(0, 0, -1), 2),
+}
+
+# Ladder data value for a ladder on the -z wall of its block
+LADDER_ON_MINUS_Z = 3
+
+def split_box(box, max_blocks=MAX_BLOCKS):
+    """Split a box into boxes of at most max_blocks blocks
+
+    Whole columns are kept together where they fit, and the pieces of
+    a column go from the top down, so sand and gravel have nothing to
+    fall into.
+    """
+    x1, y1, z1, x2, y2, z2 = box[0:6]
+    rest = tuple(box[6:])
+    nx, ny, nz = x2 - x1 + 1, y2 - y1 + 1, z2 - z1 + 1
+    if nx * ny * nz <= max_blocks:
+        return [box]
+    sy = min(ny, max_blocks)
+    sz = min(nz, max(1, max_blocks // sy))
+    sx = min(nx, max(1, max_blocks // (sy * sz)))
+    boxes = []
+    for x in xrange(x1, x2 + 1, sx):
+        for z in xrange(z1, z2 + 1, sz):
+            for top in xrange(y2, y1 - 1, -sy):
+                boxes.append((x, max(top - sy + 1, y1), z,
+                              min(x + sx - 1, x2), top,
+                              min(z + sz - 1, z2)) + rest)
+    return boxes
+
+def _box(c1, c2, blockid, blockdata=0):
+    lo, hi = normalize_corners(c1, c2)
+    return tuple(lo) + tuple(hi) + (blockid, blockdata)
+
+def plan_clear(c1, c2, blockid=block.AIR.id, max_blocks=MAX_BLOCKS):
+    """The boxes which set a cuboid to blockid (AIR, to clear it)"""
+    return split_box(_box(c1, c2, blockid), max_blocks)
+
+def plan_shaft(pos, depth, width=1, ladder=False):
+    """The boxes which dig a shaft down from pos
+
+    The shaft is width x width, from pos.x, pos.z, and goes from pos.y
+    down depth blocks.  With ladder, a ladder goes up its -z wall.
+    """
+    x, y, z = block_pos(pos)
+    bottom = y - depth + 1
+    boxes = split_box(_box((x, bottom, z), (x + width - 1, y, z + width - 1),
+                           block.AIR.id))
+    if ladder:
+        boxes.append(_box((x, bottom, z), (x, y, z), block.LADDER.id,
+                          LADDER_ON_MINUS_Z))
+    return boxes
+
+def plan_stairs(pos, direction, depth, width=1, headroom=3, stairs=None):
+    """The boxes which dig a staircase down from pos
+
+    parms:
+        pos: where the top step starts, at the level of your feet
+        direction: the way down, a key of DIRECTIONS, such as "+x"
+        depth: the number of steps, each one block down and one along
+        width: the width of the steps, to the right of pos going down
+               (for "+x", toward +z)
+        headroom: the blocks of AIR above each step
+        stairs: None to leave the ground as it is, or a stair block id
+                (such as block.STAIRS_COBBLESTONE.id) to set each step to
+    Stairs cut diagonally, so no box can hold two steps: this is one box
+    per step, which sets its whole width and headroom at once.
+    """
+    try:
+        v, stair_data = DIRECTIONS[direction]
+    except KeyError:
+        raise ValueError("direction must be one of %s" % sorted(DIRECTIONS))
+    # To the right, facing v (x is east, z is south)
+    across = Vec3(-v.z, 0, v.x) * (width - 1)
+    x, y, z = block_pos(pos)
+    boxes = []
+    treads = []
+    for i in range(depth):
+        p = Vec3(x + v.x * i, y - i, z + v.z * i)
+        boxes.append(_box(p, p + across + Vec3(0, headroom - 1, 0),
+                          block.AIR.id))
+        if stairs is not None:
+            tread = p - Vec3(0, 1, 0)
+            treads.append(_box(tread, tread + across, stairs, stair_data))
+    return boxes + treads
+
+def run(writer, boxes, window=8, progress=None, dry_run=False):
+    """Send boxes with a BulkWriter, a window at a time
+
+    Returns (boxes, estimate of their cost), like house.build_house.
+    """
+    if not dry_run:
+        writer.send_boxes(boxes, window, progress)
+    return boxes, estimate(boxes)
+
+def clear(writer, c1, c2, blockid=block.AIR.id, max_blocks=MAX_BLOCKS,
+          window=8, progress=None, dry_run=False):
+    """Clear a cuboid (or fill it with blockid); see plan_clear and run"""
+    return run(writer, plan_clear(c1, c2, blockid, max_blocks), window,
+               progress, dry_run)
+
+def dig_shaft(writer, pos, depth, width=1, ladder=False, window=8,
+              progress=None, dry_run=False):
+    """Dig a shaft; see plan_shaft and run"""
+    return run(writer, plan_shaft(pos, depth, width, ladder), window,
+               progress, dry_run)
+
+def dig_stairs(writer, pos, direction, depth, width=1, headroom=3,
+               stairs=None, window=8, progress=None, dry_run=False):
+    """Dig a staircase; see plan_stairs and run"""
+    return run(writer, plan_stairs(pos, direction, depth, width, headroom,
+                                   stairs), window, progress, dry_run)
+
+def print_progress(done, total):
+    """A progress function which shows boxes done on one line"""
+    sys.stdout.write("\r%d of %d boxes done" % (done, total))
+    if done == total:
+        sys.stdout.write("\n")
+    sys.stdout.flush()
@@ -0,0 +1,51 @@
+from   adaptive import AIMDController
+import unittest
+
+def feed(c, now, rtt, steps=3, dt=0.1):
+    """Answers at limit/rtt a second, with limit in flight, for steps
+
+    Returns the time after, and the limits set along the way.
+    """
+    limits = []
+    for i in range(steps):
+        now += dt
+        if c.observe(int(round(c.limit * dt / rtt)), c.limit, now):
+            limits.append(c.limit)
+    return now, limits
+
+class AIMDControllerTest(unittest.TestCase):
+    def test_slow_start_then_step(self):
+        c = AIMDController(limit=20, interval=0.25)
+        c.reset(0.0)
+        now, limits = feed(c, 0.0, 0.01, steps=9)
+        self.assertEqual(limits, [31, 47, 71])
+        self.assertTrue(c.slow_start)
+        # The game slows down: the limit is cut, and slow start is over
+        now, limits = feed(c, now, 0.05)
+        self.assertEqual(limits, [53])
+        self.assertFalse(c.slow_start)
+        now, limits = feed(c, now, 0.01, steps=6)
+        self.assertEqual(limits, [57, 61])
+        self.assertEqual(len(c.history), 6)
+
+    def test_limits(self):
+        c = AIMDController(limit=300, max_limit=400, min_limit=5)
+        c.reset(0.0)
+        now, limits = feed(c, 0.0, 0.01, steps=6)
+        self.assertEqual(limits, [400])
+        c.limit = 6
+        now, limits = feed(c, now, 1.0)
+        self.assertEqual(c.limit, 5)
+
+    def test_idle_time_is_not_slowness(self):
+        c = AIMDController(limit=20, interval=0.25)
+        c.reset(0.0)
+        now, limits = feed(c, 0.0, 0.01, steps=6)
+        self.assertEqual(limits, [31, 47])
+        # Nothing read for 10 seconds, then reading at the same pace
+        now, limits = feed(c, now + 10.0, 0.01, steps=4)
+        self.assertEqual(limits, [71])
+        self.assertEqual(min(limit for t, limit, rate, rtt in c.history), 31)
+
+if __name__ == "__main__":
+    unittest.main()
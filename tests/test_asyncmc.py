@@ -0,0 +1,60 @@
+from   asyncmc import AsyncMinecraft
+from   mcpi.connection import RequestError
+from   mcpi.vec3 import Vec3
+import fakemc
+import house
+import mcpi.block as block
+import unittest
+
+class AsyncMinecraftTest(unittest.TestCase):
+    def setUp(self):
+        self.world = fakemc.FakeWorld()
+        self.server = fakemc.FakeMinecraftServer(port=4772, world=self.world,
+                                                 tick=0.001,
+                                                 per_tick=1000).start()
+        self.client = AsyncMinecraft(port=4772)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_answers(self):
+        answers = [self.client.getBlock(0, y, 0) for y in (-1, 0, 1)]
+        self.assertEqual(self.client.wait(answers), [3, 2, 0])
+
+    def test_failure_does_not_lose_the_batch(self):
+        bad = self.client._request("world.noSuchThing", (1, 2, 3), int)
+        rest = [self.client.getBlock(0, 0, z) for z in range(5)]
+        self.assertRaises(RequestError, self.client.wait, [bad] + rest)
+        self.assertEqual([a.result() for a in rest], [2] * 5)
+        self.assertEqual(self.client.in_flight, 0)
+
+    def test_iter_blocks_in_order(self):
+        positions = [(0, y, 0) for y in range(-3, 3)]
+        self.assertEqual(list(self.client.iter_blocks(positions)),
+                         zip(positions, [1, 1, 3, 2, 0, 0]))
+        for pos, b in self.client.iter_blocks_with_data(positions):
+            break
+        self.assertEqual(list(self.client.iter_heights([(0, 0), (5, 5)])),
+                         [((0, 0), 0), ((5, 5), 0)])
+
+    def test_find_house(self):
+        for x in range(6):
+            self.world.set(x, 1, 0, block.STONE.id)
+        for z in range(5):
+            self.world.set(0, 1, z, block.STONE.id)
+        for y in range(2, 4):
+            self.world.set(0, y, 0, block.STONE.id)
+        self.world.set(1, 1, 1, block.TORCH.id)
+        corner, dim = house.find_house(self.client, Vec3(1, 1, 2))
+        self.assertEqual((tuple(corner), tuple(dim)), ((0, 1, 0), (5, 2, 4)))
+        blocks = self.client.get_blocks(Vec3(0, 1, 0), Vec3(1, 1, 1))
+        self.assertEqual(blocks[(1, 1, 1)], block.TORCH.id)
+
+    def test_unanswerable(self):
+        answer = self.client.getBlock(0, 0, 0)
+        self.client.close()
+        self.assertRaises(RequestError, answer.result)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+from   blockcache import BlockCache
+from   mcpi.vec3 import Vec3
+from   pipeline import PipelinedGetter
+import fakemc
+import mcpi.block as block
+import mcpi.minecraft as minecraft
+import time
+import unittest
+
+class BlockCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.world = fakemc.FakeWorld()
+        self.server = fakemc.FakeMinecraftServer(port=4775, world=self.world,
+                                                 tick=0.001,
+                                                 per_tick=1000).start()
+        self.getter = PipelinedGetter(port=4775)
+        self.mc = BlockCache(minecraft.Minecraft.create(port=4775),
+                             getter=self.getter)
+
+    def tearDown(self):
+        self.mc.conn.socket.close()
+        self.getter.close()
+        self.server.stop()
+
+    def test_hits_and_misses(self):
+        self.assertEqual(self.mc.getBlock(0, 0, 0), block.GRASS.id)
+        self.assertEqual(self.mc.getBlock(0.5, 0.2, 0.9), block.GRASS.id)
+        self.assertEqual(self.mc.getBlockWithData(0, 0, 0).id,
+                         block.GRASS.id)
+        stats = self.mc.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+    def test_writes_forget(self):
+        changes = []
+        self.mc.on_change.append(lambda c1, c2, b: changes.append(b))
+        self.mc.getBlock(1, 1, 1)
+        self.mc.setBlock(1, 1, 1, block.STONE.id)
+        self.assertEqual(self.mc.getBlock(1, 1, 1), block.STONE.id)
+        self.mc.getBlock(2, 1, 1)
+        self.mc.setBlocks(0, 1, 0, 3, 1, 3, block.WOOD.id)
+        self.assertEqual(self.mc.getBlock(2, 1, 1), block.WOOD.id)
+        self.mc.invalidate(Vec3(2, 1, 1))
+        self.assertEqual(changes, [(block.STONE.id, 0), (block.WOOD.id, 0),
+                                   None])
+        self.assertEqual(self.mc.stats()["hits"], 0)
+
+    def test_ttl_and_maxsize(self):
+        mc = BlockCache(self.mc.mc, maxsize=2, ttl=0.05)
+        for x in range(3):
+            mc.getBlock(x, 0, 0)
+        self.assertEqual(mc.stats()["size"], 2)
+        mc.getBlock(2, 0, 0)
+        self.assertEqual(mc.hits, 1)
+        time.sleep(0.06)
+        mc.getBlock(2, 0, 0)
+        self.assertEqual(mc.hits, 1)
+
+    def test_iter_blocks_through_the_getter(self):
+        self.mc.getBlock(0, 0, 0)
+        positions = [(x, 0, 0) for x in range(-2, 3)]
+        requests = self.server.requests
+        got = dict(self.mc.iter_blocks(positions))
+        self.assertEqual(got, dict((pos, block.GRASS.id)
+                                   for pos in positions))
+        self.assertEqual(self.server.requests - requests, 4)
+        self.assertEqual((self.mc.hits, self.mc.misses), (1, 5))
+        blocks = self.mc.get_blocks(Vec3(-2, 0, 0), Vec3(2, 1, 0))
+        self.assertEqual(blocks[(1, 1, 0)], block.AIR.id)
+        self.assertEqual(self.mc.hits, 6)
+
+if __name__ == "__main__":
+    unittest.main()
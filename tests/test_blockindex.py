@@ -0,0 +1,62 @@
+from   blockindex import BlockIndex
+from   cuboid import Cuboid
+from   mcpi.vec3 import Vec3
+import mcpi.block as block
+import unittest
+
+class BlockIndexTest(unittest.TestCase):
+    def setUp(self):
+        # Two chunks along x, and part of the chunks below y=0
+        self.region = Cuboid.empty(Vec3(-20, -3, 0), Vec3(19, 4, 5),
+                                   with_data=False)
+        self.region.ids[:] = block.AIR.id
+        self.region[(-18, -2, 1)] = block.LEAVES.id
+        self.region[(10, 3, 4)] = block.LEAVES.id
+        self.region[(3, 0, 0)] = block.TORCH.id
+        self.index = BlockIndex()
+        self.index.add(self.region)
+
+    def test_get(self):
+        self.assertEqual(self.index.get(Vec3(3, 0, 0)), block.TORCH.id)
+        self.assertEqual(self.index.get(Vec3(3.5, 0.9, 0.2)), block.TORCH.id)
+        self.assertEqual(self.index.get(Vec3(-17.5, -1.5, 1.5)),
+                         block.LEAVES.id)
+        self.assertEqual(self.index.get(Vec3(0, 0, 0)), block.AIR.id)
+        self.assertEqual(self.index.get(Vec3(0, 0, 6)), None)
+
+    def test_nearest(self):
+        leaves = block.LEAVES.id
+        self.assertEqual(self.index.nearest(leaves, Vec3(0, 0, 0)),
+                         Vec3(10, 3, 4))
+        self.assertEqual(self.index.nearest(leaves, Vec3(-10, 0, 0)),
+                         Vec3(-18, -2, 1))
+        self.assertEqual(self.index.nearest([leaves, block.TORCH.id],
+                                            Vec3(0, 0, 0)), Vec3(3, 0, 0))
+        self.assertEqual(self.index.nearest(leaves, Vec3(0, 0, 0), 5), None)
+        self.assertEqual(self.index.nearest(block.STONE.id, Vec3(0, 0, 0)),
+                         None)
+
+    def test_in_box(self):
+        found = self.index.in_box(block.LEAVES.id, Vec3(19, 4, 5),
+                                  Vec3(-19, -3, 0))
+        self.assertEqual(sorted(map(tuple, found.tolist())),
+                         [(-18, -2, 1), (10, 3, 4)])
+        self.assertEqual(len(self.index.in_box(block.LEAVES.id,
+                                               Vec3(0, 0, 0),
+                                               Vec3(5, 5, 5))), 0)
+
+    def test_writes(self):
+        self.index.on_change(Vec3(10, 3, 4), Vec3(10, 3, 4),
+                             (block.AIR.id, 0))
+        self.index.set(Vec3(0, 1, 1), Vec3(1, 1, 1), block.LEAVES.id)
+        self.assertEqual(self.index.nearest(block.LEAVES.id, Vec3(5, 0, 0)),
+                         Vec3(1, 1, 1))
+        self.index.on_change(Vec3(0, 1, 1), Vec3(1, 1, 1), None)
+        self.assertEqual(self.index.get(Vec3(1, 1, 1)), None)
+        self.assertEqual(self.index.nearest(block.LEAVES.id, Vec3(5, 0, 0)),
+                         Vec3(-18, -2, 1))
+        self.index.forget(Vec3(-20, -3, 0), Vec3(19, 4, 5))
+        self.assertEqual(self.index.chunks, {})
+
+if __name__ == "__main__":
+    unittest.main()
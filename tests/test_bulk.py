@@ -0,0 +1,51 @@
+from   mcpi.vec3 import Vec3
+from   bulk import plan_boxes
+from   cuboid import Cuboid
+import numpy
+import unittest
+
+def apply_boxes(cuboid, boxes):
+    """A copy of cuboid with boxes set, as world.setBlocks would"""
+    ans = Cuboid(cuboid.origin, cuboid.ids.copy(), cuboid.data.copy())
+    ox, oy, oz = cuboid.origin
+    for x1, y1, z1, x2, y2, z2, blockid, blockdata in boxes:
+        index = (slice(x1-ox, x2-ox+1), slice(y1-oy, y2-oy+1),
+                 slice(z1-oz, z2-oz+1))
+        ans.ids[index] = blockid
+        ans.data[index] = blockdata
+    return ans
+
+class PlanBoxesTest(unittest.TestCase):
+    def test_boxes_reproduce_desired(self):
+        rand = numpy.random.RandomState(1)
+        for shape in [(1, 1, 1), (4, 3, 5), (7, 2, 9), (10, 10, 10)]:
+            c1 = Vec3(-3, 2, -4)
+            c2 = c1 + Vec3(*[n - 1 for n in shape])
+            current = Cuboid.empty(c1, c2)
+            desired = Cuboid.empty(c1, c2)
+            current.ids[:] = rand.randint(0, 3, shape)
+            desired.ids[:] = rand.randint(0, 3, shape)
+            desired.data[:] = rand.randint(0, 2, shape)
+            boxes = plan_boxes(desired, current)
+            built = apply_boxes(current, boxes)
+            self.assertTrue((built.ids == desired.ids).all())
+            self.assertTrue((built.data == desired.data).all())
+
+    def test_clear_is_one_box(self):
+        c1, c2 = Vec3(0, 0, 0), Vec3(99, 20, 99)
+        current = Cuboid.empty(c1, c2)
+        current.ids[:] = 1
+        boxes = plan_boxes(Cuboid.empty(c1, c2), current)
+        self.assertEqual(boxes, [(0, 0, 0, 99, 20, 99, 0, 0)])
+
+    def test_no_change_no_boxes(self):
+        c = Cuboid.empty(Vec3(0, 0, 0), Vec3(3, 3, 3))
+        self.assertEqual(plan_boxes(c, c), [])
+
+    def test_different_cuboids(self):
+        a = Cuboid.empty(Vec3(0, 0, 0), Vec3(3, 3, 3))
+        b = Cuboid.empty(Vec3(1, 0, 0), Vec3(4, 3, 3))
+        self.assertRaises(ValueError, plan_boxes, a, b)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+from   mcpi.vec3 import Vec3
+from   cuboid import Cuboid, block_pos, normalize_corners
+import mcpi.block as block
+import unittest
+
+class CornersTest(unittest.TestCase):
+    def test_block_pos_rounds_down(self):
+        self.assertEqual(block_pos(Vec3(-0.5, 0.5, -10)), (-1, 0, -10))
+        self.assertEqual(block_pos((-10.5, 2.999, 3)), (-11, 2, 3))
+
+    def test_normalize_corners(self):
+        lo, hi = normalize_corners(Vec3(-0.5, 5, 0), Vec3(-10.5, 0, 0.5))
+        self.assertEqual((tuple(lo), tuple(hi)), ((-11, 0, 0), (-1, 5, 0)))
+
+    def test_origin_rounds_down(self):
+        c = Cuboid(Vec3(-0.5, 1.5, -2.5), None)
+        self.assertEqual(tuple(c.origin), (-1, 1, -3))
+
+class CuboidTest(unittest.TestCase):
+    def test_empty_rounds_corners_down(self):
+        c = Cuboid.empty(Vec3(-10.5, 1, 0.5), Vec3(-0.5, 2.7, 0.5))
+        self.assertEqual(tuple(c.origin), (-11, 1, 0))
+        self.assertEqual(c.shape, (11, 2, 1))
+
+    def test_world_coordinates(self):
+        c = Cuboid.empty(Vec3(-5, 0, -5), Vec3(5, 2, 5))
+        c[(-5, 0, 5)] = (block.STONE.id, 3)
+        self.assertEqual(c[(-5, 0, 5)], (block.STONE.id, 3))
+        self.assertEqual(c.ids[0, 0, 10], block.STONE.id)
+        self.assertTrue((-5, 0, 5) in c)
+        self.assertFalse((6, 0, 0) in c)
+        self.assertRaises(KeyError, lambda: c[(6, 0, 0)])
+
+    def test_slices_share_arrays(self):
+        c = Cuboid.empty(Vec3(-5, 0, -5), Vec3(5, 2, 5))
+        row = c[-5:6, 1, 0]
+        self.assertEqual(tuple(row.origin), (-5, 1, 0))
+        self.assertEqual(row.shape, (11, 1, 1))
+        row[(2, 1, 0)] = block.TORCH.id
+        self.assertEqual(c[(2, 1, 0)], (block.TORCH.id, 0))
+
+    def test_where_and_first(self):
+        c = Cuboid.empty(Vec3(-3, 0, 0), Vec3(3, 0, 0), with_data=False)
+        c[(-1, 0, 0)] = block.STONE.id
+        c[(2, 0, 0)] = block.STONE.id
+        self.assertEqual(c.where(block.STONE.id).tolist(),
+                         [[-1, 0, 0], [2, 0, 0]])
+        self.assertEqual(c.count(block.STONE.id), 2)
+        self.assertEqual(c.first(block.STONE.id), -1)
+        self.assertEqual(c.first(block.STONE.id, reverse=True), 2)
+        self.assertEqual(c.first(block.WOOD.id), None)
+
+if __name__ == "__main__":
+    unittest.main()
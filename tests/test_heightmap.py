@@ -0,0 +1,76 @@
+from   heightmap import Heightmap, NO_GROUND
+from   mcpi.vec3 import Vec3
+from   pipeline import PipelinedGetter
+import fakemc
+import mcpi.block as block
+import unittest
+
+class HeightmapTest(unittest.TestCase):
+    def setUp(self):
+        self.world = fakemc.FakeWorld()
+        self.server = fakemc.FakeMinecraftServer(port=4779, world=self.world,
+                                                 tick=0.001,
+                                                 per_tick=1000).start()
+        self.getter = PipelinedGetter(port=4779)
+        self.hm = Heightmap(self.getter, Vec3(-4, -64, -4), Vec3(3, 63, 3))
+
+    def tearDown(self):
+        self.getter.close()
+        self.server.stop()
+
+    def test_ground(self):
+        self.world.set(1, 1, 1, block.STONE.id)
+        self.world.set(1, 2, 1, block.TORCH.id)
+        self.world.set(-2, 1, 2, block.LEAVES.id)
+        self.world.set(2, 3, 2, block.WOOD.id)
+        self.hm.refresh()
+        self.assertEqual(self.hm.ground_at(0, 0), 0)
+        self.assertEqual(self.hm.ground_at(1, 1), 1)     # under the torch
+        self.assertEqual(self.hm.ground_at(-2, 2), 0)    # under the leaves
+        self.assertEqual(self.hm.ground_at(2, 2), 3)
+        self.assertFalse(self.hm.dirty.any())
+
+    def test_ground_at_rounds_down(self):
+        self.world.set(-1, 2, -1, block.STONE.id)
+        self.hm.refresh()
+        # Player coordinates: (-0.5, -0.5) is in column (-1, -1), not (0, 0)
+        self.assertEqual(self.hm.ground_at(-0.5, -0.5), 2)
+        self.assertEqual(self.hm.ground_at(-1.0, -0.01), 2)
+        self.assertEqual(self.hm.ground_at(0.5, 0.5), 0)
+
+    def test_refresh_reads_only_dirty_columns(self):
+        self.hm.refresh()
+        requests = self.hm.requests
+        self.hm.refresh()
+        self.assertEqual(self.hm.requests, requests)
+        self.world.set(0, 5, 0, block.STONE.id)
+        self.hm.mark_dirty(Vec3(0, 5, 0))
+        self.hm.refresh()
+        self.assertEqual(self.hm.ground_at(0, 0), 5)
+        self.assertEqual(self.hm.requests, requests + 2)
+
+    def test_wrote(self):
+        self.hm.refresh()
+        requests = self.hm.requests
+        # Ground raises the columns under it without a read
+        self.hm.wrote(Vec3(0, 1, 0), Vec3(1, 4, 1), (block.STONE.id, 0))
+        self.assertEqual(self.hm.ground_at(1, 1), 4)
+        self.assertFalse(self.hm.dirty.any())
+        # AIR above the ground changes nothing
+        self.hm.wrote(Vec3(-3, 10, -3), Vec3(3, 20, 3), (block.AIR.id, 0))
+        self.assertFalse(self.hm.dirty.any())
+        # AIR through the ground leaves it unknown
+        self.hm.wrote(Vec3(0, 3, 0), Vec3(0, 4, 0), (block.AIR.id, 0))
+        self.assertEqual(self.hm.dirty.sum(), 1)
+        self.assertTrue(self.hm.dirty[4, 4])
+        self.hm.refresh()
+        self.assertEqual(self.hm.ground_at(0, 0), 0)
+        self.assertTrue(self.hm.requests > requests)
+
+    def test_no_ground(self):
+        hm = Heightmap(self.getter, Vec3(0, 5, 0), Vec3(1, 10, 1))
+        hm.refresh()
+        self.assertEqual(hm.ground_at(0, 0), NO_GROUND)
+
+if __name__ == "__main__":
+    unittest.main()
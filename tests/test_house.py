@@ -0,0 +1,91 @@
+from   mcpi.vec3 import Vec3
+from   cuboid import Cuboid
+import house
+import mcpi.block as block
+import unittest
+
+class DictGetter:
+    """A getter for the blocks in a dict; anything else is AIR"""
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+    def iter_blocks(self, positions):
+        for pos in positions:
+            yield pos, self.blocks.get(pos, block.AIR.id)
+
+class HouseTest(unittest.TestCase):
+    def test_find_corner_every_way(self):
+        for template, vector in house.CORNERS:
+            blocks = Cuboid.empty(Vec3(-1, 0, -1), Vec3(1, 0, 1))
+            blocks.ids[:, 0, :] = template * block.STONE.id
+            blocks[(0, 0, 0)] = block.TORCH.id
+            corner, v = house.find_corner(blocks, Vec3(0, 0, 0))
+            self.assertEqual(tuple(v), tuple(vector))
+            self.assertEqual(tuple(corner), (-vector.x, 0, -vector.z))
+
+    def test_find_corner_fails(self):
+        blocks = Cuboid.empty(Vec3(-1, 0, -1), Vec3(1, 0, 1))
+        self.assertRaises(house.CornerFindError, house.find_corner,
+                          blocks, Vec3(0, 0, 0))
+
+    def test_measure_runs(self):
+        wall = dict(((x, 0, 0), block.STONE.id) for x in range(40))
+        wall.update(((0, y, 0), block.STONE.id) for y in range(1, 4))
+        getter = DictGetter(wall)
+        self.assertEqual(house.measure_runs(getter, Vec3(0, 0, 0), [
+            Vec3(1, 0, 0), Vec3(0, 1, 0), Vec3(0, 0, 1)]), [40, 4, 1])
+
+    def test_measure_runs_to_world_edge(self):
+        wall = dict(((x, 0, 0), block.STONE.id) for x in range(10))
+        wall.update(((x, 0, 0), block.BEDROCK_INVISIBLE.id)
+                    for x in range(10, 1000))
+        getter = DictGetter(wall)
+        self.assertEqual(house.measure_runs(getter, Vec3(0, 0, 0),
+                                            [Vec3(1, 0, 0)]), [10])
+        endless = DictGetter(dict(((x, 0, 0), block.STONE.id)
+                                  for x in range(1000)))
+        self.assertEqual(house.measure_runs(endless, Vec3(0, 0, 0),
+                                            [Vec3(1, 0, 0)]),
+                         [house.MAX_RUN])
+
+    def test_compile_house(self):
+        spec = house.HouseSpec(wall=block.STONE.id, roof=block.WOOD.id,
+                               openings=[house.door("near_x", 2)])
+        corner, dim = Vec3(10, 0, 20), Vec3(-4, 3, 5)
+        boxes = house.compile_house(corner, dim, spec)
+        built = Cuboid.empty(Vec3(6, 0, 20), Vec3(10, 4, 25),
+                             with_data=False)
+        for x1, y1, z1, x2, y2, z2, blockid, blockdata in boxes:
+            built[x1:x2+1, y1:y2+1, z1:z2+1].ids[:] = blockid
+        self.assertEqual(built[(10, 0, 20)], block.STONE.id)   # corner
+        self.assertEqual(built[(6, 3, 25)], block.STONE.id)    # far corner
+        self.assertEqual(built[(8, 1, 22)], block.AIR.id)      # inside
+        self.assertEqual(built[(8, 4, 22)], block.WOOD.id)     # roof
+        self.assertEqual(built[(8, 0, 20)], block.AIR.id)      # door
+        self.assertEqual(built[(8, 1, 20)], block.AIR.id)
+        self.assertEqual(built[(8, 2, 20)], block.STONE.id)
+        self.assertEqual(house.estimate(boxes)["calls"], len(boxes))
+
+    def test_openings_must_fit(self):
+        corner = Vec3(0, 0, 0)
+        low = Vec3(4, 0, 4)      # walls 1 high
+        self.assertRaises(ValueError, house.compile_house, corner, low,
+                          house.HouseSpec(openings=[house.window("near_x",
+                                                                 1)]))
+        self.assertRaises(ValueError, house.compile_house, corner,
+                          Vec3(3, 3, 3),
+                          house.HouseSpec(openings=[house.door("far_z", 9)]))
+        self.assertRaises(ValueError, house.compile_house, corner,
+                          Vec3(3, 3, 3),
+                          house.HouseSpec(openings=[house.door("far_z", 3,
+                                                               width=2)]))
+        self.assertRaises(ValueError, house.compile_house, corner,
+                          Vec3(3, 3, 3),
+                          house.HouseSpec(openings=[("roof", 1, 0, 1, 1)]))
+        boxes = house.compile_house(corner, Vec3(3, 3, 3), house.HouseSpec(
+            openings=[house.door("far_z", 3), house.window("near_z", 2)]))
+        self.assertEqual(boxes[-2:], [(3, 0, 3, 3, 1, 3, block.AIR.id, 0),
+                                      (0, 2, 2, 0, 2, 3, block.AIR.id, 0)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+from   instrument import Histogram, Metrics
+from   mcpi.vec3 import Vec3
+from   pipeline import PipelinedGetter
+from   readers import ParallelGetter
+import fakemc
+import json
+import unittest
+
+class HistogramTest(unittest.TestCase):
+    def test_percentile(self):
+        h = Histogram()
+        self.assertEqual(h.percentile(50), 0.0)
+        for value in [0.0005] * 90 + [0.03] * 9 + [7.0]:
+            h.observe(value)
+        self.assertEqual(h.count, 100)
+        self.assertEqual(h.counts[0], 90)
+        self.assertEqual(h.counts[-1], 1)
+        self.assertEqual(h.percentile(50), 0.001)
+        self.assertEqual(h.percentile(99), 0.05)
+        self.assertEqual(h.percentile(100), float("inf"))
+
+class MetricsTest(unittest.TestCase):
+    def test_counters(self):
+        m = Metrics(slow_threshold=0.2, slow_log_size=2)
+        cid = m.new_connection_id()
+        for i in range(3):
+            m.sent()
+        m.answered("world.getBlock", (1, 2, 3), 0.01, cid)
+        m.answered("world.getBlock", (17, 2, -1), 0.5, cid)
+        m.unanswered()
+        snap = m.snapshot()
+        self.assertEqual((snap["in_flight"], snap["max_in_flight"]), (0, 3))
+        self.assertEqual(snap["latency"]["world.getBlock"]["count"], 2)
+        self.assertEqual(snap["connections"][str(cid)]["answers"], 2)
+        self.assertEqual([s["args"] for s in snap["slow"]], [[17, 2, -1]])
+        self.assertEqual(snap["slow_chunks"], {"1,-1": 1})
+        self.assertEqual(json.loads(m.to_json())["max_in_flight"], 3)
+        prom = m.to_prometheus()
+        self.assertTrue('mcpi_request_seconds_bucket{command="world.getBlock"'
+                        ',le="0.01"} 1\n' in prom)
+        self.assertTrue('mcpi_request_seconds_count{command="world.getBlock"}'
+                        ' 2\n' in prom)
+        self.assertTrue('mcpi_slow_requests_total{chunk="1,-1"} 1\n' in prom)
+
+class ReadersTest(unittest.TestCase):
+    def setUp(self):
+        self.server = fakemc.FakeMinecraftServer(port=4782, tick=0.001,
+                                                 per_tick=1000).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_pipelined(self):
+        m = Metrics()
+        getter = PipelinedGetter(port=4782, depth=10, metrics=m)
+        getter.get_blocks(Vec3(0, 0, 0), Vec3(4, 1, 4))
+        getter.close()
+        snap = m.snapshot()
+        self.assertEqual(snap["latency"]["world.getBlock"]["count"], 50)
+        self.assertEqual(snap["in_flight"], 0)
+        self.assertEqual(len(snap["connections"]), 2)
+
+    def test_parallel(self):
+        m = Metrics()
+        with ParallelGetter(port=4782, parallelism=4, metrics=m) as getter:
+            getter.get_blocks_with_data(Vec3(0, 0, 0), Vec3(4, 1, 4))
+        snap = m.snapshot()
+        self.assertEqual(
+            snap["latency"]["world.getBlockWithData"]["count"], 50)
+        self.assertEqual(snap["in_flight"], 0)
+        self.assertTrue(snap["queue_wait"]["count"] > 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+from   bulk import BulkWriter
+from   mcpi.vec3 import Vec3
+from   miniature import make_miniature, tile_mean, tile_mode
+from   pipeline import PipelinedGetter
+import fakemc
+import mcpi.block as block
+import numpy
+import unittest
+
+class TileTest(unittest.TestCase):
+    def test_tile_mode(self):
+        ids = numpy.zeros((4, 6), numpy.uint8)
+        ids[:2, :3] = [[1, 1, 2], [2, 3, 1]]
+        ids[2:, 3:] = [[5, 5, 4], [4, 7, 7]]      # a tie goes to 4
+        self.assertEqual(tile_mode(ids, (2, 2)).tolist(), [[1, 0], [0, 4]])
+
+    def test_tile_mean(self):
+        a = numpy.arange(16).reshape(4, 4)
+        self.assertEqual(tile_mean(a, (2, 2)).tolist(),
+                         [[2.5, 4.5], [10.5, 12.5]])
+
+class MiniatureTest(unittest.TestCase):
+    def setUp(self):
+        self.world = fakemc.FakeWorld()
+        self.server = fakemc.FakeMinecraftServer(port=4780, world=self.world,
+                                                 tick=0.001,
+                                                 per_tick=1000).start()
+        # One socket, so reads come after the writes sent before them
+        self.getter = PipelinedGetter(port=4780, sockets=1)
+
+    def tearDown(self):
+        self.getter.close()
+        self.server.stop()
+
+    def column(self, x, y, z):
+        """The blocks of the miniature column at (x, z), from y up"""
+        self.getter.get_blocks(Vec3(0, 0, 0), Vec3(0, 0, 0))   # sync
+        return [self.world.get(x, y + i, z)[0] for i in range(16)]
+
+    def test_miniature(self):
+        for x in range(8):
+            for z in range(8):
+                self.world.set(x, 8, z, block.STONE.id)
+        stats = make_miniature(self.getter, BulkWriter(self.getter),
+                               Vec3(0, -64, 0), Vec3(31, 63, 31),
+                               Vec3(40, 10, 40), tiles=4)
+        self.assertEqual(stats["requests"], 2 * 32 * 32)
+        # Heights from the bottom of the world, scaled down by 8
+        self.assertEqual(self.column(40, 10, 40),
+                         [block.STONE.id] * 10 + [block.AIR.id] * 6)
+        self.assertEqual(self.column(43, 10, 43),
+                         [block.GRASS.id] * 9 + [block.AIR.id] * 7)
+
+    def test_does_not_read_itself(self):
+        # The miniature is built over the last band of the world, which
+        # is read after the first rows of the miniature are written; up
+        # high, so they would raise the average height of that band
+        make_miniature(self.getter, BulkWriter(self.getter),
+                       Vec3(0, -64, 0), Vec3(31, 63, 31),
+                       Vec3(24, 40, 0), tiles=4)
+        expected = [block.GRASS.id] * 9 + [block.AIR.id] * 7
+        for x in range(24, 28):
+            for z in range(4):
+                self.assertEqual(self.column(x, 40, z), expected)
+
+if __name__ == "__main__":
+    unittest.main()
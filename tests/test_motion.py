@@ -0,0 +1,53 @@
+from   mcpi.vec3 import Vec3
+from   motion import MotionExecutor, Parabola
+from   pipeline import PipelinedGetter
+import fakemc
+import mcpi.block as block
+import motion
+import unittest
+
+class ParabolaTest(unittest.TestCase):
+    def test_ends_at_dest(self):
+        path = Parabola(Vec3(0.5, 1, 0.5), Vec3(10.5, 4, -3.5))
+        p = path.position(path.duration)
+        self.assertAlmostEqual(p.x, 10.5)
+        self.assertAlmostEqual(p.y, 4)
+        self.assertAlmostEqual(p.z, -3.5)
+
+    def test_corners_are_blocks(self):
+        path = Parabola(Vec3(-0.5, 1, 0.5), Vec3(-10.5, 1, -0.5))
+        lo, hi = path.corners()
+        self.assertEqual((lo.x, lo.y, lo.z), (-11, 1, -1))
+        self.assertEqual((hi.x, hi.z), (-1, 0))
+        self.assertTrue(hi.y > 1)
+
+class ClockTest(unittest.TestCase):
+    def test_clock_goes_forward(self):
+        times = [motion.clock() for i in range(1000)]
+        self.assertEqual(times, sorted(times))
+
+class MotionExecutorTest(unittest.TestCase):
+    def leap(self, dx):
+        """Leap dx blocks along x, into a wall at the last block"""
+        world = fakemc.FakeWorld()
+        wall = int(dx) - (1 if dx < 0 else 0)
+        for y in range(1, 4):
+            world.set(wall, y, 0, block.STONE.id)
+        with fakemc.FakeMinecraftServer(port=4773, world=world, tick=0.001,
+                                        per_tick=1000):
+            getter = PipelinedGetter(port=4773)
+            executor = MotionExecutor(port=4773, getter=getter)
+            start = Vec3(0.5 if dx > 0 else -0.5, 1, 0.5)
+            result = executor.run(Parabola(start, start + Vec3(dx, 0, 0)))
+            executor.close()
+            getter.close()
+        return wall, result
+
+    def test_collision_both_ways(self):
+        for dx in (10, -10):
+            wall, result = self.leap(dx)
+            self.assertFalse(result["completed"])
+            self.assertEqual(result["collision"][0], wall)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+from   mcpi.connection import RequestError
+from   mcpi.vec3 import Vec3
+from   pipeline import PipelinedGetter, gen_answers, gen_cuboid_xyz
+import fakemc
+import mcpi.block as block
+import unittest
+
+class PipelinedGetterTest(unittest.TestCase):
+    def setUp(self):
+        self.world = fakemc.FakeWorld()
+        self.world.set(2, 1, -3, block.WOOL.id, 5)
+        self.server = fakemc.FakeMinecraftServer(port=4776, world=self.world,
+                                                 tick=0.001,
+                                                 per_tick=1000).start()
+        self.getter = PipelinedGetter(port=4776, sockets=2, depth=10)
+
+    def tearDown(self):
+        self.getter.close()
+        self.server.stop()
+
+    def test_cuboid_xyz(self):
+        self.assertEqual(list(gen_cuboid_xyz(Vec3(1, 0, 1), Vec3(0, 0, 2))),
+                         [(0, 0, 1), (0, 0, 2), (1, 0, 1), (1, 0, 2)])
+
+    def test_get_blocks(self):
+        c1, c2 = Vec3(-5, -2, -5), Vec3(5, 2, 5)
+        blocks = self.getter.get_blocks_with_data(c1, c2)
+        for pos in gen_cuboid_xyz(c1, c2):
+            self.assertEqual(blocks[pos], self.world.get(*pos))
+        ids = self.getter.get_blocks(c1, c2)
+        self.assertEqual(ids[(2, 1, -3)], block.WOOL.id)
+        self.assertEqual(ids.count(block.GRASS.id), 11 * 11)
+
+    def test_stop_early(self):
+        positions = list(gen_cuboid_xyz(Vec3(0, 1, -20), Vec3(20, 1, 20)))
+        for pos, blockid in self.getter.iter_blocks(positions):
+            if blockid == block.WOOL.id:
+                break
+        self.assertEqual(pos, (2, 1, -3))
+        # The rest were not sent, and what was sent has been read
+        self.assertTrue(self.server.requests < 200)
+        self.assertFalse(any(c.pending for c in self.getter.connections))
+        self.assertEqual(self.getter.get_blocks_with_data(
+            Vec3(2, 1, -3), Vec3(2, 0, -3)).to_dict(),
+            {(2, 0, -3): (block.GRASS.id, 0), (2, 1, -3): (block.WOOL.id, 5)})
+
+    def test_one_socket_in_order(self):
+        getter = PipelinedGetter(port=4776, sockets=1, depth=7)
+        positions = [(x, 0, 0) for x in range(-30, 30)]
+        self.assertEqual([pos for pos, b in getter.iter_blocks(positions)],
+                         positions)
+        getter.close()
+
+    def test_iter_rows(self):
+        c1, c2 = Vec3(0, 0, -3), Vec3(3, 1, 0)
+        rows = list(self.getter.iter_rows(c1, c2))
+        self.assertEqual(len(rows), 4 * 2)
+        self.assertEqual(sorted((r.origin.x, r.origin.y) for r in rows),
+                         [(x, y) for x in range(4) for y in range(2)])
+        for row in rows:
+            self.assertEqual(row.shape, (1, 1, 4))
+            x, y = row.origin.x, row.origin.y
+            self.assertEqual([row[(x, y, z)] for z in range(-3, 1)],
+                             [self.world.get(x, y, z) for z in range(-3, 1)])
+
+    def test_failure(self):
+        connections = self.getter.get_connections()
+        answers = gen_answers(connections, [(0, 0, 0), ("x", 0, 0)],
+                              "world.getBlock", int)
+        self.assertRaises(RequestError, list, answers)
+        self.assertFalse(any(c.pending for c in connections))
+        self.assertEqual(self.getter.get_blocks(Vec3(0, 0, 0),
+                                                Vec3(0, 0, 0)).ids[0, 0, 0],
+                         block.GRASS.id)
+
+if __name__ == "__main__":
+    unittest.main()
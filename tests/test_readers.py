@@ -0,0 +1,69 @@
+from   mcpi.vec3 import Vec3
+from   pipeline import gen_cuboid_xyz
+from   readers import ParallelGetter
+import fakemc
+import mcpi.block as block
+import unittest
+
+class ParallelGetterTest(unittest.TestCase):
+    def setUp(self):
+        self.world = fakemc.FakeWorld()
+        self.world.set(-1, 1, 2, block.WOOL.id, 3)
+        self.server = fakemc.FakeMinecraftServer(port=4777, world=self.world,
+                                                 tick=0.001,
+                                                 per_tick=1000).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_get_blocks(self):
+        c1, c2 = Vec3(3, 2, 3), Vec3(-3, -2, -3)
+        with ParallelGetter(port=4777, parallelism=8) as getter:
+            blocks = getter.get_blocks_with_data(c1, c2)
+            ids = getter.get_blocks(c1, c2)
+        for pos in gen_cuboid_xyz(c1, c2):
+            self.assertEqual(blocks[pos], self.world.get(*pos))
+            self.assertEqual(ids[pos], self.world.get(*pos)[0])
+
+    def test_workers_are_kept(self):
+        getter = ParallelGetter(port=4777, parallelism=6)
+        getter.get_blocks(Vec3(0, 0, 0), Vec3(3, 0, 3))
+        workers = list(getter._workers)
+        self.assertEqual(len(workers), 6)
+        getter.get_blocks(Vec3(0, 0, 0), Vec3(3, 0, 3))
+        self.assertEqual(getter._workers, workers)
+        getter.parallelism = 2
+        self.assertEqual(getter.get_blocks(Vec3(-1, 1, 2),
+                                           Vec3(-1, 1, 2)).ids[0, 0, 0],
+                         block.WOOL.id)
+        self.assertEqual(getter._running, 2)
+        getter.close()
+        self.assertFalse(any(t.is_alive() for t in workers))
+
+class WorkRangesTest(unittest.TestCase):
+    def covered(self, ranges):
+        return [(x, y, z) for x, y, z1, z2 in ranges
+                for z in range(z1, z2 + 1)]
+
+    def test_cover_once(self):
+        c1, c2 = Vec3(2, 1, 9), Vec3(-2, 0, -3)
+        everything = sorted(gen_cuboid_xyz(c1, c2))
+        for batches, max_size in ((1, None), (40, None), (1000, None),
+                                  (1, 4), (10, 3)):
+            ranges = list(ParallelGetter.generate_work_ranges(
+                c1, c2, batches, max_size))
+            self.assertEqual(sorted(self.covered(ranges)), everything)
+            if max_size is not None:
+                self.assertTrue(all(z2 - z1 < max_size
+                                    for x, y, z1, z2 in ranges))
+
+    def test_enough_ranges(self):
+        ranges = list(ParallelGetter.generate_work_ranges(
+            Vec3(0, 0, 0), Vec3(0, 0, 99), batches=10))
+        self.assertEqual(len(ranges), 10)
+        ranges = list(ParallelGetter.generate_work_ranges(
+            Vec3(0, 0, 0), Vec3(9, 0, 99)))
+        self.assertEqual(len(ranges), 10)
+
+if __name__ == "__main__":
+    unittest.main()
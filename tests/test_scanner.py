@@ -0,0 +1,31 @@
+from   mcpi.connection import RequestError
+from   mcpi.vec3 import Vec3
+from   scanner import ShardedScanner
+import fakemc
+import mcpi.block as block
+import unittest
+
+class ShardedScannerTest(unittest.TestCase):
+    def test_scan(self):
+        world = fakemc.FakeWorld()
+        world.set(3, 1, -2, block.WOOL.id, 5)
+        world.set(-4, 2, 4, block.STONE.id)
+        with fakemc.FakeMinecraftServer(port=4783, world=world, tick=0.001,
+                                        per_tick=1000):
+            # Small buffer, so the scan takes several passes
+            with ShardedScanner(port=4783, processes=3,
+                                capacity=100) as scanner:
+                blks = scanner.get_blocks_with_data(Vec3(3, 2, 4),
+                                                    Vec3(-4, -1, -3))
+        self.assertEqual(blks.shape, (8, 4, 8))
+        for pos in blks.keys():
+            self.assertEqual(blks[pos], world.get(*pos))
+
+    def test_failure(self):
+        # Nothing listens on this port
+        with ShardedScanner(port=4784, processes=2) as scanner:
+            self.assertRaises(RequestError, scanner.get_blocks_with_data,
+                              Vec3(0, 0, 0), Vec3(1, 1, 1))
+
+if __name__ == "__main__":
+    unittest.main()
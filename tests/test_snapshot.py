@@ -0,0 +1,90 @@
+from   bulk import BulkWriter
+from   cuboid import Cuboid
+from   mcpi.vec3 import Vec3
+from   pipeline import PipelinedGetter
+import fakemc
+import mcpi.block as block
+import numpy
+import os
+import shutil
+import snapshot
+import tempfile
+import unittest
+
+def house():
+    """A 3x2x4 cuboid with a few different blocks"""
+    c = Cuboid.empty(Vec3(-5, 1, 7), Vec3(-3, 2, 10))
+    c.ids[:] = block.STONE.id
+    c.ids[1, :, 1:3] = block.AIR.id
+    c[(-5, 2, 10)] = (block.WOOL.id, 4)
+    return c
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "house.snap")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_round_trip(self):
+        for compress in (True, False):
+            for with_data in (True, False):
+                c = house()
+                if not with_data:
+                    c.data = None
+                snapshot.save(self.path, c, compress)
+                loaded = snapshot.load(self.path)
+                self.assertEqual(tuple(loaded.origin), (-5, 1, 7))
+                self.assertTrue((loaded.ids == c.ids).all())
+                if with_data:
+                    self.assertTrue((loaded.data == c.data).all())
+                else:
+                    self.assertEqual(loaded.data, None)
+                self.assertFalse(loaded.ids.flags.writeable)
+                del loaded
+
+    def test_not_a_snapshot(self):
+        with open(self.path, "wb") as f:
+            f.write("not a snapshot")
+        self.assertRaises(snapshot.SnapshotError, snapshot.load, self.path)
+
+    def test_rotate_and_mirror(self):
+        c = house()
+        turned = snapshot.rotate(c, 1)
+        self.assertEqual(turned.shape, (4, 2, 3))
+        self.assertTrue((snapshot.rotate(c, 4).ids == c.ids).all())
+        self.assertTrue((snapshot.rotate(turned, 3).data == c.data).all())
+        flipped = snapshot.mirror(c, "z")
+        self.assertEqual(flipped.ids[0, 1, 0], block.WOOL.id)
+        self.assertTrue((snapshot.mirror(flipped, "z").ids == c.ids).all())
+
+    def test_paste_without_air(self):
+        c = house()
+        pos = Vec3(20, 0, 20)
+        current = Cuboid.empty(pos, pos + Vec3(2, 1, 3), with_data=False)
+        current.ids[:] = block.DIRT.id
+        writer = BulkWriter(PipelinedGetter(port=1))   # never connects
+        boxes = snapshot.paste(writer, c, pos, with_air=False,
+                               current=current, dry_run=True)
+        built = current[20:23, 0:2, 20:24]
+        for x1, y1, z1, x2, y2, z2, blockid, blockdata in boxes:
+            built[x1:x2+1, y1:y2+1, z1:z2+1].ids[:] = blockid
+        self.assertEqual(built[(21, 0, 21)], block.DIRT.id)  # AIR in c
+        self.assertEqual(built[(20, 1, 23)], block.WOOL.id)
+        self.assertEqual(built.count(block.STONE.id), 24 - 4 - 1)
+
+    def test_paste(self):
+        world = fakemc.FakeWorld()
+        with fakemc.FakeMinecraftServer(port=4778, world=world, tick=0.001,
+                                        per_tick=1000):
+            writer = BulkWriter(PipelinedGetter(port=4778, sockets=1))
+            snapshot.paste(writer, house(), Vec3(0, 1, 0))
+            pasted = writer.read(Vec3(0, 1, 0), Vec3(2, 2, 3))
+            writer.close()
+        c = house()
+        self.assertTrue((pasted.ids == c.ids).all())
+        self.assertTrue((pasted.data == c.data).all())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+from   mcpi.vec3 import Vec3
+import terrain
+import unittest
+
+def volume(boxes):
+    return sum((b[3]-b[0]+1) * (b[4]-b[1]+1) * (b[5]-b[2]+1) for b in boxes)
+
+class TerrainTest(unittest.TestCase):
+    def test_split_box(self):
+        box = (-5, 0, 3, 94, 63, 102, 0, 0)
+        for max_blocks in (100, 5000, 32768, 10 ** 7):
+            boxes = terrain.split_box(box, max_blocks)
+            self.assertTrue(all(volume([b]) <= max_blocks for b in boxes))
+            self.assertEqual(volume(boxes), 100 * 64 * 100)
+            self.assertEqual(len(set(boxes)), len(boxes))
+
+    def test_corners_round_down(self):
+        self.assertEqual(terrain.plan_clear(Vec3(-1.5, 0, 0.5),
+                                            Vec3(-0.5, 2, -0.5)),
+                         [(-2, 0, -1, -1, 2, 0, 0, 0)])
+        shaft = terrain.plan_shaft(Vec3(-0.5, 3, -0.5), 3)
+        self.assertEqual(shaft, [(-1, 1, -1, -1, 3, -1, 0, 0)])
+
+    def test_stairs_go_right(self):
+        right = {"+x": (0, 0, 1), "-x": (0, 0, -1),
+                 "+z": (-1, 0, 0), "-z": (1, 0, 0)}
+        for direction, r in right.items():
+            step = terrain.plan_stairs(Vec3(0, 0, 0), direction, 1,
+                                       width=3)[0]
+            self.assertEqual((min(step[0], step[3]), min(step[2], step[5])),
+                             (min(0, 2*r[0]), min(0, 2*r[2])))
+            self.assertEqual((max(step[0], step[3]), max(step[2], step[5])),
+                             (max(0, 2*r[0]), max(0, 2*r[2])))
+
+    def test_stairs_go_down(self):
+        boxes = terrain.plan_stairs(Vec3(0, 10, 0), "+x", 5, headroom=3)
+        self.assertEqual(len(boxes), 5)
+        for i, b in enumerate(boxes):
+            self.assertEqual(b[:6], (i, 10 - i, 0, i, 12 - i, 0))
+
+if __name__ == "__main__":
+    unittest.main()
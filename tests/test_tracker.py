@@ -0,0 +1,64 @@
+from   mcpi.vec3 import Vec3
+from   tracker import PlayerTracker
+import fakemc
+import mcpi.block as block
+import mcpi.minecraft as minecraft
+import time
+import unittest
+
+def wait_for(fn, seconds=5.0):
+    endtime = time.time() + seconds
+    while not fn() and time.time() < endtime:
+        time.sleep(0.01)
+    return fn()
+
+class SmoothingTest(unittest.TestCase):
+    def test_parabola(self):
+        # Running along x at 2 blocks/sec, after jumping up at 5 blocks/sec
+        tracker = PlayerTracker()
+        for i in range(10):
+            t = i * 0.05
+            tracker.samples.append((t, Vec3(2 * t, 5 * t - 4.9 * t * t, 0)))
+        v, a = tracker.velocity(), tracker.acceleration()
+        self.assertAlmostEqual(v.x, 2.0)
+        self.assertAlmostEqual(v.y, 5 - 9.8 * 0.45)
+        self.assertAlmostEqual(a.y, -9.8)
+        self.assertAlmostEqual(tracker.speed(), 2.0)
+        self.assertTrue(tracker.is_moving())
+        self.assertFalse(tracker.is_jumping())
+
+    def test_too_few_samples(self):
+        tracker = PlayerTracker()
+        self.assertEqual(tracker.position, None)
+        self.assertEqual(tracker.velocity(), Vec3(0, 0, 0))
+        tracker.samples.append((1.0, Vec3(0, 0, 0)))
+        tracker.samples.append((1.5, Vec3(0, 2, 1)))
+        self.assertEqual(tracker.velocity(), Vec3(0, 4, 2))
+        self.assertEqual(tracker.acceleration(), Vec3(0, 0, 0))
+
+class SamplingTest(unittest.TestCase):
+    def test_sampling(self):
+        world = fakemc.FakeWorld()
+        with fakemc.FakeMinecraftServer(port=4785, world=world, tick=0.001,
+                                        per_tick=1000):
+            mc = minecraft.Minecraft.create(port=4785)
+            with PlayerTracker(port=4785, rate=100) as tracker:
+                self.assertTrue(wait_for(lambda: tracker.position))
+                self.assertEqual(tracker.position, Vec3(0.5, 1.0, 0.5))
+                self.assertTrue(tracker.standing_on(block.GRASS.id, mc))
+                self.assertFalse(tracker.standing_on(
+                    [block.LEAVES.id, block.STONE.id], mc))
+                mc.player.setPos(3.5, 4.0, -2.5)
+                self.assertTrue(wait_for(
+                    lambda: tracker.position == Vec3(3.5, 4.0, -2.5)))
+            mc.conn.socket.close()
+        self.assertEqual(tracker.error, None)
+
+    def test_no_game(self):
+        # Nothing listens on this port
+        with PlayerTracker(port=4786, rate=100) as tracker:
+            self.assertTrue(wait_for(lambda: tracker.error is not None))
+        self.assertEqual(tracker.position, None)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+from   triggers import TriggerEngine
+import fakemc
+import mcpi.block as block
+import mcpi.minecraft as minecraft
+import unittest
+
+class TriggerEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.world = fakemc.FakeWorld()
+        self.world.set(3, 1, 3, block.STONE.id)
+        self.server = fakemc.FakeMinecraftServer(port=4774, world=self.world,
+                                                 tick=0.001,
+                                                 per_tick=1000).start()
+        self.mc = minecraft.Minecraft.create(port=4774)
+        self.engine = TriggerEngine(self.mc)
+        self.fired = []
+        self.engine.clear()
+        self.mc.getBlock(0, 0, 0)    # so the clear is done before the hits
+
+    def tearDown(self):
+        self.mc.conn.socket.close()
+        self.server.stop()
+
+    def action(self, hit, blockid):
+        self.fired.append((tuple(hit.pos), blockid))
+
+    def test_only_relevant_hits(self):
+        self.engine.add(self.action, [block.STONE.id])
+        self.world.hit(3, 1, 3)
+        self.world.hit(5, 0, 5)      # GRASS
+        self.assertEqual(self.engine.poll(), 1)
+        self.assertEqual(self.fired, [((3, 1, 3), block.STONE.id)])
+        self.assertEqual(self.engine.stats(),
+                         {"polls": 1, "hits": 2, "fired": 1})
+
+    def test_no_read_without_blockids(self):
+        self.engine.add(self.action)
+        self.world.hit(3, 1, 3)
+        requests = self.server.requests
+        self.assertEqual(self.engine.poll(), 1)
+        self.assertEqual(self.fired, [((3, 1, 3), None)])
+        self.assertEqual(self.server.requests - requests, 1)
+
+if __name__ == "__main__":
+    unittest.main()
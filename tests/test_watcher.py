@@ -0,0 +1,62 @@
+from   mcpi.vec3 import Vec3
+from   pipeline import PipelinedGetter
+from   watcher import RegionWatcher
+import fakemc
+import mcpi.block as block
+import mcpi.minecraft as minecraft
+import unittest
+
+class RegionWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.world = fakemc.FakeWorld()
+        self.server = fakemc.FakeMinecraftServer(port=4781, world=self.world,
+                                                 tick=0.001,
+                                                 per_tick=1000).start()
+        self.getter = PipelinedGetter(port=4781, sockets=1)
+        self.mc = minecraft.Minecraft.create(port=4781)
+        # Four tiles of 8x8x8; the budget reads one per poll
+        self.watcher = RegionWatcher(self.getter, mc=self.mc, budget=512)
+        self.watcher.add("house", Vec3(0, 0, 0), Vec3(15, 7, 15))
+        self.found = []
+        self.watcher.subscribe(lambda name, changes:
+                               self.found.append((name, changes)), "house")
+
+    def tearDown(self):
+        self.mc.conn.socket.close()
+        self.getter.close()
+        self.server.stop()
+
+    def test_budget(self):
+        self.world.set(12, 1, 12, block.STONE.id)
+        counts = [self.watcher.poll() for i in range(4)]
+        self.assertEqual(sorted(counts), [0, 0, 0, 1])
+        self.assertEqual(self.watcher.stats()["reads"], 2048 + 4 * 512)
+        self.assertEqual(self.found, [("house", [
+            ((12, 1, 12), (block.AIR.id, 0), (block.STONE.id, 0))])])
+        self.assertEqual(self.watcher.baseline("house")[(12, 1, 12)],
+                         (block.STONE.id, 0))
+        self.assertEqual(self.watcher.poll(), 0)
+
+    def test_touched_first(self):
+        self.world.set(12, 1, 12, block.STONE.id)
+        self.world.set(1, 1, 1, block.STONE.id)
+        self.watcher.touched(Vec3(12, 1, 12))
+        self.assertEqual(self.watcher.poll(), 1)
+        self.assertEqual(self.found[0][1][0][0], (12, 1, 12))
+
+    def test_hit_first(self):
+        self.world.set(12, 1, 12, block.STONE.id)
+        self.world.set(1, 1, 1, block.STONE.id)
+        self.world.hit(1, 1, 1)
+        self.assertEqual(self.watcher.poll(), 1)
+        self.assertEqual(self.found[0][1][0][0], (1, 1, 1))
+
+    def test_other_regions(self):
+        self.watcher.add("yard", Vec3(20, 0, 0), Vec3(23, 3, 3))
+        self.world.set(21, 1, 1, block.STONE.id)
+        self.watcher.touched(Vec3(21, 1, 1))
+        self.assertEqual(self.watcher.poll(), 1)
+        self.assertEqual(self.found, [])     # not subscribed to the yard
+
+if __name__ == "__main__":
+    unittest.main()
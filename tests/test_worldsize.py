@@ -0,0 +1,60 @@
+from   mcpi.vec3 import Vec3
+import fakemc
+import mcpi.minecraft as minecraft
+import unittest
+import worldsize
+
+class FindEdgeTest(unittest.TestCase):
+    def test_edges(self):
+        outside = lambda x: not -128 <= x <= 127
+        self.assertEqual(find_edge_coord(outside, 0, 1), 127)
+        self.assertEqual(find_edge_coord(outside, 0, -1), -128)
+        self.assertEqual(find_edge_coord(outside, 127, 1), 127)
+
+    def test_limit(self):
+        coord, probes = worldsize.find_edge(lambda x: False, 0, 1, limit=64)
+        self.assertEqual(coord, None)
+
+def find_edge_coord(is_outside, start, step):
+    return worldsize.find_edge(is_outside, start, step)[0]
+
+def bounds_of(world, origin=Vec3(0, 0, 0), **kw):
+    """get_world_bounds of a FakeWorld, and the Minecraft it used"""
+    with fakemc.FakeMinecraftServer(port=4771, world=world, tick=0.001,
+                                    per_tick=1000):
+        mc = minecraft.Minecraft.create(port=4771)
+        try:
+            return worldsize.get_world_bounds(mc, origin, **kw), mc
+        finally:
+            mc.conn.socket.close()
+
+class WorldBoundsTest(unittest.TestCase):
+    def test_fake_world(self):
+        world = fakemc.FakeWorld(-32, 31, -64, 63, -20, 19)
+        bounds, mc = bounds_of(world)
+        self.assertEqual((bounds.xmin, bounds.xmax, bounds.ymin, bounds.ymax,
+                          bounds.zmin, bounds.zmax),
+                         (-32, 31, -64, 63, -20, 19))
+        self.assertEqual(bounds.clip(Vec3(-50, 0, 0), Vec3(0, 90, 0)),
+                         (Vec3(-32, 0, 0), Vec3(0, 63, 0)))
+        self.assertEqual(bounds.clip(Vec3(40, 0, 0), Vec3(50, 0, 0)), None)
+
+    def test_no_edge(self):
+        self.assertRaises(worldsize.WorldEdgeError, bounds_of,
+                          fakemc.FakeWorld(), limit=64)
+
+    def test_remembered_per_mc_and_origin(self):
+        small, mc = bounds_of(fakemc.FakeWorld(-32, 31, -64, 63, -32, 31))
+        self.assertTrue(worldsize.get_world_bounds(mc) is small)
+        big, mc2 = bounds_of(fakemc.FakeWorld())
+        self.assertEqual((big.xmin, big.xmax), (-128, 127))
+        moved, mc2 = bounds_of(fakemc.FakeWorld(), Vec3(5, 0, 5))
+        self.assertFalse(moved is big)
+
+    def test_clip_rounds_down(self):
+        bounds = worldsize.WorldBounds(-128, 127, -64, 63, -128, 127)
+        self.assertEqual(bounds.clip(Vec3(-10.5, 0, 0), Vec3(-0.5, 5, 0)),
+                         (Vec3(-11, 0, 0), Vec3(-1, 5, 0)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+"""Track the player's position, velocity and acceleration
+
+A PlayerTracker samples player.getPos at a fixed rate, from a thread
+with its own connection, and keeps the last few samples.  Game loops
+ask it for the latest state, without a round trip of their own, and
+any number of them can share it:
+
+    tracker = PlayerTracker(rate=20).start()
+    while True:
+        if tracker.is_jumping() and tracker.standing_on(block.LEAVES.id, mc):
+            print "jumping from a tree at", tracker.velocity()
+        time.sleep(0.05)
+    tracker.stop()
+
+velocity and acceleration are smoothed, by fitting a parabola to the
+last few samples, so one late sample does not make the player seem to
+stop and then leap.
+"""
+
+from   mcpi.connection import Connection
+from   mcpi.vec3 import Vec3
+import collections
+import math
+import numpy
+import threading
+import timeit
+
+class PlayerTracker:
+    """Sample the player's position in the background
+
+    parms:
+        address, port: of the Minecraft Pi API
+        rate: samples per second
+        history: the number of samples to keep
+        window: the number of recent samples to smooth over
+    """
+    def __init__(self, address="localhost", port=4711, rate=20,
+                 history=64, window=5):
+        self.address = address
+        self.port = port
+        self.rate = rate
+        self.window = window
+        self.samples = collections.deque(maxlen=history)  # (time, Vec3)
+        self.error = None    # the last exception from sampling, if any
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._sample_fn)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _sample_fn(self):
+        connection = None
+        period = 1.0 / self.rate
+        next_time = timeit.default_timer()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    if connection is None:
+                        connection = Connection(self.address, self.port)
+                    connection.send("player.getPos")
+                    x, y, z = map(float, connection.receive().split(","))
+                    now = timeit.default_timer()
+                    with self._lock:
+                        self.samples.append((now, Vec3(x, y, z)))
+                except Exception as e:
+                    self.error = e
+                    if connection is not None:
+                        connection.socket.close()
+                        connection = None
+                # Keep to the rate, without drifting; skip missed samples
+                next_time += period
+                now = timeit.default_timer()
+                if next_time < now:
+                    next_time = now
+                self._stopping.wait(next_time - now)
+        finally:
+            if connection is not None:
+                connection.socket.close()
+
+    def history(self):
+        """A list of the samples, (time, position), oldest first"""
+        with self._lock:
+            return list(self.samples)
+
+    def latest(self):
+        """The latest sample, (time, position), or None"""
+        with self._lock:
+            return self.samples[-1] if self.samples else None
+
+    @property
+    def position(self):
+        """The latest position, or None"""
+        sample = self.latest()
+        return sample[1] if sample else None
+
+    def _fit(self):
+        """Fit p = a + b*t + c*t*t to the recent samples (t=0 is now)
+
+        returns (b, 2*c) as arrays: the velocity and acceleration.
+        """
+        with self._lock:
+            recent = list(self.samples)[-self.window:]
+        zero = numpy.zeros(3)
+        if len(recent) < 2:
+            return zero, zero
+        t = numpy.array([s[0] for s in recent]) - recent[-1][0]
+        p = numpy.array([tuple(s[1]) for s in recent])
+        if len(recent) == 2:
+            return (p[1] - p[0]) / (t[1] - t[0]), zero
+        c, b, a = numpy.polyfit(t, p, 2)
+        return b, 2 * c
+
+    def velocity(self):
+        """Smoothed velocity, in blocks/sec, as a Vec3"""
+        return Vec3(*self._fit()[0])
+
+    def acceleration(self):
+        """Smoothed acceleration, in blocks/sec/sec, as a Vec3"""
+        return Vec3(*self._fit()[1])
+
+    def speed(self):
+        """Smoothed speed across the ground (x and z), in blocks/sec"""
+        v = self.velocity()
+        return math.hypot(v.x, v.z)
+
+    def is_moving(self, threshold=1.0):
+        return self.speed() > threshold
+
+    def is_jumping(self, threshold=1.0):
+        """True if the player is going up faster than threshold blocks/sec"""
+        return self.velocity().y > threshold
+
+    def standing_on(self, blockids, mc):
+        """True if the block under the player's feet is one of blockids
+
+        parms:
+            blockids: a block id, or a collection of them
+            mc: something with getBlock; a BlockCache saves the round trip
+        """
+        pos = self.position
+        if pos is None:
+            return False
+        b = mc.getBlock(pos.x, pos.y - 1, pos.z)
+        if isinstance(blockids, int):
+            return b == blockids
+        return b in blockids
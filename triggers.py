@@ -0,0 +1,77 @@
+"""Do things when the player hits a block with a sword
+
+Rather than check the world every second to see if it is time to do
+something (which costs a round trip per block looked at, whether or
+not anything changed), a TriggerEngine asks Minecraft only for the
+block hits (events.block.hits, one small request per poll), and runs
+the actions whose blocks were hit:
+
+    engine = TriggerEngine(mc)
+    engine.add(build_house, [block.STONE.id, block.WOOD.id])
+    engine.run()          # until Ctrl-C
+
+A hit costs one mc.getBlock, to see what was hit, and only if a rule
+asks for particular blocks; hits on other blocks run nothing.
+"""
+
+import time
+
+class TriggerEngine:
+    """Run actions when blocks are hit
+
+    parms:
+        mc: a mcpi.minecraft.Minecraft, or a BlockCache wrapping one
+        interval: seconds between polls for hits
+    """
+    def __init__(self, mc, interval=0.1):
+        self.mc = mc
+        self.interval = interval
+        self.rules = []     # (action, block ids or None)
+        self.polls = 0
+        self.hits = 0
+        self.fired = 0
+
+    def add(self, action, blockids=None):
+        """Call action(hit, blockid) when one of blockids is hit
+
+        hit is a mcpi.event.BlockEvent.  If blockids is None, any hit
+        calls the action; if no rule has blockids, blockid is None, as
+        the block is not read.
+        """
+        self.rules.append((action, None if blockids is None
+                                   else frozenset(blockids)))
+
+    def clear(self):
+        """Forget the hits made before now"""
+        self.mc.events.clearAll()
+
+    def poll(self):
+        """Run the actions for the hits since the last poll
+
+        Returns the number of actions run.
+        """
+        self.polls += 1
+        fired = 0
+        need_id = any(blockids is not None for action, blockids in self.rules)
+        for hit in self.mc.events.pollBlockHits():
+            self.hits += 1
+            if not self.rules:
+                continue
+            blockid = self.mc.getBlock(hit.pos) if need_id else None
+            for action, blockids in self.rules:
+                if blockids is None or blockid in blockids:
+                    action(hit, blockid)
+                    fired += 1
+        self.fired += fired
+        return fired
+
+    def run(self, seconds=None):
+        """Poll every interval, for seconds (or forever)"""
+        self.clear()
+        endtime = None if seconds is None else time.time() + seconds
+        while endtime is None or time.time() < endtime:
+            self.poll()
+            time.sleep(self.interval)
+
+    def stats(self):
+        return {"polls": self.polls, "hits": self.hits, "fired": self.fired}
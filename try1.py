@@ -16,6 +16,7 @@ First, we need a faster way to read block data.
 
 Idea to trigger building a house:
  - hit a wall near a torch on top of a gold block
+  --> hit a wall next to the torch (see build_house_on_hit)
 
 Function to build an entire house (a hollow box) given its dimensions.
 To use this function,
@@ -24,8 +25,8 @@ build two low walls that meet at a right angle
 to indicate the area of your house,
 and a post (a stack of blocks) on the corner to indicate the height.
 Place a torch at ground level exactly at the inside corner of your house.
-Stand on or immediately next to the torch.
-Then run this function ("Algorithm to build a house" below).
+Then hit the wall next to the torch with a sword
+("Algorithm to build a house" below).
 --> The function locates the nearby torch, and the corner of your house.
     Then it scans the foundation to learn how big to make it.
     Finally, it puts the walls up.
@@ -41,7 +42,18 @@ blocks, the following top-view shows the required layout:
   x                       tx
   x                    xxxxX
 
+Idea: read the foundation in one go, not a block at a time
+  --> see house.py
+
 Idea: memoize results from mc.getBlock
+  --> mc is a BlockCache (see blockcache.py), so the house helpers
+      can read the same block more than once without a round trip.
+
+Importing this file does not connect to Minecraft; get_mc() and
+get_getter() connect on first use.  Each experiment is a function,
+and can be run from the command line:
+    python try1.py house       # build a house when a wall is hit
+    python try1.py --help      # and the others
 """
 
 # mcpi is found in /usr/lib/python2.7/dist-packages
@@ -49,30 +61,22 @@ Idea: memoize results from mc.getBlock
 import mcpi.minecraft as minecraft
 import mcpi.block as block
 from   mcpi.vec3 import Vec3
-from   mcpi.connection import Connection
+import argparse
 import time
 import timeit
-import Queue
 import threading
-
-def vec3_get_sign(self):
-    # Warning: hack! Assumes unit vector
-    return self.x + self.y + self.z
-Vec3.get_sign = vec3_get_sign
-
-class TorchFindError(Exception):
-    """Torch not found nearby"""
-    def __init__(self, value):
-        self.value = value
-    def __str__(self):
-        return repr(self.value)
-
-class CornerFindError(Exception):
-    """Corner not found"""
-    def __init__(self, value):
-        self.value = value
-    def __str__(self):
-        return repr(self.value)
+from   readers import get_blocks_in_parallel
+import readers
+import pipeline
+from   blockcache import BlockCache
+import bulk
+import miniature
+import worldsize
+import heightmap
+import motion
+import triggers
+import house
+from   house import TorchFindError, CornerFindError
 
 def different_block(b):
     if   b == block.STONE.id:      b = block.SANDSTONE.id
@@ -82,200 +86,92 @@ def different_block(b):
     return b
 
 
-def get_nearby_torchpos(p):
-    """Return the position of a nearby torch"""
-    torchpos = None
-    search_size = 1
-    for x in range(int(p.x - search_size), int(p.x + search_size+1)):
-        for z in range(int(p.z - search_size), int(p.z + search_size+1)):
-            b = mc.getBlock(x, p.y, z)
-            if b == block.TORCH.id:
-                if not torchpos is None:
-                    raise TorchFindError("Too many torches")
-                torchpos = Vec3(x, p.y, z)
-    if torchpos is None:
-        raise TorchFindError("Torch not found nearby")
-    return torchpos
-
-def get_corner_data(pos):
-    """Returns data about a corner next to the input position.
-
-    A "corner" is two walls meeting at right angles with a post.
-    The walls and post define the corner.
-    The input position should be the inside corner at ground level
-    such as returned by get_nearby_torchpos.
-    The return value is a 2-tuple:
-     - The corner position
-     - A unit vector pointing "inside" the corner
-    """
-    # Read blocks around the input pos
-    blocks = []  # Usage: blocks[x][z]
-    mask = 0     # Bit mask: abcdefghi, like:
-                 #   adg
-                 #   beh
-                 #   cfi
-    for x in range(int(pos.x - 1), int(pos.x + 2)):
-        col = []
-        for z in range(int(pos.z - 1), int(pos.z + 2)):
-            b = mc.getBlockWithData(x, pos.y, z)  # Test
-            b = mc.getBlock(x, pos.y, z)
-            col.append(b)
-            mask = (mask << 1) + (0 if b == block.AIR.id else 1)
-        blocks.append(col)
-    mask &= 0b111101111  # Mask off center block
-    # print "Mask", format(mask,"#011b")
-    nw_corner_mask = 0b111100100
-    ne_corner_mask = 0b100100111
-    sw_corner_mask = 0b111001001
-    se_corner_mask = 0b001001111
-    if mask == nw_corner_mask:
-        corner = Vec3(pos.x - 1, pos.y, pos.z - 1)
-        vector = Vec3(1, 1, 1)
-    elif mask == ne_corner_mask:
-        corner = Vec3(pos.x +1, pos.y, pos.z - 1)
-        vector = Vec3(-1, 1, 1)
-    elif mask == sw_corner_mask:
-        corner = Vec3(pos.x - 1, pos.y, pos.z + 1)
-        vector = Vec3(1, 1, -1)
-    elif mask == se_corner_mask:
-        corner = Vec3(pos.x + 1, pos.y, pos.z + 1)
-        vector = Vec3(-1, 1, -1)
-    else:
-        raise CornerFindError("Corner not found")
-    return corner, vector
-
-def get_length_of_block_run(startpos, vector):
-    """determine the length of a run of blocks
-
-    parameters: startpos is the starting block
-    vector is a unit vector in the direction to count
-    """
-    ans = 0
-    pos = startpos
-    while mc.getBlock(pos) != block.AIR.id:
-        ans += 1
-        pos = pos + vector
-    ans -= 1
-    return ans * vector.get_sign()
-
-def get_house_data(pos):
-    corner, vector = get_corner_data(pos)
-    sizex = get_length_of_block_run(corner, Vec3(vector.x, 0, 0))
-    sizey = get_length_of_block_run(corner, Vec3(0, vector.y, 0))
-    sizez = get_length_of_block_run(corner, Vec3(0, 0, vector.z))
-    return corner, Vec3(sizex, sizey, sizez)
-
 def do_house(corner, dim):
+    mc, getter = get_mc(), get_getter()
     newblockid = different_block(mc.getBlock(corner))
-    # Unit test: just do a chimney
-    #mc.setBlocks(corner.x, corner.y, corner.z,
-    #             corner.x, corner.y + dim.y, corner.z,
-    #             newblockid)
-    # Near wall along x direction
-    mc.setBlocks(corner.x,         corner.y,         corner.z,
-                 corner.x + dim.x, corner.y + dim.y, corner.z,
-                 newblockid)
-    # Near wall along z direction
-    mc.setBlocks(corner.x, corner.y,         corner.z,
-                 corner.x, corner.y + dim.y, corner.z + dim.z,
-                 newblockid)
-
-
-mc = minecraft.Minecraft.create()
+    # All four walls, the roof and a door, in 4 setBlocks calls
+    # (see house.py); the old way was 2 calls for the near walls only
+    spec = house.HouseSpec(wall=newblockid, roof=newblockid,
+                           openings=[house.door("near_x", 1)])
+    boxes, cost = house.build_house(bulk.BulkWriter(getter, mc),
+                                    corner, dim, spec)
+    print cost
+
+
+_mc = None
+def get_mc():
+    """The connection to Minecraft, made on first use
+
+    Remember blocks for half a second: long enough to look around a hit
+    (see build_house_on_hit), short enough to notice the player building.
+    Blocks it does not have are read in bulk through get_getter().
+    """
+    global _mc
+    if _mc is None:
+        _mc = BlockCache(minecraft.Minecraft.create(), ttl=0.5,
+                         getter=get_getter())
+    return _mc
+
+_getter = None
+def get_getter():
+    """A PipelinedGetter shared by the experiments
+
+    Its sockets are opened on first use.  A read which is stopped part
+    way (see pipeline.gen_answers) reads and throws away the answers
+    still on their way, so the sockets are always ready for the next.
+    """
+    global _getter
+    if _getter is None:
+        _getter = pipeline.PipelinedGetter()
+    return _getter
 
 #p = mc.player.getTilePos()
 #mc.x_connect_multiple(p.x, p.y+2, p.z, block.GLASS.id)
 #print 'bye!'
 #exit(0)
 
-# Algorithm to build a house
-for i in range(0,0):
-    time.sleep(1)
-    p = mc.player.getTilePos()
-    b = mc.getBlock(p.x, p.y-1, p.z)
-    info = ""
+# Algorithm to build a house:
+# hit a wall next to the torch with a sword (see triggers.py)
+def build_house_on_hit(hit, blockid):
     try:
-        tp = get_nearby_torchpos(p)
-        info = "torch found"
-        try:
-            c,v = get_house_data(tp)
-            info = "corner found"
-            do_house(c,v)
-        except CornerFindError as e:
-            pass
-    except TorchFindError as e:
-        pass # print "TorchFindError:", e.value
-    print b, info
-
-connections = []
-def get_blocks_in_parallel(c1, c2, degree=35):
-    """get a cuboid of block data
-
-    parms:
-        c1, c2: the corners of the cuboid
-        degree: the degree of parallelism (number of sockets)
-    returns:
-        map from mcpi.vec3.Vec3 to mcpi.block.Block
+        # One read of the area around the hit, then one of the walls
+        # (see house.py), instead of a round trip per block; through
+        # the cache, so blocks read just before are not read again
+        c,v = house.find_house(get_mc(), hit.pos)
+        do_house(c,v)
+        print "house built at", c, v
+    except (TorchFindError, CornerFindError, ValueError) as e:
+        print e
+    print get_mc().stats()
+
+def house_builder():
+    """Build a house each time the wall next to its torch is hit"""
+    # Only hits on a foundation (or its torch) start a find_house
+    engine = triggers.TriggerEngine(get_mc())
+    engine.add(build_house_on_hit, house.FOUNDATION_IDS)
+    engine.run()
+
+def ground_level():
+    """Ground level (see heightmap.py) compared with mc.getHeight"""
+    # mc.getHeight works, but counts trees, torches, flowers, ...
+    mc = get_mc()
+    ppos = mc.player.getTilePos()
+    hm = heightmap.Heightmap(get_getter(),
+                             Vec3(ppos.x - 50, -64, ppos.z - 50),
+                             Vec3(ppos.x + 50,  63, ppos.z + 50))
+    hm.watch(mc)
+    hm.refresh()
+    while True:
+        ppos = mc.player.getPos()
+        hm.refresh()   # Only the columns we have written since
+        print mc.getHeight(ppos.x, ppos.z), hm.ground_at(ppos.x, ppos.z)
+        time.sleep(1)
+
+def thread_benchmark():
+    """Time get_blocks_in_parallel with 100 to 200 threads
+
+    See bench.py to compare all the readers, without Minecraft.
     """
-    # Set up the work queue
-    c1.x, c2.x = sorted((c1.x, c2.x))
-    c1.y, c2.y = sorted((c1.y, c2.y))
-    c1.z, c2.z = sorted((c1.z, c2.z))
-    workq = Queue.Queue()
-    for x in range(c1.x, c2.x+1):
-        for y in range(c1.y, c2.y+1):
-            for z in range(c1.z, c2.z+1):
-                workq.put((x,y,z))
-    print "Getting data for %d blocks" % workq.qsize()
-
-    # Create socket connections, if needed
-    # TO DO: Bad! Assumes degree is a constant
-    # To do: close the socket
-    global connections
-    if not connections:
-        connections = [Connection("localhost", 4711) for i in range(0,degree)]
-
-    # Create worker threads
-    def worker_fn(connection, workq, outq):
-        try:
-          while True:
-            pos = workq.get(False)
-            # print "working", pos[0], pos[1], pos[2]
-            connection.send("world.getBlockWithData", pos[0], pos[1], pos[2])
-            ans = connection.receive()
-            blockid, blockdata = map(int, ans.split(","))
-            outq.put((pos, (blockid, blockdata)))
-        except Queue.Empty:
-            pass
-    outq = Queue.Queue()
-    workers = []
-    for w in range(degree):
-        t = threading.Thread(target = worker_fn,
-                             args = (connections[w], workq, outq))
-        t.start()
-        workers.append(t)
-
-    # Wait for workers to finish
-    for w in workers:
-        # print "waiting for", w.name
-        w.join()
-
-    # Collect results
-    answer = {}
-    while not outq.empty():
-        pos, block = outq.get()
-        answer[pos] = block
-    return answer
-
-
-while False:
-    # mc.getHeight works
-    ppos = mc.player.getPos()
-    h = mc.getHeight(ppos.x, ppos.z)
-    print h
-    time.sleep(1)
-
-if False:
     """
     degree = 200
     corner1 = Vec3(-50, 8, -50)
@@ -288,12 +184,10 @@ if False:
     endtime2 = timeit.default_timer()
     print endtime2-endtime, 'get_blocks_in_parallel again'
 
-    for z in range(corner1.z, corner2.z):
-        s = ""
-        for x in range(corner1.x, corner2.x):
-            c = " " if blks[(x, 8, z)][0] == block.AIR.id else "x"
-            s = s + c
-        print s
+    # One line per z: " " for AIR, "x" for anything else
+    plane = blks[:, 8, :].ids[:, 0, :]
+    for row in numpy.where(plane.T == block.AIR.id, " ", "x"):
+        print "".join(row)
     """
 
     # Performance experiments
@@ -363,7 +257,7 @@ if False:
     """
     threading.stack_size(128*1024)
     for degree in [100, 150, 200]:
-        connections = []
+        readers.close_parallel_getter()
         corner1 = Vec3(-50, 8, -50)
         corner2 = Vec3( 50, 8,  50)
         starttime = timeit.default_timer()
@@ -377,93 +271,6 @@ if False:
             str(endtime2-endtime))
 
 
-# Idea: class for get_blocks_in_parallel()
-class ParallelGetter:
-    """Get block data from the Mincraft Pi API -- NOT FINISHED"""
-    def __init__(self, address = "localhost", port = 4711, parallelism=200):
-        self.address = address
-        self.port = port
-        self.parallelism = parallelism
-        self.connections = [Connection(address, port) for i in range(parallelism)]
-        # To do: close the socket connection
-
-    @staticmethod
-    def normalize_corners(c1, c2):
-        """ensure c1.x <= c2.x, etc., without changing the cuboid"""
-        c1.x, c2.x = sorted((c1.x, c2.x))
-        c1.y, c2.y = sorted((c1.y, c2.y))
-        c1.z, c2.z = sorted((c1.z, c2.z))
-        return c1, c2
-
-    @staticmethod
-    def generate_work_items_xyz(c1, c2):
-        c1, c2 = normalize_corners(c1, c2)
-        workq = Queue.Queue()
-        for x in range(c1.x, c2.x+1):
-            for y in range(c1.y, c2.y+1):
-                for z in range(c1.z, c2.z+1):
-                    workq.put((x,y,z))
-        return workq
-
-    @staticmethod
-    def _unpack_int(self, response):
-        return int(response)
-
-    @staticmethod
-    def _unpack_int_int(self, response):
-        i1, i2 = map(int, response.split(","))
-        return i1, i2
-
-    def get_blocks(self, c1, c2):
-        workq = generate_work_items_xyz(c, c2)
-        return _do_work(workq, "world.getBlock", _unpack_int)
-
-    def get_blocks_with_data(self, c1, c2):
-        workq = generate_work_items_xyz(c, c2)
-        return _do_work(workq, "world.getBlockWithData", _unpack_int_int)
-
-    def _do_work(self, workq, api_name, unpack_fn):
-        """Perform the parallel portion of the work.
-
-        parms:
-            workq - such as from generate_work_items_xyz
-
-        Specifically, start a worker thread for each connection,
-        Each worker feeds work from the workq to the API, formats
-        the results, and enqueues the results.
-        When there is no more work, the workers quit, and the
-        return value is computed.
-        """
-        def worker_fn(connection, workq, outq, unpack_fn):
-            try:
-              while True:
-                pos = workq.get(False)
-                connection.send(api_name, pos)
-                outq.put((pos, unpack_fn(connection.receive())))
-            except Queue.Empty:
-                pass
-        # Create worker threads
-        outq = Queue.Queue()
-        workers = []
-        for w in range(parallelism):
-            t = threading.Thread(
-                target = worker_fn,
-                args = (connections[w], workq, outq, unpack_fn))
-            t.start()
-            workers.append(t)
-        # Wait for workers to finish, then collect their data
-        for w in workers:
-            w.join()
-        answer = {}
-        while not outq.empty():
-            pos, data = outq.get()
-            answer[pos] = data
-        return answer
-
-
-
-
-
 """Idea: Tree jumper
 You can jump from tree to tree.
 If you are
@@ -473,13 +280,15 @@ If you are
 you will jump/fly to the nearest tree in your path.
 Algorithm:
     while True:
-        player_velocity = "track player position to determine velocity"
-        if "player is moving and on a leaf and jumps":
+        player_velocity = tracker.velocity()    # see tracker.py
+        if (tracker.is_moving() and tracker.is_jumping() and
+            tracker.standing_on(LEAVES, mc)):
             destination = "find nearest tree(player_pos, player_vel)"
             if destination:
                 parabola = compute(player_pos, destination)
                 "move player smoothly along the parabola"
                 "if player hits a block: break"
+                (motion.MotionExecutor.run does both)
 where
     def nearest_tree(player_pos, player_vel):
         search_areas = [
@@ -488,10 +297,16 @@ where
             player_pos + 40 * player_vel with radius=15]
         search areas *= [player_pos.y, player_pos.y-7, player_pos+7]
         for area in search_areas:
-            fetch a plane of block data centered at (area)
-            tree = find tree, prefering center of the area
+            stream a plane of block data, from the center of (area)
+            outwards (getter.iter_blocks), and stop at the first LEAVES
+            tree = that block, which is the nearest the center
             if tree: return tree
         return tree
+    or, with the area around the player read once into a BlockIndex
+    (see blockindex.py), without asking Minecraft at all:
+        for area in search_areas:
+            tree = index.nearest(LEAVES, area.center, area.radius)
+            if tree: return tree
     def compute_parabola():
         gravity = 0.3  # blocks/time**2
         xz_distance = sqrt(xd**2 + zd**2)
@@ -503,142 +318,87 @@ where
                  ((0.5 * gravity * (total_time ** 2)))
 
 """
-# Lets' try a leap/jump
-if False:
+
+def leap():
+    """Lets' try a leap/jump"""
     # mc.player.setPos(1, 4, 3) # if the jump goes badly wrong
-    ppos = mc.player.getPos()
-    x = ppos.x
-    y = ppos.y
-    z = ppos.z
-    xv = 0.005
-    yv = 0.1
-    zv = 0.02
-    while yv > 0:
-        mc.player.setPos(x, y, z)
-        x += xv
-        y += yv
-        z += zv
-        yv -= 0.0001
-        time.sleep(0.001)
-
-# Try stacking up multiple getBlocks:
-if True:
-    """This code is weird.  Delete it!"""
-    connection = Connection("localhost", 4711)
-    for x in range(-20, 20):
-        for z in range(-20, 20):
-            connection.send("world.getBlockWithData", x, 2, z)
-
-    print connection.receive()
-    print connection.receive()
-
-# How big is the world?
-if False:
-    corner1 = Vec3(-200, 0, 0)
-    corner2 = Vec3(200, 0, 0)
-    degree = 150
-    xaxis = get_blocks_in_parallel(corner1, corner2, degree)
-    xmin = xmax = 0
-    for x in range(200):
-        if xaxis[(x, 0, 0)][0] == block.BEDROCK_INVISIBLE.id:
-            xmax = x - 1
-            break
-    for x in range(0, -200, -1):
-        if xaxis[(x, 0, 0)][0] == block.BEDROCK_INVISIBLE.id:
-            xmin = x + 1
-            break
-    #print "X-axis: %d to %d" % (xmin, xmax)
-
-    corner1 = Vec3(0, 0, 200)
-    corner2 = Vec3(0, 0, -200)
-    degree = 150
-    zaxis = get_blocks_in_parallel(corner1, corner2, degree)
-    zmin = zmax = 0
-    for z in range(200):
-        if zaxis[(0, 0, z)][0] == block.BEDROCK_INVISIBLE.id:
-            zmax = z - 1
-            break
-    for z in range(0, -200, -1):
-        if zaxis[(0, 0, z)][0] == block.BEDROCK_INVISIBLE.id:
-            zmin = z + 1
-            break
-    #print "Z-axis: %d to %d" % (zmin, zmax)
-
-    print "The world is: [%d..%d][y][%d..%d]" % (
-        xmin, xmax, zmin, zmax)
+    # A fixed-rate stream of setPos, timed by the clock (see motion.py),
+    # instead of setPos and sleep(0.001), which stutters
+    ppos = get_mc().player.getPos()
+    path = motion.Parabola(ppos, Vec3(ppos.x + 20, ppos.y, ppos.z + 5))
+    mover = motion.MotionExecutor(getter=get_getter())
+    print mover.run(path)
+    mover.close()
+
+# Stacking up multiple getBlocks on a mcpi Connection (send, send, ...,
+# then receive) does not work: Connection.send throws away the answers
+# that have arrived, and the rest are left on the socket for whoever
+# reads next.  See pipelined_requests for how to do it.
+
+def world_size():
+    """How big is the world?"""
+    # A few dozen single-block probes (see worldsize.py), instead of
+    # reading 400 blocks along each axis
+    bounds = worldsize.get_world_bounds(get_mc())
+    print bounds, "(%d probes)" % bounds.probes
+
+def miniature_world():
+    """Create a miniature world: reduce (256,256) to (16,16)"""
+    mc = get_mc()
+    getter = pipeline.PipelinedGetter(depth=200)
+    ppos = mc.player.getTilePos()
+    c1, c2 = worldsize.get_world_bounds(mc).corners
+    timings = miniature.make_miniature(
+        getter, bulk.BulkWriter(getter, mc), c1, c2,
+        Vec3(ppos.x + 2, ppos.y, ppos.z + 2),
+        progress=miniature.print_progress)
+    print timings
+    getter.close()
 
 ###
 ### Try stuff with sockets
 ###
-'''
-I have not finished coding this part.
-def gen_answers(connection, requests, format, parse_fn):
-    """generate answers for each request, like (req, answer)"""
-    request_buf = io.BufferedWriter(connection.socket.makefile('w'))
-    response_buf = io.BufferedReader(connection.socket.makefile('r'))
-    request_queue = []
-    while True:
-        # Write requests into request_buffer
-        #   ...to do...
-        # Perform socket I/O
-        Communicate:
-            r,w,e = select.select([response_buf], [request_buf], [], 1)
-            if r:
-                response_data = response_buf.peek()
-                if "response_data has a newline at position n":
-                    response_text = response_buf.read(n)
-
-                response_buf.read(???)
-            if w:
-                request_buf.write(???)
-        # Read answers
-        while resp_buf.hasSomeData:
-            request = request_queue[0]  # Er, use a queue?
-            request_queue = request_queue[1:]
-            response = parse_fn(response_buf.readline())
-            yield (request, response)
-
-Hmmm, my sockets are rusty, and my Python io buffer classes weak,
-  but this seems more correct:
-    # We write requests (like b"world.getBlock(0,0,0)" into the
-    # request_buffer and then into the request_file (socket).
-    request_buffer = bytearray()  # bytes, bytearray, or memoryview
-    request_file = io.FileIO(connection.socket.fileno(), "w", closeFd=False)
-    "...append data to request_buffer..."
-    if request_buffer: can select
-    if selected:
-        # Write exactly once
-        bytes_written = request_file.write(request_buffer)
-        request_buffer = request_buffer[bytes_written:]
-        if bytes_written == 0: "something is wrong"
-
-    # We read responses (like b"2") from the response_file (socket)
-    # into the response_buffer.
-    response_file = io.FileIO(connection.socket.fileno(), "r", closeFd=False)
-    response_buffer = bytes()
-    if selected:
-        # Read exactly once
-        response_buffer.append(response_file.read())
-    "...remove data from response_buffer..."
-
-
-# Try gen_answers:
-if True:
-    connection = Connection("localhost", 4711)
+def pipelined_requests():
+    """Pipelined requests, with pipeline.gen_answers
+
+    See bench.py to compare it with get_blocks_in_parallel.
+    """
+    connection = pipeline.PipelinedConnection("localhost", 4711)
     def some_rectangle():
         for x in range(-2,2):
             for z in range(-2,2):
                 yield (x, 0, z)
-    for pos, blk in gen_answers(connection,
-                                some_rectangle,
-                                "world.getBlock(%d,%d)",
-                                int):
+    for pos, blk in pipeline.gen_answers([connection],
+                                         some_rectangle(),
+                                         "world.getBlock",
+                                         int):
         print "Got", pos, blk
-
-    my_blocks = {}
-    for pos, blk in gen_answers(connection,
-                                some_rectangle,
-                                "world.getBlock(%d,%d)",
-                                int):
-        my_blocks[pos] = blk
-'''
+    connection.close()
+
+
+EXPERIMENTS = {
+    "house": house_builder,
+    "ground": ground_level,
+    "threads": thread_benchmark,
+    "leap": leap,
+    "size": world_size,
+    "miniature": miniature_world,
+    "sockets": pipelined_requests,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an experiment")
+    parser.add_argument("experiment", choices=sorted(EXPERIMENTS),
+                        help=", ".join("%s: %s" % (
+                            name, fn.__doc__.split("\n")[0])
+                            for name, fn in sorted(EXPERIMENTS.items())))
+    args = parser.parse_args()
+    try:
+        EXPERIMENTS[args.experiment]()
+    finally:
+        if _getter is not None:
+            _getter.close()
+        readers.close_parallel_getter()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Notice changes to regions of the world, by rescanning them a bit at a time
+
+The house finder, the tree jumper and the map each read the same areas
+again and again, to see what changed.  A RegionWatcher does that for all
+of them: it keeps a baseline of each region (a Cuboid, 2 bytes a block),
+and rescans the regions a tile at a time, within a budget of blocks per
+poll, so the game is never swamped.  The tiles read first are the ones
+that were hit with a sword (events.block.hits) or written through a
+watched BlockCache, then the ones near the player, then the oldest.
+Each change found is sent to the subscribers, as (pos, old, new):
+
+    watcher = RegionWatcher(getter, mc=mc, tracker=tracker)
+    watcher.add("house", c1, c2)
+    watcher.subscribe(lambda name, changes: pprint(changes), "house")
+    watcher.run(interval=0.5)
+
+Subscribers see only the deltas, instead of each reading the regions.
+"""
+
+from   mcpi.vec3 import Vec3
+from   cuboid import Cuboid, block_pos, normalize_corners
+from   pipeline import gen_cuboid_xyz
+import itertools
+import time
+import timeit
+
+class _Tile:
+    """Part of a region, rescanned in one go"""
+    def __init__(self, region, c1, c2):
+        self.region = region
+        self.c1, self.c2 = c1, c2
+        o = region.baseline.origin
+        self.index = tuple(slice(a - b, c - b + 1)
+                           for a, c, b in zip(c1, c2, o))
+        self.center = Vec3(*[(a + c) / 2.0 for a, c in zip(c1, c2)])
+        self.size = ((c2[0]-c1[0]+1) * (c2[1]-c1[1]+1) * (c2[2]-c1[2]+1))
+        self.scanned = None   # time of the last scan
+        self.hot = False      # rescan before the others
+
+    def overlaps(self, c1, c2):
+        return all(lo <= b and a <= hi for a, b, lo, hi in
+                   zip(self.c1, self.c2, c1, c2))
+
+class _Region:
+    def __init__(self, name, baseline, tile):
+        self.name = name
+        self.baseline = baseline
+        self.fresh = Cuboid(baseline.origin, baseline.ids.copy(),
+                            baseline.data.copy())
+        (x1, y1, z1), (x2, y2, z2) = baseline.corners
+        self.tiles = []
+        for x in xrange(x1, x2 + 1, tile):
+            for y in xrange(y1, y2 + 1, tile):
+                for z in xrange(z1, z2 + 1, tile):
+                    self.tiles.append(_Tile(self, (x, y, z), (
+                        min(x + tile - 1, x2), min(y + tile - 1, y2),
+                        min(z + tile - 1, z2))))
+
+
+class RegionWatcher:
+    """Rescan regions within a budget, and report the blocks that changed
+
+    parms:
+        getter: a PipelinedGetter
+        mc: a Minecraft (or BlockCache) to poll for block hits, or None
+        tracker: a PlayerTracker, to rescan near the player first, or None
+        budget: blocks to read per poll (at least one tile is read)
+        tile: the size of the tiles the regions are rescanned in
+        radius: tiles this close to the player are near
+        near_boost: how much sooner near tiles are rescanned
+        hit_radius: tiles this close to a hit are rescanned first
+    """
+    def __init__(self, getter, mc=None, tracker=None, budget=1200, tile=8,
+                 radius=24, near_boost=4.0, hit_radius=2):
+        self.getter = getter
+        self.mc = mc
+        self.tracker = tracker
+        self.budget = budget
+        self.tile = tile
+        self.radius = radius
+        self.near_boost = near_boost
+        self.hit_radius = hit_radius
+        self.regions = {}       # name -> _Region
+        self.subscribers = []   # (fn, region name or None)
+        self.polls = 0
+        self.reads = 0          # blocks read by rescans
+        self.changes = 0
+
+    def add(self, name, c1, c2, baseline=None):
+        """Watch the cuboid c1..c2, as name
+
+        baseline is a Cuboid of its blocks, with data, or None to read it.
+        """
+        if baseline is None:
+            baseline = self.getter.get_blocks_with_data(c1, c2)
+            self.reads += baseline.size
+        region = _Region(name, baseline, self.tile)
+        now = timeit.default_timer()
+        for t in region.tiles:
+            t.scanned = now
+        self.regions[name] = region
+        return baseline
+
+    def remove(self, name):
+        del self.regions[name]
+
+    def baseline(self, name):
+        """The blocks of a region, as of the last rescans"""
+        return self.regions[name].baseline
+
+    def subscribe(self, fn, name=None):
+        """Call fn(region name, [(pos, old, new), ...]) with the changes
+        found by each poll; to one region, or all of them if name is None
+
+        old and new are (block id, block data).
+        """
+        self.subscribers.append((fn, name))
+
+    def _tiles(self):
+        for region in self.regions.values():
+            for t in region.tiles:
+                yield t
+
+    def touched(self, c1, c2=None, b=None):
+        """Rescan the tiles of a cuboid first, on the next poll
+
+        The arguments match BlockCache.on_change.
+        """
+        c1, c2 = normalize_corners(c1, c1 if c2 is None else c2)
+        for t in self._tiles():
+            if t.overlaps(c1, c2):
+                t.hot = True
+
+    def hit(self, pos):
+        """Rescan the tiles near pos first, on the next poll"""
+        r = self.hit_radius
+        x, y, z = block_pos(pos)
+        self.touched((x - r, y - r, z - r), (x + r, y + r, z + r))
+
+    def watch(self, cache):
+        """Rescan tiles first when they are written through a BlockCache"""
+        cache.on_change.append(self.touched)
+
+    def _priority(self, t, now, player):
+        if t.hot:
+            return float("inf")
+        age = now - t.scanned
+        if player is not None and (t.center - player).length() < self.radius:
+            age *= self.near_boost
+        return age
+
+    def poll(self):
+        """Rescan the most wanted tiles, within the budget
+
+        Returns the number of changed blocks found.
+        """
+        self.polls += 1
+        if self.mc is not None:
+            for hit in self.mc.events.pollBlockHits():
+                self.hit(hit.pos)
+        now = timeit.default_timer()
+        player = self.tracker.position if self.tracker is not None else None
+        tiles = sorted(self._tiles(), reverse=True,
+                       key=lambda t: self._priority(t, now, player))
+        chosen = []
+        blocks = 0
+        for t in tiles:
+            if chosen and blocks + t.size > self.budget:
+                break
+            chosen.append(t)
+            blocks += t.size
+        by_region = {}
+        for t in chosen:
+            by_region.setdefault(t.region, []).append(t)
+        found = 0
+        for region, tiles in by_region.items():
+            changes = self._rescan(region, tiles, now)
+            found += len(changes)
+            if changes:
+                for fn, name in self.subscribers:
+                    if name is None or name == region.name:
+                        fn(region.name, changes)
+        self.reads += blocks
+        self.changes += found
+        return found
+
+    def _rescan(self, region, tiles, now):
+        """Read tiles of a region, and bring its baseline up to date"""
+        positions = itertools.chain(*[
+            gen_cuboid_xyz(Vec3(*t.c1), Vec3(*t.c2)) for t in tiles])
+        fresh = region.fresh
+        for pos, b in self.getter.iter_blocks_with_data(positions):
+            fresh[pos] = b
+        base = region.baseline
+        changes = []
+        for t in tiles:
+            i = t.index
+            changed = ((base.ids[i] != fresh.ids[i]) |
+                       (base.data[i] != fresh.data[i]))
+            for dx, dy, dz in zip(*changed.nonzero()):
+                pos = (t.c1[0] + int(dx), t.c1[1] + int(dy),
+                       t.c1[2] + int(dz))
+                changes.append((pos, base[pos], fresh[pos]))
+            base.ids[i] = fresh.ids[i]
+            base.data[i] = fresh.data[i]
+            t.scanned = now
+            t.hot = False
+        return changes
+
+    def run(self, interval=0.5, seconds=None):
+        """Poll every interval, for seconds (or forever)"""
+        if self.mc is not None:
+            self.mc.events.clearAll()
+        endtime = None if seconds is None else time.time() + seconds
+        while endtime is None or time.time() < endtime:
+            self.poll()
+            time.sleep(interval)
+
+    def stats(self):
+        blocks = sum(r.baseline.size for r in self.regions.values())
+        return {"polls": self.polls, "reads": self.reads,
+                "changes": self.changes, "blocks_watched": blocks}
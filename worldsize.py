@@ -0,0 +1,137 @@
+"""How big is the world?
+
+Across the ground, the world is surrounded by BEDROCK_INVISIBLE:
+mc.getBlock answers BEDROCK_INVISIBLE for any x or z outside it.
+Rather than read every block along each axis, get_world_bounds probes
+single blocks at distances 1, 2, 4, 8, ... from the origin until it is
+outside the world (galloping), then narrows down the edge by binary
+search.  That finds each edge of a 256-block world in about 16 round
+trips.  Up and down there is no such edge (the game answers AIR above
+the world), so the y range is the game's: YMIN to YMAX.
+
+    bounds = get_world_bounds(mc)
+    print bounds
+    c1, c2 = bounds.clip(c1, c2)   # keep a scan inside the world
+"""
+
+from   mcpi.vec3 import Vec3
+from   cuboid import block_pos, normalize_corners
+import mcpi.block as block
+
+# The heights of the world (128 blocks), as the API counts them
+YMIN, YMAX = -64, 63
+
+class WorldEdgeError(Exception):
+    """World edge not found"""
+    def __init__(self, value):
+        self.value = value
+    def __str__(self):
+        return repr(self.value)
+
+class WorldBounds:
+    """The world is the blocks from (xmin,ymin,zmin) to (xmax,ymax,zmax)"""
+    def __init__(self, xmin, xmax, ymin, ymax, zmin, zmax, probes=0):
+        self.xmin, self.xmax = xmin, xmax
+        self.ymin, self.ymax = ymin, ymax
+        self.zmin, self.zmax = zmin, zmax
+        self.probes = probes     # round trips it took to find them
+
+    def __repr__(self):
+        return "The world is: [%d..%d][%d..%d][%d..%d]" % (
+            self.xmin, self.xmax, self.ymin, self.ymax, self.zmin, self.zmax)
+
+    @property
+    def corners(self):
+        return (Vec3(self.xmin, self.ymin, self.zmin),
+                Vec3(self.xmax, self.ymax, self.zmax))
+
+    def contains(self, pos):
+        x, y, z = pos
+        return (self.xmin <= x <= self.xmax and
+                self.ymin <= y <= self.ymax and
+                self.zmin <= z <= self.zmax)
+
+    def clip(self, c1, c2):
+        """The part of the cuboid (c1, c2) inside the world
+
+        Returns the corners (low, high), or None if it is all outside.
+        """
+        c1, c2 = normalize_corners(c1, c2)
+        lo, hi = self.corners
+        ans = []
+        for a, b, l, h in zip(c1, c2, lo, hi):
+            a, b = max(a, l), min(b, h)
+            if a > b:
+                return None
+            ans.append((a, b))
+        return Vec3(*[a for a, b in ans]), Vec3(*[b for a, b in ans])
+
+
+def find_edge(is_outside, start, step, limit=4096):
+    """The last coordinate inside the world, going from start by step
+
+    parms:
+        is_outside: fn(coordinate) => True if outside the world
+        start: a coordinate inside the world
+        step: 1 or -1
+        limit: give up this far away
+    returns:
+        (coordinate, number of probes); the coordinate is None if the
+        edge is not within limit
+    """
+    inside, d, probes = start, 1, 0
+    # Gallop until outside
+    while True:
+        if d > limit:
+            return None, probes
+        probes += 1
+        if is_outside(start + step * d):
+            break
+        inside = start + step * d
+        d *= 2
+    outside = start + step * d
+    # Binary search: inside is in the world, outside is not
+    while abs(outside - inside) > 1:
+        mid = (inside + outside) // 2
+        probes += 1
+        if is_outside(mid):
+            outside = mid
+        else:
+            inside = mid
+    return inside, probes
+
+_bounds = {}     # (mc, origin) -> WorldBounds
+def get_world_bounds(mc, origin=Vec3(0, 0, 0), refresh=False, limit=4096):
+    """Find the extent of the world, using single-block probes
+
+    parms:
+        mc: something with getBlock, such as mcpi.minecraft.Minecraft
+        origin: a position inside the world
+        refresh: probe again, instead of using the bounds found before
+        limit: how far to look for each edge
+    returns:
+        WorldBounds, which is remembered for the next call with the
+        same mc and origin
+    Raises WorldEdgeError if an edge is not within limit of origin.
+    """
+    key = (mc, block_pos(origin))
+    if key in _bounds and not refresh:
+        return _bounds[key]
+    edge = block.BEDROCK_INVISIBLE.id
+    ox, oy, oz = key[1]
+    probes = 0
+    ans = {}
+    for axis, start, probe in (
+            ("x", ox, lambda x: mc.getBlock(x, oy, oz) == edge),
+            ("z", oz, lambda z: mc.getBlock(ox, oy, z) == edge)):
+        for step in (-1, 1):
+            coord, n = find_edge(probe, start, step, limit)
+            probes += n
+            if coord is None:
+                raise WorldEdgeError("No edge within %d blocks of %s "
+                                     "along %s%s" % (limit, key[1],
+                                     "-+"[step > 0], axis))
+            ans[axis, step] = coord
+    _bounds[key] = WorldBounds(ans["x", -1], ans["x", 1], YMIN, YMAX,
+                               ans["z", -1], ans["z", 1], probes=probes)
+    return _bounds[key]